@@ -1 +1,2 @@
+from . import dlr_webhook
 from . import sms_refresh
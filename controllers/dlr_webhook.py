@@ -0,0 +1,79 @@
+import hmac
+import json
+import logging
+
+from odoo import http
+from odoo.http import request
+
+from ..transport import xml_response
+
+_logger = logging.getLogger(__name__)
+
+# Reports accepted in one request
+MAX_REPORTS = 10000
+
+
+class DeliveryReportWebhook(http.Controller):
+    """Delivery reports pushed by the providers of webhook gateways."""
+
+    @http.route('/sms/dlr/<int:gateway_id>', type='http', auth='none', methods=['GET', 'POST'], csrf=False)
+    def delivery_reports(self, gateway_id, **params):
+        """Record one or many delivery reports of a gateway.
+
+        Reports come as query or form parameters (message_id, status), as a
+        JSON object or list of objects with the same keys, or as an XML
+        document laid out like the polled reports. The gateway secret is
+        expected in the X-DLR-Secret header or the secret parameter.
+        """
+        gateway = request.env['sms.tunisiesms'].sudo().browse(gateway_id).exists()
+        if not gateway:
+            return self._response({'error': 'unknown gateway'}, 404)
+
+        config = gateway._get_config()
+        secret = request.httprequest.headers.get('X-DLR-Secret') or params.pop('secret', None) or ''
+        if (config.dlr_mode != 'push' or not config.dlr_webhook_secret
+                or not hmac.compare_digest(secret.encode(), config.dlr_webhook_secret.encode())):
+            _logger.warning("Rejected delivery reports for gateway %s from %s",
+                            gateway_id, request.httprequest.remote_addr)
+            return self._response({'error': 'forbidden'}, 403)
+
+        try:
+            reports = self._read_reports(params)
+        except ValueError as e:
+            return self._response({'error': 'invalid payload: %s' % e}, 400)
+        if len(reports) > MAX_REPORTS:
+            return self._response({'error': 'more than %d reports' % MAX_REPORTS}, 413)
+
+        matched = request.env['sms.tunisiesms.history'].sudo()._apply_delivery_reports(gateway.id, reports)
+        _logger.info("Delivery reports pushed for gateway %s: %d updated, %d unknown",
+                     gateway.name, len(matched), len(reports) - len(matched))
+        return self._response({'updated': len(matched), 'unknown': len(reports) - len(matched)})
+
+    def _read_reports(self, params):
+        """Return {message_id: status} from the request body or parameters."""
+        httprequest = request.httprequest
+        if httprequest.mimetype == 'application/json':
+            payload = json.loads(httprequest.get_data() or b'null')
+            if isinstance(payload, dict):
+                payload = payload.get('reports', [payload])
+            if not isinstance(payload, list):
+                raise ValueError('expected an object or a list')
+        elif httprequest.mimetype in ('text/xml', 'application/xml'):
+            return xml_response.parse_dlr_reports(httprequest.get_data())
+        else:
+            payload = [params]
+
+        reports = {}
+        for item in payload:
+            if not isinstance(item, dict):
+                raise ValueError('expected report objects')
+            message_id = item.get('message_id') or item.get('msg_id')
+            status = item.get('status') or item.get('acknowledgement')
+            if message_id and status:
+                reports[str(message_id)] = str(status)
+        return reports
+
+    def _response(self, payload, status=200):
+        response = request.make_response(json.dumps(payload), headers=[('Content-Type', 'application/json')])
+        response.status_code = status
+        return response
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of the gateway response parser against jxmlease.
+
+Parses a single recipient response, a delivery report and a batch
+response with many <status> elements with both parsers, checks that
+they agree and prints the time per document. jxmlease is optional, the
+streaming parser alone is timed when it is missing.
+
+Standalone, from the module directory:
+    python3 test/bench_xml_parser.py
+"""
+
+import importlib.util
+import os
+import sys
+import timeit
+import types
+
+try:
+    import jxmlease
+except ImportError:
+    jxmlease = None
+
+# Load the parser without importing the Odoo module
+TRANSPORT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'transport')
+package = types.ModuleType('sms_transport')
+package.__path__ = [TRANSPORT_DIR]
+sys.modules['sms_transport'] = package
+for name in ('base', 'xml_response'):
+    spec = importlib.util.spec_from_file_location('sms_transport.' + name, os.path.join(TRANSPORT_DIR, name + '.py'))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+xml_response = sys.modules['sms_transport.xml_response']
+
+STATUS = (
+    '<status><message_id>{id}</message_id><status_code>200</status_code>'
+    '<status_mobile>216{id:08d}</status_mobile><status_msg>Message sent</status_msg></status>'
+)
+SINGLE = ('<?xml version="1.0" encoding="utf-8"?><response>%s</response>' % STATUS.format(id=1)).encode()
+BATCH = ('<?xml version="1.0" encoding="utf-8"?><response>%s</response>'
+         % ''.join(STATUS.format(id=i) for i in range(1000))).encode()
+DLR = (b'<?xml version="1.0" encoding="utf-8"?><acknowledgement><message>'
+       b'<message_id>1</message_id><acknowledgement>DELIVRD</acknowledgement></message></acknowledgement>')
+
+
+def jxmlease_single(body):
+    status = jxmlease.parse(body)['response']['status']
+    return tuple(status[field].get_cdata() for field in xml_response.STATUS_FIELDS)
+
+
+def jxmlease_batch(body):
+    statuses = jxmlease.parse(body)['response']['status']
+    return {status['status_mobile'].get_cdata(): tuple(status[field].get_cdata() for field in xml_response.STATUS_FIELDS)
+            for status in statuses}
+
+
+def jxmlease_dlr(body):
+    return jxmlease.parse(body)['acknowledgement']['message']['acknowledgement'].get_cdata()
+
+
+def bench(label, function, body, number):
+    seconds = min(timeit.repeat(lambda: function(body), number=number, repeat=5)) / number
+    print(f"  {label:<12} {seconds * 1e6:10.1f} µs")
+    return seconds
+
+
+CASES = [
+    ('single', SINGLE, 20000, xml_response.parse_send_response, jxmlease_single),
+    ('dlr', DLR, 20000, xml_response.parse_dlr_response, jxmlease_dlr),
+    ('batch x1000', BATCH, 20, xml_response.parse_batch_response, jxmlease_batch),
+]
+
+print("=== Gateway Response Parser Benchmark ===\n")
+
+# Malformed bodies must fall back without raising
+assert xml_response.parse_send_response(b'<response><status>').status_code == 'parse_error'
+assert xml_response.parse_send_response(b'').status_code == 'parse_error'
+assert xml_response.parse_dlr_response(b'not xml') is None
+print("✓ Malformed bodies fall back cleanly\n")
+
+for name, body, number, streaming, reference in CASES:
+    print(f"{name} ({len(body)} bytes)")
+    streaming_time = bench('streaming', streaming, body, number)
+
+    if jxmlease is None:
+        continue
+
+    expected = reference(body)
+    result = streaming(body)
+    if name == 'batch x1000':
+        result = {mobile: tuple(status) for mobile, status in result.items()}
+    elif name == 'single':
+        result = tuple(result)
+    print(f"  {'✓' if result == expected else '✗'} same result as jxmlease")
+
+    jxmlease_time = bench('jxmlease', reference, body, number)
+    print(f"  speed-up     {jxmlease_time / streaming_time:10.1f}x")
+
+if jxmlease is None:
+    print("\njxmlease not installed, comparison skipped")
+
+print("\n=== Benchmark Complete ===")
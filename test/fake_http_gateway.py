@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fake TunisieSMS HTTP Gateway
+============================
+Local stand-in for the TunisieSMS HTTP API so that throughput can be
+tested offline. It answers `fct=sms` with the XML status document of the
+real gateway and `fct=dlr` with a delivery report.
+
+Standalone:
+    python3 fake_http_gateway.py --port 8070 --latency 200
+
+From the Odoo shell:
+    from odoo.addons.odoo_SMS_Module.test.fake_http_gateway import start_fake_gateway
+    server = start_fake_gateway(latency_ms=200)
+    url = 'http://127.0.0.1:%d/api.aspx' % server.server_port
+"""
+
+import argparse
+import itertools
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from xml.sax.saxutils import escape
+
+SEND_RESPONSE = (
+    '<?xml version="1.0" encoding="utf-8"?>'
+    '<response><status>'
+    '<message_id>{message_id}</message_id>'
+    '<status_code>{status_code}</status_code>'
+    '<status_mobile>{mobile}</status_mobile>'
+    '<status_msg>{status_msg}</status_msg>'
+    '</status></response>'
+)
+
+DLR_RESPONSE = (
+    '<?xml version="1.0" encoding="utf-8"?>'
+    '<acknowledgement><message>'
+    '<message_id>{message_id}</message_id>'
+    '<acknowledgement>{acknowledgement}</acknowledgement>'
+    '</message></acknowledgement>'
+)
+
+
+class FakeGatewayHandler(BaseHTTPRequestHandler):
+    """Answer gateway API calls after the configured latency."""
+
+    protocol_version = 'HTTP/1.1'  # keep-alive, like the real gateway
+
+    def do_GET(self):
+        query = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+        time.sleep(self.server.latency_ms / 1000.0)
+
+        if query.get('fct') == 'dlr':
+            body = DLR_RESPONSE.format(
+                message_id=escape(query.get('msg_id', '')),
+                acknowledgement='DELIVRD',
+            )
+        else:
+            self.server.count_request()
+            body = SEND_RESPONSE.format(
+                message_id=next(self.server.message_ids),
+                status_code='200',
+                mobile=escape(query.get('mobile', '')),
+                status_msg='Message sent',
+            )
+
+        payload = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/xml; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeGatewayServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding the fake gateway state."""
+
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, address, latency_ms=0):
+        super().__init__(address, FakeGatewayHandler)
+        self.latency_ms = latency_ms
+        self.message_ids = itertools.count(100000)
+        self.sent_count = 0
+        self._lock = threading.Lock()
+
+    def count_request(self):
+        with self._lock:
+            self.sent_count += 1
+
+
+def start_fake_gateway(port=0, latency_ms=0):
+    """Start the fake gateway in a background thread and return the server."""
+    server = FakeGatewayServer(('127.0.0.1', port), latency_ms)
+    thread = threading.Thread(target=server.serve_forever, name='fake_sms_gateway', daemon=True)
+    thread.start()
+    return server
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Fake TunisieSMS HTTP gateway')
+    parser.add_argument('--port', type=int, default=8070)
+    parser.add_argument('--latency', type=int, default=0, help='response latency in milliseconds')
+    args = parser.parse_args()
+
+    server = FakeGatewayServer(('127.0.0.1', args.port), args.latency)
+    print(f"Fake TunisieSMS gateway listening on http://127.0.0.1:{args.port}/api.aspx")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fake SMSC
+=========
+Local SMPP v3.4 server standing in for a provider SMSC so that the
+'smpp_native' transport can be tested offline. It accepts any
+bind_transceiver, answers submit_sm with a message id after the
+configured latency, sends a DELIVRD delivery receipt for every accepted
+message and answers enquire_link and unbind.
+
+Standalone:
+    python3 fake_smsc.py --port 2775 --latency 20
+
+From the Odoo shell:
+    from odoo.addons.odoo_SMS_Module.test.fake_smsc import start_fake_smsc
+    server = start_fake_smsc(latency_ms=20)
+    url = 'smpp://127.0.0.1:%d' % server.server_address[1]
+"""
+
+import argparse
+import itertools
+import queue
+import socketserver
+import struct
+import threading
+import time
+
+HEADER = struct.Struct('>IIII')
+
+BIND_TRANSCEIVER = 0x00000009
+SUBMIT_SM = 0x00000004
+DELIVER_SM = 0x00000005
+UNBIND = 0x00000006
+ENQUIRE_LINK = 0x00000015
+RESPONSE = 0x80000000
+
+
+def pdu(command_id, sequence, body=b'', status=0):
+    return HEADER.pack(HEADER.size + len(body), command_id, status, sequence) + body
+
+
+def submit_destination(body):
+    """Return the destination_addr of a submit_sm body."""
+    offset = body.index(b'\x00') + 3                     # service_type, source ton/npi
+    offset = body.index(b'\x00', offset) + 3             # source_addr, dest ton/npi
+    return body[offset:body.index(b'\x00', offset)]
+
+
+def receipt_body(message_id, destination):
+    """deliver_sm body of a DELIVRD receipt for `message_id`."""
+    stamp = time.strftime('%y%m%d%H%M')
+    text = ('id:%s sub:001 dlvrd:001 submit date:%s done date:%s stat:DELIVRD err:000 text:'
+            % (message_id, stamp, stamp)).encode('ascii')
+    return (b'\x00' + b'\x01\x01' + destination + b'\x00' + b'\x05\x00FAKE\x00'
+            + bytes([0x04, 0, 0]) + b'\x00\x00' + bytes([0, 0, 0, 0, len(text)]) + text
+            + struct.pack('>HH', 0x001E, len(message_id) + 1) + message_id.encode('ascii') + b'\x00')
+
+
+class FakeSmscHandler(socketserver.BaseRequestHandler):
+    """Serve one ESME connection."""
+
+    def setup(self):
+        self.write_lock = threading.Lock()
+        self.sequence = itertools.count(1)
+        # Answers are written by a second thread once their latency elapsed,
+        # so that pipelined submit_sm are answered concurrently like a real SMSC
+        self.delayed = queue.Queue()
+        threading.Thread(target=self.write_delayed, daemon=True).start()
+
+    def finish(self):
+        self.delayed.put(None)
+
+    def write(self, data):
+        with self.write_lock:
+            self.request.sendall(data)
+
+    def write_delayed(self):
+        while True:
+            item = self.delayed.get()
+            if item is None:
+                return
+            due, data = item
+            time.sleep(max(0.0, due - time.monotonic()))
+            try:
+                self.write(data)
+            except OSError:
+                return
+
+    def handle(self):
+        buffer = b''
+        while True:
+            data = self.request.recv(65536)
+            if not data:
+                return
+            buffer += data
+            while len(buffer) >= HEADER.size:
+                length, command_id, _status, sequence = HEADER.unpack_from(buffer)
+                if len(buffer) < length:
+                    break
+                body, buffer = buffer[HEADER.size:length], buffer[length:]
+                if not self.dispatch(command_id, sequence, body):
+                    return
+
+    def dispatch(self, command_id, sequence, body):
+        server = self.server
+        if command_id == BIND_TRANSCEIVER:
+            self.write(pdu(command_id | RESPONSE, sequence, b'FakeSMSC\x00'))
+        elif command_id == SUBMIT_SM:
+            message_id = 'SMSC%d' % next(server.message_ids)
+            server.count_submit()
+            due = time.monotonic() + server.latency_ms / 1000.0
+            data = pdu(command_id | RESPONSE, sequence, message_id.encode('ascii') + b'\x00')
+            if server.receipts:
+                data += pdu(DELIVER_SM, next(self.sequence), receipt_body(message_id, submit_destination(body)))
+            self.delayed.put((due, data))
+        elif command_id == ENQUIRE_LINK:
+            self.write(pdu(command_id | RESPONSE, sequence))
+        elif command_id == UNBIND:
+            self.write(pdu(command_id | RESPONSE, sequence))
+            return False
+        # deliver_sm_resp and other answers need no reply
+        return True
+
+
+class FakeSmscServer(socketserver.ThreadingTCPServer):
+    """Threaded SMPP server holding the fake SMSC state."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, latency_ms=0, receipts=True):
+        super().__init__(address, FakeSmscHandler)
+        self.latency_ms = latency_ms
+        self.receipts = receipts
+        self.message_ids = itertools.count(100000)
+        self.submit_count = 0
+        self._lock = threading.Lock()
+
+    def count_submit(self):
+        with self._lock:
+            self.submit_count += 1
+
+
+def start_fake_smsc(port=0, latency_ms=0, receipts=True):
+    """Start the fake SMSC in a background thread and return the server."""
+    server = FakeSmscServer(('127.0.0.1', port), latency_ms, receipts)
+    thread = threading.Thread(target=server.serve_forever, name='fake_smsc', daemon=True)
+    thread.start()
+    return server
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Fake SMPP v3.4 SMSC')
+    parser.add_argument('--port', type=int, default=2775)
+    parser.add_argument('--latency', type=int, default=0, help='submit_sm answer latency in milliseconds')
+    args = parser.parse_args()
+
+    server = FakeSmscServer(('127.0.0.1', args.port), args.latency)
+    print(f"Fake SMSC listening on smpp://127.0.0.1:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
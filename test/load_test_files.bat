@@ -96,6 +96,96 @@ if %errorlevel% equ 0 (
 )
 echo.
 
+echo 📄 Copying fake_http_gateway.py...
+docker cp "%BASE_DIR%\fake_http_gateway.py" sms-odoo-1:/tmp/
+if %errorlevel% equ 0 (
+    echo    ✅ fake_http_gateway.py copied successfully
+) else (
+    echo    ❌ Failed to copy fake_http_gateway.py
+)
+echo.
+
+echo 📄 Copying test_async_transport.py...
+docker cp "%BASE_DIR%\test_async_transport.py" sms-odoo-1:/tmp/
+if %errorlevel% equ 0 (
+    echo    ✅ test_async_transport.py copied successfully
+) else (
+    echo    ❌ Failed to copy test_async_transport.py
+)
+echo.
+
+echo 📄 Copying test_simulator_pipeline.py...
+docker cp "%BASE_DIR%\test_simulator_pipeline.py" sms-odoo-1:/tmp/
+if %errorlevel% equ 0 (
+    echo    ✅ test_simulator_pipeline.py copied successfully
+) else (
+    echo    ❌ Failed to copy test_simulator_pipeline.py
+)
+echo.
+
+echo 📄 Copying test_latency_routing.py...
+docker cp "%BASE_DIR%\test_latency_routing.py" sms-odoo-1:/tmp/
+if %errorlevel% equ 0 (
+    echo    ✅ test_latency_routing.py copied successfully
+) else (
+    echo    ❌ Failed to copy test_latency_routing.py
+)
+echo.
+
+echo 📄 Copying fake_smsc.py...
+docker cp "%BASE_DIR%\fake_smsc.py" sms-odoo-1:/tmp/
+if %errorlevel% equ 0 (
+    echo    ✅ fake_smsc.py copied successfully
+) else (
+    echo    ❌ Failed to copy fake_smsc.py
+)
+echo.
+
+echo 📄 Copying test_smpp_transport.py...
+docker cp "%BASE_DIR%\test_smpp_transport.py" sms-odoo-1:/tmp/
+if %errorlevel% equ 0 (
+    echo    ✅ test_smpp_transport.py copied successfully
+) else (
+    echo    ❌ Failed to copy test_smpp_transport.py
+)
+echo.
+
+echo 📄 Copying test_dlr_webhook.py...
+docker cp "%BASE_DIR%\test_dlr_webhook.py" sms-odoo-1:/tmp/
+if %errorlevel% equ 0 (
+    echo    ✅ test_dlr_webhook.py copied successfully
+) else (
+    echo    ❌ Failed to copy test_dlr_webhook.py
+)
+echo.
+
+echo 📄 Copying test_dlr_polling.py...
+docker cp "%BASE_DIR%\test_dlr_polling.py" sms-odoo-1:/tmp/
+if %errorlevel% equ 0 (
+    echo    ✅ test_dlr_polling.py copied successfully
+) else (
+    echo    ❌ Failed to copy test_dlr_polling.py
+)
+echo.
+
+echo 📄 Copying test_dlr_schedule.py...
+docker cp "%BASE_DIR%\test_dlr_schedule.py" sms-odoo-1:/tmp/
+if %errorlevel% equ 0 (
+    echo    ✅ test_dlr_schedule.py copied successfully
+) else (
+    echo    ❌ Failed to copy test_dlr_schedule.py
+)
+echo.
+
+echo 📄 Copying test_history_buffer.py...
+docker cp "%BASE_DIR%\test_history_buffer.py" sms-odoo-1:/tmp/
+if %errorlevel% equ 0 (
+    echo    ✅ test_history_buffer.py copied successfully
+) else (
+    echo    ❌ Failed to copy test_history_buffer.py
+)
+echo.
+
 echo 📄 Copying test_runner.py...
 docker cp "%BASE_DIR%\test_runner.py" sms-odoo-1:/tmp/
 if %errorlevel% equ 0 (
@@ -130,6 +220,14 @@ echo    exec(open('/tmp/test_view_refresh.py').read())
 echo    exec(open('/tmp/trigger_test.py').read())
 echo    exec(open('/tmp/create_test_sms.py').read())
 echo    exec(open('/tmp/final_test.py').read())
+echo    exec(open('/tmp/test_async_transport.py').read())
+echo    exec(open('/tmp/test_simulator_pipeline.py').read())
+echo    exec(open('/tmp/test_latency_routing.py').read())
+echo    exec(open('/tmp/test_smpp_transport.py').read())
+echo    exec(open('/tmp/test_dlr_webhook.py').read())
+echo    exec(open('/tmp/test_dlr_polling.py').read())
+echo    exec(open('/tmp/test_dlr_schedule.py').read())
+echo    exec(open('/tmp/test_history_buffer.py').read())
 echo.
 echo 3. Use the test runner for comprehensive testing:
 echo    exec(open('/tmp/test_runner.py').read())
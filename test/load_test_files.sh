@@ -25,6 +25,16 @@ declare -a TEST_FILES=(
     "trigger_test.py"
     "create_test_sms.py"
     "final_test.py"
+    "fake_http_gateway.py"
+    "test_async_transport.py"
+    "test_simulator_pipeline.py"
+    "test_latency_routing.py"
+    "fake_smsc.py"
+    "test_smpp_transport.py"
+    "test_dlr_webhook.py"
+    "test_dlr_polling.py"
+    "test_dlr_schedule.py"
+    "test_history_buffer.py"
     "test_runner.py"
 )
 
@@ -72,6 +82,14 @@ echo "   exec(open('/tmp/test_view_refresh.py').read())"
 echo "   exec(open('/tmp/trigger_test.py').read())"
 echo "   exec(open('/tmp/create_test_sms.py').read())"
 echo "   exec(open('/tmp/final_test.py').read())"
+echo "   exec(open('/tmp/test_async_transport.py').read())"
+echo "   exec(open('/tmp/test_simulator_pipeline.py').read())"
+echo "   exec(open('/tmp/test_latency_routing.py').read())"
+echo "   exec(open('/tmp/test_smpp_transport.py').read())"
+echo "   exec(open('/tmp/test_dlr_webhook.py').read())"
+echo "   exec(open('/tmp/test_dlr_polling.py').read())"
+echo "   exec(open('/tmp/test_dlr_schedule.py').read())"
+echo "   exec(open('/tmp/test_history_buffer.py').read())"
 echo ""
 echo "3. Use the test runner for comprehensive testing:"
 echo "   exec(open('/tmp/test_runner.py').read())"
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Throughput test for the asyncio HTTP dispatch mode, fully offline.
+
+Starts the fake HTTP gateway, queues messages on a temporary gateway that
+points to it and drains the queue once in sequential and once in asyncio
+mode. Everything created by the test is removed at the end.
+
+Run this script in Odoo shell:
+docker exec -it sms-odoo-1 odoo shell -d odoo
+then: exec(open('/tmp/test_async_transport.py').read())
+"""
+
+import time
+
+from odoo.addons.odoo_SMS_Module.test.fake_http_gateway import start_fake_gateway
+from odoo.addons.odoo_SMS_Module.transport import async_http
+
+MESSAGES = 200
+LATENCY_MS = 100
+
+
+def drain_once(gateway, mode, count):
+    """Queue `count` messages on `gateway` and drain them in `mode`."""
+    queue_obj = env['sms.tunisiesms.queue']
+    gateway.write({'dispatch_mode': mode})
+    queue_obj.create([{
+        'name': 'async transport test',
+        'gateway_id': gateway.id,
+        'mobile': '216%08d' % i,
+        'msg': 'Async transport test %d' % i,
+    } for i in range(count)])
+    env.cr.commit()
+
+    started = time.monotonic()
+    processed = gateway._drain_queue(queue_obj._new_lease_owner())
+    elapsed = time.monotonic() - started
+
+    sent = queue_obj.search_count([('gateway_id', '=', gateway.id), ('state', '=', 'send')])
+    print(f"  {mode:<10} {processed} messages in {elapsed:.2f}s ({processed / elapsed:.1f} msg/s), {sent} sent in total")
+    return processed / elapsed
+
+
+print("=== Asyncio HTTP Transport Throughput Test ===\n")
+
+if not async_http.is_available():
+    print("✗ aiohttp is not installed, asyncio dispatch is unavailable")
+else:
+    server = start_fake_gateway(latency_ms=LATENCY_MS)
+    gateway = env['sms.tunisiesms'].with_context(skip_access_refresh=True).create({
+        'name': 'Fake Gateway',
+        'url': 'http://127.0.0.1:%d/api.aspx' % server.server_port,
+        'method': 'http',
+        'char_limit': False,
+        'dispatch_batch_size': MESSAGES,
+        'async_concurrency': 100,
+    })
+    env.cr.commit()
+
+    try:
+        print(f"Gateway latency: {LATENCY_MS}ms, {MESSAGES} messages per run\n")
+        sequential = drain_once(gateway, 'sequential', MESSAGES // 10)
+        concurrent = drain_once(gateway, 'async', MESSAGES)
+        print(f"\nSpeed-up: {concurrent / sequential:.1f}x")
+        print(f"Requests received by the fake gateway: {server.sent_count}")
+
+        if concurrent > sequential * 5:
+            print("✅ Asyncio dispatch scales with concurrency")
+        else:
+            print("❌ Asyncio dispatch is not faster than sequential dispatch")
+    finally:
+        env['sms.tunisiesms.history'].search([('gateway_id', '=', gateway.id)]).unlink()
+        env['sms.tunisiesms.queue'].search([('gateway_id', '=', gateway.id)]).unlink()
+        gateway.unlink()
+        env.cr.commit()
+        server.shutdown()
+
+print("\n=== Test Complete ===")
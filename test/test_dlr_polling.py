@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Offline test of the concurrent delivery report polling.
+
+Creates a temporary gateway using the 'simulator' method and a backlog of
+sent messages waiting for their delivery report, then polls it one
+message per request, concurrently, and with multi-message requests.
+Prints the time of each pass and checks that every report was written
+back. Everything created by the test is removed at the end.
+
+Run this script in Odoo shell:
+docker exec -it sms-odoo-1 odoo shell -d odoo
+then: exec(open('/tmp/test_dlr_polling.py').read())
+"""
+
+import time
+
+MESSAGES = 300
+LATENCY_MS = 50
+PASSES = [
+    # (label, concurrency, reports per request)
+    ('Sequential', 1, 1),
+    ('Concurrent', 20, 1),
+    ('Concurrent, batched', 5, 50),
+]
+
+print("=== Delivery Report Polling Test ===\n")
+
+gateway = env['sms.tunisiesms'].with_context(skip_access_refresh=True).create({
+    'name': 'DLR Simulator',
+    'url': 'simulator://local',
+    'method': 'simulator',
+    'simulator_latency': LATENCY_MS,
+})
+history = env['sms.tunisiesms.history'].create([{
+    'name': 'SMS Sent',
+    'gateway_id': gateway.id,
+    'to': '216%08d' % i,
+    'sms': 'DLR polling test %d' % i,
+    'message_id': 'SIM%08d' % i,
+    'status_code': '200',
+} for i in range(MESSAGES)])
+
+try:
+    timings = {}
+    for label, concurrency, batch_size in PASSES:
+        history.write({'dlr_msg': False})
+        gateway.write({'dlr_poll_concurrency': concurrency, 'dlr_batch_size': batch_size})
+
+        # Same steps as get_dlr_status, limited to the test gateway
+        started = time.monotonic()
+        reports = gateway._poll_delivery_reports(history.mapped('message_id'))
+        history._record_dlr_polls(reports)
+        timings[label] = time.monotonic() - started
+
+        delivered = len(history.filtered(lambda h: h.dlr_msg == 'DELIVRD'))
+        print(f"{label} (concurrency {concurrency}, {batch_size} per request): "
+              f"{len(reports)} reports in {timings[label]:.2f}s, {delivered} delivered in history")
+
+    if (delivered == MESSAGES
+            and timings['Concurrent'] * 5 < timings['Sequential']
+            and timings['Concurrent, batched'] < timings['Concurrent']):
+        print("✅ Concurrent and batched polling drain the backlog faster")
+    else:
+        print("❌ Delivery report polling below expectations")
+finally:
+    history.unlink()
+    gateway.unlink()
+    env.cr.commit()
+
+print("\n=== Test Complete ===")
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Offline test of the per-message delivery report polling schedule.
+
+Creates a temporary gateway using the 'simulator' method and sent messages
+of which only some ever get a report (the simulator delivers 'SIM' ids
+only). Runs the polling steps of get_dlr_status for the test gateway
+while moving the clock past each scheduled poll. Prints the schedule of
+each round and checks that delivered messages leave the polling set at
+once while the others back off and are given up. Everything created by
+the test is removed at the end.
+
+Run this script in Odoo shell:
+docker exec -it sms-odoo-1 odoo shell -d odoo
+then: exec(open('/tmp/test_dlr_schedule.py').read())
+"""
+
+from datetime import timedelta
+
+from odoo import fields
+from odoo.addons.odoo_SMS_Module.tunisiesms import DLR_POLL_BACKOFF
+
+MESSAGES = 20
+
+print("=== Delivery Report Schedule Test ===\n")
+
+gateway = env['sms.tunisiesms'].with_context(skip_access_refresh=True).create({
+    'name': 'DLR Schedule Simulator',
+    'url': 'simulator://local',
+    'method': 'simulator',
+    'simulator_latency': 0,
+})
+history = env['sms.tunisiesms.history'].create([{
+    'name': 'SMS Sent',
+    'gateway_id': gateway.id,
+    'to': '216%08d' % i,
+    'sms': 'DLR schedule test %d' % i,
+    # Half of the messages never get a report
+    'message_id': ('SIM%08d' if i % 2 else 'LOST%08d') % i,
+    'status_code': '200',
+} for i in range(MESSAGES)])
+delivered = history.filtered(lambda h: h.message_id.startswith('SIM'))
+lost = history - delivered
+
+try:
+    first_poll = min(history.mapped('next_dlr_poll_at')) - fields.Datetime.now()
+    print(f"First poll scheduled {first_poll.total_seconds():.0f}s after the send")
+
+    polls = 0
+    delays = []
+    while True:
+        scheduled = history.filtered('next_dlr_poll_at')
+        if not scheduled:
+            break
+        # Move the clock past the next poll instead of waiting for it
+        next_poll = min(scheduled.mapped('next_dlr_poll_at'))
+        scheduled.write({'next_dlr_poll_at': fields.Datetime.now() - timedelta(seconds=1)})
+        if polls:
+            delays.append(round((next_poll - fields.Datetime.now()).total_seconds() / 60))
+
+        # Same steps as get_dlr_status, limited to the test gateway
+        reports = gateway._poll_delivery_reports(scheduled.mapped('message_id'))
+        scheduled._record_dlr_polls(reports)
+        polls += 1
+        print(f"Round {polls}: polled {len(scheduled)} messages, {len(reports)} reports, "
+              f"{len(history.filtered('next_dlr_poll_at'))} still scheduled")
+        if polls > len(DLR_POLL_BACKOFF) + 1:
+            break
+
+    print(f"Backoff between polls (minutes): {delays}")
+    print(f"Delivered messages polled {set(delivered.mapped('dlr_poll_count'))} time(s), "
+          f"lost messages {set(lost.mapped('dlr_poll_count'))} time(s)")
+
+    if (all(h.dlr_msg == 'DELIVRD' and h.dlr_poll_count == 1 for h in delivered)
+            and all(not h.dlr_msg and h.dlr_poll_count == len(DLR_POLL_BACKOFF) for h in lost)
+            and not history.filtered('next_dlr_poll_at')):
+        print("✅ Final reports leave the schedule and lost messages are given up")
+    else:
+        print("❌ Delivery report schedule below expectations")
+finally:
+    history.unlink()
+    gateway.unlink()
+    env.cr.commit()
+
+print("\n=== Test Complete ===")
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test of the delivery report webhook.
+
+Creates a temporary webhook gateway with history entries, then pushes a
+batch of JSON reports, a form encoded report and a request with a wrong
+secret to the running Odoo server. Prints the answers and checks the
+history. Everything created by the test is removed at the end.
+
+Run this script in Odoo shell (the Odoo server must be running):
+docker exec -it sms-odoo-1 odoo shell -d odoo
+then: exec(open('/tmp/test_dlr_webhook.py').read())
+"""
+
+import requests
+
+REPORTS = 500
+SECRET = 'test-dlr-secret'
+
+print("=== Delivery Report Webhook Test ===\n")
+
+gateway = env['sms.tunisiesms'].with_context(skip_access_refresh=True).create({
+    'name': 'Webhook Gateway',
+    'url': 'simulator://local',
+    'method': 'simulator',
+    'dlr_mode': 'push',
+    'dlr_webhook_secret': SECRET,
+})
+history = env['sms.tunisiesms.history'].create([{
+    'name': 'SMS Sent',
+    'gateway_id': gateway.id,
+    'to': '216%08d' % i,
+    'sms': 'Webhook test %d' % i,
+    'message_id': 'WEBHOOK%d' % i,
+    'status_code': '200',
+} for i in range(REPORTS + 1)])
+env.cr.commit()
+
+try:
+    url = env['ir.config_parameter'].sudo().get_param('web.base.url') + '/sms/dlr/%d' % gateway.id
+    print(f"Webhook URL: {url}\n")
+
+    response = requests.post(url, json={'reports': [
+        {'message_id': 'WEBHOOK%d' % i, 'status': 'DELIVRD'} for i in range(REPORTS)
+    ] + [{'message_id': 'UNKNOWN', 'status': 'DELIVRD'}]}, headers={'X-DLR-Secret': SECRET}, timeout=30)
+    print(f"JSON batch: {response.status_code} {response.text}")
+
+    single = requests.post(url, data={'message_id': 'WEBHOOK%d' % REPORTS, 'status': 'UNDELIV', 'secret': SECRET},
+                           timeout=30)
+    print(f"Form report: {single.status_code} {single.text}")
+
+    forbidden = requests.post(url, json={'message_id': 'WEBHOOK0', 'status': 'EXPIRED'},
+                              headers={'X-DLR-Secret': 'wrong'}, timeout=30)
+    print(f"Wrong secret: {forbidden.status_code} {forbidden.text}")
+
+    history.invalidate_cache()
+    delivered = len(history.filtered(lambda h: h.dlr_msg == 'DELIVRD'))
+    undelivered = len(history.filtered(lambda h: h.dlr_msg == 'UNDELIV'))
+    print(f"\nHistory: {delivered} DELIVRD, {undelivered} UNDELIV")
+
+    if (response.status_code == 200 and response.json() == {'updated': REPORTS, 'unknown': 1}
+            and delivered == REPORTS and undelivered == 1 and forbidden.status_code == 403):
+        print("✅ Delivery reports pushed and applied in bulk")
+    else:
+        print("❌ Webhook did not apply the reports as expected")
+except requests.ConnectionError as e:
+    print(f"❌ Odoo server not reachable: {e}")
+finally:
+    history.unlink()
+    gateway.unlink()
+    env.cr.commit()
+
+print("\n=== Test Complete ===")
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test of the write-behind SMS history buffer.
+
+Logs a campaign worth of history entries once through one ORM create per
+row and once through the transaction buffer, and prints the time of each.
+Then checks that buffered entries are visible to searches of their own
+transaction, persist on commit and disappear on rollback together with
+the rest of the transaction. Everything created by the test is removed at
+the end.
+
+Run this script in Odoo shell:
+docker exec -it sms-odoo-1 odoo shell -d odoo
+then: exec(open('/tmp/test_history_buffer.py').read())
+"""
+
+import time
+from datetime import datetime
+
+ENTRIES = 5000
+
+print("=== SMS History Buffer Test ===\n")
+
+history_obj = env['sms.tunisiesms.history']
+gateway = env['sms.tunisiesms'].with_context(skip_access_refresh=True).create({
+    'name': 'History Buffer Simulator',
+    'url': 'simulator://local',
+    'method': 'simulator',
+})
+env.cr.commit()
+
+
+def entries(tag, count=ENTRIES):
+    return [{
+        'name': 'SMS Sent',
+        'gateway_id': gateway.id,
+        'sms': 'History buffer test',
+        'to': '216%08d' % i,
+        'message_id': '%s%08d' % (tag, i),
+        'status_code': '200',
+        'status_mobile': '216%08d' % i,
+        'status_msg': 'Simulated send',
+        'latency_ms': 20.0,
+        'date_create': datetime.now(),
+    } for i in range(count)]
+
+
+def logged(tag):
+    return history_obj.search_count([('gateway_id', '=', gateway.id), ('message_id', '=like', tag + '%')])
+
+
+try:
+    started = time.monotonic()
+    for vals in entries('ROW'):
+        history_obj.create(vals)
+    env.cr.commit()
+    per_row = time.monotonic() - started
+    print(f"One create per entry: {ENTRIES} entries in {per_row:.2f}s")
+
+    started = time.monotonic()
+    for vals in entries('BUF'):
+        history_obj._buffer_entries([vals])
+    env.cr.commit()
+    buffered = time.monotonic() - started
+    print(f"Buffered bulk insert: {ENTRIES} entries in {buffered:.2f}s ({per_row / buffered:.1f}x faster)")
+
+    history_obj._buffer_entries(entries('SEEN', 10))
+    seen = logged('SEEN')
+    env.cr.commit()
+    print(f"Buffered entries visible before commit: {seen} of 10")
+
+    history_obj._buffer_entries(entries('GONE', 10))
+    env.cr.rollback()
+    env.cr.commit()
+    gone = logged('GONE')
+    print(f"Buffered entries left after rollback: {gone}")
+
+    scheduled = history_obj.search_count([('gateway_id', '=', gateway.id), ('message_id', '=like', 'BUF%'),
+                                          ('next_dlr_poll_at', '!=', False)])
+    print(f"Buffered entries scheduled for a DLR poll: {scheduled} of {ENTRIES}")
+
+    if (logged('BUF') == ENTRIES and buffered < per_row and seen == 10 and gone == 0
+            and scheduled == ENTRIES):
+        print("✅ History entries written in bulk with their transaction")
+    else:
+        print("❌ History buffer below expectations")
+finally:
+    env.cr.rollback()
+    history_obj.search([('gateway_id', '=', gateway.id)]).unlink()
+    gateway.unlink()
+    env.cr.commit()
+
+print("\n=== Test Complete ===")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Offline test of the latency-aware gateway routing.
+
+Creates two temporary gateways using the 'simulator' method, routes direct
+sends between them, then slows one of them down as a provider slowdown
+would. Prints the share of traffic routed to each gateway and the p95
+time-to-accept before and after the slowdown. Everything created by the
+test is removed at the end.
+
+Run this script in Odoo shell:
+docker exec -it sms-odoo-1 odoo shell -d odoo
+then: exec(open('/tmp/test_latency_routing.py').read())
+"""
+
+import time
+from collections import Counter
+
+MESSAGES = 100
+FAST_LATENCY_MS = 20
+SLOW_LATENCY_MS = 500
+
+
+class RoutedSMS(object):
+    def __init__(self, gateway, index):
+        self.gateway = gateway
+        self.mobile_to = '216%08d' % index
+        self.text = 'Latency routing test %d' % index
+
+
+def run_phase(label):
+    routes = Counter()
+    durations = []
+    for i in range(MESSAGES):
+        started = time.monotonic()
+        gateway = sms_obj._route_gateway(exclude=others)
+        sms_obj._send_direct(RoutedSMS(gateway, i), gateway)
+        durations.append(time.monotonic() - started)
+        routes[gateway.name] += 1
+
+    durations.sort()
+    p95 = durations[int(len(durations) * 0.95) - 1] * 1000
+    print(f"{label}: routed {dict(routes)}, p95 time-to-accept {p95:.0f}ms")
+    return routes, p95
+
+
+print("=== Latency-Aware Routing Test ===\n")
+
+sms_obj = env['sms.tunisiesms'].with_context(skip_access_refresh=True)
+others = sms_obj.search([])
+gateway_a, gateway_b = sms_obj.create([{
+    'name': name,
+    'url': 'simulator://local',
+    'method': 'simulator',
+    'char_limit': False,
+    'simulator_latency': FAST_LATENCY_MS,
+    'simulator_error_rate': 0.0,
+    'routing_weight': 1,
+    'breaker_threshold': 0,
+} for name in ('Simulator A', 'Simulator B')])
+env.cr.commit()
+
+try:
+    run_phase("Both fast")
+
+    gateway_a.simulator_latency = SLOW_LATENCY_MS
+    env.cr.commit()
+    routes, p95 = run_phase("Gateway A slowed down")
+
+    for gateway in gateway_a | gateway_b:
+        gateway.invalidate_cache()
+        print(f"{gateway.name}: {gateway.routing_latency:.0f}ms, "
+              f"{gateway.routing_success_rate:.0%} success, {gateway.routing_decision}")
+
+    if routes['Simulator B'] >= MESSAGES - 2 and p95 < SLOW_LATENCY_MS:
+        print("✅ Traffic moved to the fast gateway during the slowdown")
+    else:
+        print("❌ Slow gateway still receiving traffic")
+finally:
+    env['sms.tunisiesms.history'].search([('gateway_id', 'in', (gateway_a | gateway_b).ids)]).unlink()
+    (gateway_a | gateway_b).unlink()
+    env.cr.commit()
+
+print("\n=== Test Complete ===")
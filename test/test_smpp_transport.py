@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Throughput test of the native SMPP transport, fully offline.
+
+Starts the fake SMSC, creates a temporary 'smpp_native' gateway bound to
+it and submits a batch through one bind with the configured window.
+Prints the steady-state throughput and checks that the delivery receipts
+sent by the SMSC come back. Everything created by the test is removed at
+the end.
+
+Run this script in Odoo shell:
+docker exec -it sms-odoo-1 odoo shell -d odoo
+then: exec(open('/tmp/test_smpp_transport.py').read())
+"""
+
+import time
+
+from odoo.addons.odoo_SMS_Module.test.fake_smsc import start_fake_smsc
+from odoo.addons.odoo_SMS_Module.transport import smpp
+from odoo.addons.odoo_SMS_Module.transport.base import OutgoingMessage, get_transport
+
+MESSAGES = 2000
+LATENCY_MS = 20
+WINDOW = 50
+
+print("=== Native SMPP Transport Throughput Test ===\n")
+
+server = start_fake_smsc(latency_ms=LATENCY_MS)
+gateway = env['sms.tunisiesms'].with_context(skip_access_refresh=True).create({
+    'name': 'Fake SMSC',
+    'url': 'smpp://127.0.0.1:%d' % server.server_address[1],
+    'method': 'smpp_native',
+    'char_limit': False,
+    'smpp_window': WINDOW,
+    'property_ids': [(0, 0, {'name': name, 'type': name, 'value': value})
+                     for name, value in (('user', 'test'), ('password', 'secret'), ('sender', 'TEST'))],
+})
+env.cr.commit()
+
+try:
+    transport = get_transport(gateway)
+    message = OutgoingMessage('', 'SMPP transport test', 0, 1, 0, 0, '1', 0, '')
+
+    # Bind outside the measurement
+    transport.send(message._replace(mobile='21600000000'))
+
+    mobiles = ['216%08d' % i for i in range(MESSAGES)]
+    started = time.monotonic()
+    results = transport.send_batch(mobiles, message)
+    elapsed = time.monotonic() - started
+
+    accepted = [result for result in results.values() if result.status_code == '200']
+    print(f"Window {WINDOW}, SMSC latency {LATENCY_MS}ms: {len(accepted)} of {MESSAGES} accepted "
+          f"in {elapsed:.2f}s ({MESSAGES / elapsed:.0f} msg/s)")
+
+    time.sleep(2)
+    session = smpp.find_session((env.cr.dbname, gateway.id))
+    receipts = sum(1 for result in accepted if session.pop_receipt(result.message_id) == 'DELIVRD')
+    print(f"Delivery receipts received: {receipts}")
+
+    if len(accepted) == MESSAGES and receipts == MESSAGES and MESSAGES / elapsed >= 100:
+        print("✅ Windowed submit_sm reached the expected throughput")
+    else:
+        print("❌ SMPP transport below expectations")
+finally:
+    session = smpp.find_session((env.cr.dbname, gateway.id))
+    if session:
+        session.close()
+    server.shutdown()
+    gateway.unlink()
+    env.cr.commit()
+
+print("\n=== Test Complete ===")
@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+from . import test_circuit_breaker
+from . import test_config_snapshot
+from . import test_outbox
+from . import test_queue_expiry
+from . import test_queue_lease
+from . import test_queue_reaper
+from . import test_queue_retry
+from . import test_rate_limiter
+from . import test_send_modes
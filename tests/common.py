@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+from datetime import timedelta
+from types import SimpleNamespace
+
+from odoo import fields
+from odoo.tests.common import SavepointCase
+
+
+class SMSGatewayCase(SavepointCase):
+    """Simulator gateway and queue helpers shared by the SMS tests.
+
+    The database clock (now()) stops at the start of the test transaction,
+    so rows meant to be due are dated an hour in the past.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.gateway = cls._create_gateway('Test Gateway')
+        cls.queue_obj = cls.env['sms.tunisiesms.queue']
+
+    @classmethod
+    def _create_gateway(cls, name, **vals):
+        # The current user is authorized so that the shared access search
+        # never falls back to the access fix, which commits
+        return cls.env['sms.tunisiesms'].with_context(skip_access_refresh=True).create(dict({
+            'name': name,
+            'url': 'simulator://local',
+            'method': 'simulator',
+            'simulator_latency': 0,
+            'users_id': [(6, 0, [cls.env.uid])],
+        }, **vals))
+
+    def _past(self, seconds=3600):
+        return fields.Datetime.now() - timedelta(seconds=seconds)
+
+    def _future(self, seconds=3600):
+        return fields.Datetime.now() + timedelta(seconds=seconds)
+
+    def _enqueue(self, count=1, gateway=None, **vals):
+        """Create `count` queue rows due for dispatch."""
+        gateway = self.gateway if gateway is None else gateway
+        return self.queue_obj.create([dict({
+            'name': 'Test SMS',
+            'msg': 'Test message %d' % i,
+            'mobile': '216%08d' % i,
+            'gateway_id': gateway.id,
+            'scheduled_at': self._past(),
+        }, **vals) for i in range(count)])
+
+    def _claim(self, count, lease_owner='test-run'):
+        return self.queue_obj._claim_pending(self.gateway, count, lease_owner)
+
+    def _sms_data(self, mobile='21612345678', text='Test message'):
+        """Stand-in for the wizard records passed to send_msg."""
+        return SimpleNamespace(gateway=self.gateway, mobile_to=mobile, text=text)
+
+
+class SMSRuntimeCase(SMSGatewayCase):
+    """Gateway case for the runtime counters.
+
+    The counters are written through cursors of their own, the registry test
+    mode makes them share the test transaction.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.runtime_obj = cls.env['sms.tunisiesms.runtime']
+
+    def setUp(self):
+        super().setUp()
+        self.registry.enter_test_mode(self.cr)
+        self.addCleanup(self.registry.leave_test_mode)
+
+    def _runtime(self, gateway=None):
+        """Return the runtime row of the gateway as a dict."""
+        gateway = self.gateway if gateway is None else gateway
+        self.cr.execute("""
+            SELECT tokens, quota_used, breaker_state, breaker_failures, breaker_opened_at,
+                   latency_ewma, success_ewma
+              FROM sms_tunisiesms_runtime
+             WHERE gateway_id = %s
+        """, (gateway.id,))
+        return self.cr.dictfetchone()
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+from .common import SMSRuntimeCase
+
+
+class TestCircuitBreaker(SMSRuntimeCase):
+
+    def setUp(self):
+        super().setUp()
+        self.gateway.write({'breaker_threshold': 3, 'breaker_cooldown': 60})
+
+    def test_trips_after_consecutive_failures(self):
+        self._record(False)
+        self._record(False)
+        self.assertEqual(self._breaker(), ('closed', 2))
+        self.assertEqual(self.gateway._breaker_allow(), 'closed')
+
+        self._record(False)
+        self.assertEqual(self._breaker(), ('open', 3))
+        self.assertTrue(self._runtime()['breaker_opened_at'])
+        self.assertFalse(self.gateway._breaker_allow())
+
+    def test_chunk_counts_failures_after_last_success(self):
+        self._record(False, False, True, False)
+        self.assertEqual(self._breaker(), ('closed', 1))
+
+        self._record(False, False)
+        self.assertEqual(self._breaker(), ('open', 3))
+
+    def test_chunk_ending_in_failures_trips(self):
+        self._record(True, False, False, False)
+        self.assertEqual(self._breaker(), ('open', 3))
+
+    def test_reachable_gateway_closes(self):
+        self._record(False, False, False)
+        self._record(True)
+
+        self.assertEqual(self._breaker(), ('closed', 0))
+        self.assertFalse(self._runtime()['breaker_opened_at'])
+        self.assertEqual(self.gateway._breaker_allow(), 'closed')
+
+    def test_half_open_probe(self):
+        self._record(False, False, False)
+        self._end_cooldown()
+        self.assertEqual(self.gateway._breaker_allow(), 'probe')
+        self.assertEqual(self._breaker()[0], 'half_open')
+        # The probe restarts the cooldown for everybody else
+        self.assertFalse(self.gateway._breaker_allow())
+
+        self._record(False)
+        self.assertEqual(self._breaker()[0], 'open')
+
+        self._end_cooldown()
+        self.assertEqual(self.gateway._breaker_allow(), 'probe')
+        self._record(True)
+        self.assertEqual(self._breaker(), ('closed', 0))
+
+    def test_disabled_breaker(self):
+        self.gateway.breaker_threshold = 0
+        self._record(*[False] * 10)
+
+        self.assertEqual(self._breaker(), ('closed', 0))
+        self.assertEqual(self.gateway._breaker_allow(), 'closed')
+
+    def test_routing_averages(self):
+        self.runtime_obj._record_outcomes(self.gateway, [(True, 1.0, 0.1)])
+        runtime = self._runtime()
+        self.assertAlmostEqual(runtime['latency_ewma'], 100.0)
+        self.assertAlmostEqual(runtime['success_ewma'], 1.0)
+
+        # One chunk of two samples folds like two single updates
+        self.runtime_obj._record_outcomes(self.gateway, [(True, 0.0, 0.2), (True, 0.0, 0.2)])
+        runtime = self._runtime()
+        self.assertAlmostEqual(runtime['latency_ewma'], 100.0 * 0.8 * 0.8 + 200.0 * (1 - 0.8 * 0.8))
+        self.assertAlmostEqual(runtime['success_ewma'], 0.8 * 0.8)
+
+    def _record(self, *reachable):
+        self.runtime_obj._record_outcomes(
+            self.gateway, [(ok, 1.0 if ok else 0.0, 0.05) for ok in reachable]
+        )
+
+    def _breaker(self):
+        runtime = self._runtime()
+        return runtime['breaker_state'], runtime['breaker_failures']
+
+    def _end_cooldown(self):
+        self.cr.execute("""
+            UPDATE sms_tunisiesms_runtime SET breaker_opened_at = %s WHERE gateway_id = %s
+        """, (self._past(), self.gateway.id))
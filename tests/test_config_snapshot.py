@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+from .common import SMSGatewayCase
+
+
+class TestConfigSnapshot(SMSGatewayCase):
+
+    def setUp(self):
+        super().setUp()
+        self.config_gateway = self._create_gateway('Config Gateway', tag='OLD')
+
+    def test_snapshot_is_cached(self):
+        config = self.config_gateway._get_config()
+        self.assertIs(self.config_gateway._get_config(), config)
+        self.assertEqual(config.tag, 'OLD')
+
+    def test_change_is_seen_by_own_transaction(self):
+        config = self.config_gateway._get_config()
+        self.config_gateway.tag = 'NEW'
+
+        self.assertEqual(self.config_gateway._get_config().tag, 'NEW')
+        self.assertEqual(config.tag, 'OLD')
+
+    def test_unrelated_write_keeps_cache(self):
+        self.config_gateway.write({'code': '1234'})
+        changed = self.cr.precommit.data.get('sms.tunisiesms.config_changed', ())
+        self.assertNotIn(self.config_gateway.id, changed)
+
+    def test_parameters_are_part_of_snapshot(self):
+        parms_obj = self.env['sms.tunisiesms.parms']
+        param = parms_obj.create({
+            'name': 'login', 'value': 'alice', 'type': 'user', 'gateway_id': self.config_gateway.id,
+        })
+        self.assertEqual(self.config_gateway._get_config().credentials['user'], 'alice')
+
+        param.value = 'bob'
+        self.assertEqual(self.config_gateway._get_config().credentials['user'], 'bob')
+
+        param.unlink()
+        self.assertNotIn('user', self.config_gateway._get_config().credentials)
+
+    def test_committed_change_is_keyed_on_write_date(self):
+        config = self.config_gateway._get_config()
+        # What a change committed by another worker looks like to this one
+        self.cr.execute("""
+            UPDATE sms_tunisiesms
+               SET tag = 'REMOTE', write_date = write_date + interval '1 second'
+             WHERE id = %s
+        """, (self.config_gateway.id,))
+        self.config_gateway.invalidate_cache()
+
+        self.assertIsNot(self.config_gateway._get_config(), config)
+        self.assertEqual(self.config_gateway._get_config().tag, 'REMOTE')
+
+    def test_change_keeps_other_snapshots(self):
+        other = self._create_gateway('Other Gateway')
+        cached = other._get_config()
+
+        self.config_gateway.tag = 'NEW'
+        self.env['sms.tunisiesms.parms'].create({
+            'name': 'login', 'value': 'alice', 'type': 'user', 'gateway_id': self.config_gateway.id,
+        })
+
+        self.assertIs(other._get_config(), cached)
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+from unittest.mock import patch
+
+from .common import SMSGatewayCase
+
+
+class TestOutbox(SMSGatewayCase):
+
+    @patch('odoo.addons.odoo_SMS_Module.tunisiesms.threading.Thread')
+    def test_rows_dispatched_by_one_post_commit_thread(self, thread):
+        partner = self.env['res.partner'].create({'name': 'Outbox Partner'})
+        gateway_obj = self.env['sms.tunisiesms']
+        sms = gateway_obj._outbox_msg(self._sms_data(), partner)
+        sms |= gateway_obj._outbox_msg(self._sms_data(mobile='21687654321'), partner)
+
+        self.assertEqual(set(sms.mapped('res_model')), {'res.partner'})
+        self.assertEqual(set(sms.mapped('res_id')), {partner.id})
+        self.assertEqual(set(sms.mapped('state')), {'draft'})
+        # Nothing leaves before the commit
+        self.assertFalse(thread.called)
+
+        self.cr.postcommit.run()
+
+        thread.assert_called_once()
+        self.assertEqual(thread.call_args[1]['args'], (sms.ids,))
+        thread.return_value.start.assert_called_once_with()
+        self.assertNotIn('sms.tunisiesms.outbox', self.cr.postcommit.data)
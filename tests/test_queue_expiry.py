@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+from datetime import timedelta
+
+from .common import SMSRuntimeCase
+
+
+class TestQueueExpiry(SMSRuntimeCase):
+
+    def test_validity_does_not_expire_queued_rows(self):
+        sms = self._enqueue(validity=10)
+        self.assertFalse(sms.expires_at)
+
+    def test_queue_expiry(self):
+        self.gateway.queue_expiry = 30
+        sms = self._enqueue(validity=10)
+        self.assertEqual(sms.expires_at, sms.scheduled_at + timedelta(minutes=30))
+
+        sms.expires_at = self._past(60)
+        self.assertEqual(self.queue_obj._expire_overdue(self.gateway), 1)
+        self.assertEqual(sms.state, 'expired')
+
+    def test_open_breaker_holds_rows_without_expiring_them(self):
+        self.gateway.breaker_threshold = 1
+        self.runtime_obj._record_outcomes(self.gateway, [(False, 0.0, 1.0)])
+        sms = self._enqueue(expires_at=self._past(60))
+
+        self.assertEqual(self.gateway._drain_queue('test-run'), 0)
+        self.assertEqual(sms.state, 'draft')
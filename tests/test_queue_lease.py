@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+from .common import SMSGatewayCase
+
+
+class TestQueueLease(SMSGatewayCase):
+
+    def test_claim_is_exclusive(self):
+        queued = self._enqueue(5)
+        first = self._claim(3, 'run-a')
+        second = self._claim(3, 'run-b')
+
+        self.assertEqual(len(first), 3)
+        self.assertEqual(second, queued - first)
+        self.assertEqual(set(first.mapped('state')), {'sending'})
+        self.assertEqual(set(first.mapped('lease_owner')), {'run-a'})
+        self.assertEqual(set(second.mapped('lease_owner')), {'run-b'})
+        self.assertFalse(self._claim(3, 'run-c'))
+
+    def test_claim_order_and_due_rows(self):
+        normal = self._enqueue()
+        urgent = self._enqueue(priority='3')
+        deferred = self._enqueue(scheduled_at=self._future())
+        backing_off = self._enqueue(state='error', next_attempt_at=self._future())
+
+        claimed = self._claim(1)
+        self.assertEqual(claimed, urgent)
+        claimed |= self._claim(10)
+        self.assertEqual(claimed, normal | urgent)
+        self.assertEqual(deferred.state, 'draft')
+        self.assertEqual(backing_off.state, 'error')
+
+    def test_claim_restricted_to_ids(self):
+        queued = self._enqueue(3)
+        claimed = self.queue_obj._claim_pending(self.gateway, 10, 'outbox', ids=queued[:2].ids)
+        self.assertEqual(claimed, queued[:2])
+        self.assertEqual(queued[2].state, 'draft')
+
+    def test_renew_extends_own_lease_only(self):
+        self.gateway.lease_duration = 7200
+        mine = self._claim_rows(3, 'run-a')
+        theirs = self._claim_rows(1, 'run-b')
+        (mine | theirs).write({'lease_expires_at': self._past(60)})
+        mine[0]._mark_sent()
+
+        renewed = self.queue_obj._renew_leases(self.gateway, 'run-a', (mine | theirs).ids)
+
+        self.assertEqual(renewed, 2)
+        for sms in mine[1:]:
+            self.assertGreater(sms.lease_expires_at, self._future(3600))
+        self.assertLess(theirs.lease_expires_at, self._past(30))
+
+    def test_unrouted_rows_fail(self):
+        routed = self._enqueue()
+        unrouted = self.queue_obj.create({'name': 'Test SMS', 'msg': 'No gateway', 'mobile': '21600000000'})
+
+        self.assertEqual(self.queue_obj._fail_unrouted(), 1)
+        self.assertEqual(unrouted.state, 'error')
+        self.assertTrue(unrouted.error)
+        self.assertEqual(routed.state, 'draft')
+
+    def _claim_rows(self, count, lease_owner):
+        queued = self._enqueue(count)
+        return self.queue_obj._claim_pending(self.gateway, count, lease_owner, ids=queued.ids)
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+from .common import SMSGatewayCase
+
+
+class TestQueueReaper(SMSGatewayCase):
+
+    def setUp(self):
+        super().setUp()
+        self.gateway.retry_max_attempts = 3
+
+    def test_expired_lease_is_reclaimed(self):
+        self._enqueue(2)
+        expired, alive = self._claim(2, 'crashed-run')
+        expired.lease_expires_at = self._past()
+        alive.lease_expires_at = self._future()
+
+        self.queue_obj._reap_expired_leases()
+
+        self.assertEqual(expired.state, 'draft')
+        self.assertEqual(expired.attempt_count, 1)
+        self.assertFalse(expired.lease_owner)
+        self.assertFalse(expired.lease_expires_at)
+        self.assertTrue(expired.error)
+        self.assertEqual(alive.state, 'sending')
+        self.assertEqual(alive.lease_owner, 'crashed-run')
+        self.assertEqual(self._claim(2, 'next-run'), expired)
+
+    def test_message_killing_its_worker_is_dead_lettered(self):
+        sms = self._enqueue(attempt_count=2)
+        self._claim(1)
+        sms.lease_expires_at = self._past()
+
+        self.queue_obj._reap_expired_leases()
+
+        self.assertEqual(sms.state, 'dead')
+        self.assertEqual(sms.attempt_count, 3)
+
+    def test_renewed_lease_is_not_reclaimed(self):
+        self.gateway.lease_duration = 7200
+        sms = self._enqueue()
+        self._claim(1)
+        sms.lease_expires_at = self._past()
+        self.queue_obj._renew_leases(self.gateway, 'test-run', sms.ids)
+
+        self.queue_obj._reap_expired_leases()
+
+        self.assertEqual(sms.state, 'sending')
+        self.assertEqual(sms.attempt_count, 0)
+
+    def test_row_of_removed_gateway_is_reclaimed(self):
+        sms = self._enqueue()
+        self._claim(1)
+        sms.write({'gateway_id': False, 'lease_expires_at': self._past()})
+
+        self.queue_obj._reap_expired_leases()
+        self.assertEqual(sms.state, 'draft')
+        self.assertEqual(sms.attempt_count, 1)
+
+        self.queue_obj._fail_unrouted()
+        self.assertEqual(sms.state, 'error')
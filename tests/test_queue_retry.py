@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+from odoo import fields
+
+from odoo.addons.odoo_SMS_Module.tunisiesms import GatewayResponseError
+
+from .common import SMSGatewayCase
+
+
+class TestQueueRetry(SMSGatewayCase):
+
+    def setUp(self):
+        super().setUp()
+        self.gateway.write({'retry_max_attempts': 5, 'retry_base_delay': 60, 'retry_max_delay': 600})
+
+    def test_backoff_doubles_with_jitter(self):
+        self.gateway.retry_max_attempts = 10
+        sms = self._enqueue()
+        for attempt, delay in enumerate((60, 120, 240, 480, 600, 600), 1):
+            before = fields.Datetime.now()
+            sms._schedule_retry(ConnectionError('timeout'))
+            wait = (sms.next_attempt_at - before).total_seconds()
+
+            self.assertEqual(sms.state, 'error')
+            self.assertEqual(sms.attempt_count, attempt)
+            self.assertTrue(delay / 2 - 1 <= wait <= delay + 1, (attempt, wait))
+
+    def test_dead_letter_after_last_attempt(self):
+        sms = self._enqueue(attempt_count=4)
+        sms._schedule_retry(ConnectionError('timeout'))
+
+        self.assertEqual(sms.state, 'dead')
+        self.assertEqual(sms.attempt_count, 5)
+        self.assertFalse(sms.next_attempt_at)
+
+    def test_permanent_error_is_not_retried(self):
+        sms = self._enqueue()
+        sms._schedule_retry(GatewayResponseError('401', 'Invalid key'))
+
+        self.assertEqual(sms.state, 'dead')
+        self.assertEqual(sms.attempt_count, 1)
+
+    def test_failover_retries_at_once(self):
+        other = self._create_gateway('Failover Gateway')
+        sms = self._enqueue()
+        sms._schedule_retry(GatewayResponseError('500', 'Provider error'), failover=other)
+
+        self.assertEqual(sms.state, 'draft')
+        self.assertEqual(sms.gateway_id, other)
+        self.assertFalse(sms.next_attempt_at)
+
+    def test_retry_is_claimed_once_due(self):
+        sms = self._enqueue()
+        self._claim(1)
+        sms._schedule_retry(ConnectionError('timeout'))
+        self.assertFalse(self._claim(1))
+
+        sms.next_attempt_at = self._past()
+        self.assertEqual(self._claim(1), sms)
+
+    def test_requeue_gives_fresh_attempts(self):
+        sms = self._enqueue(attempt_count=4)
+        sms._schedule_retry(ConnectionError('timeout'))
+        sms.action_requeue()
+
+        self.assertEqual(sms.state, 'draft')
+        self.assertEqual(sms.attempt_count, 0)
+        self.assertFalse(sms.error)
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+from .common import SMSRuntimeCase
+
+
+class TestRateLimiter(SMSRuntimeCase):
+
+    def test_daily_quota(self):
+        self.gateway.daily_quota = 5
+
+        self.assertEqual(self.runtime_obj._take_tokens(self.gateway, 3), (3, 0.0))
+        self.assertEqual(self.runtime_obj._take_tokens(self.gateway, 3), (2, 0.0))
+        self.assertEqual(self.runtime_obj._take_tokens(self.gateway, 1), (0, None))
+
+        self.runtime_obj._return_tokens(self.gateway, 2)
+        self.assertEqual(self.runtime_obj._take_tokens(self.gateway, 5), (2, 0.0))
+        self.assertEqual(self._runtime()['quota_used'], 5)
+
+    def test_daily_quota_resets_next_day(self):
+        self.gateway.daily_quota = 5
+        self.runtime_obj._take_tokens(self.gateway, 5)
+        self.cr.execute("""
+            UPDATE sms_tunisiesms_runtime SET quota_day = quota_day - 1 WHERE gateway_id = %s
+        """, (self.gateway.id,))
+
+        self.assertEqual(self.runtime_obj._take_tokens(self.gateway, 3), (3, 0.0))
+
+    def test_token_bucket(self):
+        # 0.45 tokens per second with the headroom, the bucket holds one
+        self.gateway.rate_limit = 0.5
+
+        granted, wait = self.runtime_obj._take_tokens(self.gateway, 1)
+        self.assertEqual(granted, 0)
+        self.assertTrue(0 < wait <= 1 / 0.45)
+
+        self._fill_bucket(1)
+        self.assertEqual(self.runtime_obj._take_tokens(self.gateway, 5), (1, 0.0))
+        granted, wait = self.runtime_obj._take_tokens(self.gateway, 5)
+        self.assertEqual(granted, 0)
+        self.assertGreater(wait, 0)
+
+        self.runtime_obj._return_tokens(self.gateway, 3)
+        self.assertEqual(self.runtime_obj._take_tokens(self.gateway, 5)[0], 1)
+
+    def _fill_bucket(self, tokens):
+        self.cr.execute("""
+            UPDATE sms_tunisiesms_runtime
+               SET tokens = %s, tokens_updated_at = clock_timestamp() at time zone 'UTC'
+             WHERE gateway_id = %s
+        """, (tokens, self.gateway.id))
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+from unittest.mock import patch
+
+from .common import SMSGatewayCase
+
+
+class TestSendModes(SMSGatewayCase):
+
+    def setUp(self):
+        super().setUp()
+        self.gateway.send_mode = 'queue'
+        self.gateway_obj = self.env['sms.tunisiesms']
+
+    def test_queue_mode_never_sends(self):
+        with patch.object(type(self.gateway_obj), '_send_direct', side_effect=AssertionError('network call')):
+            self.assertTrue(self.gateway.send_msg(self._sms_data(text='Queued only')))
+
+        queued = self._queued()
+        self.assertEqual(len(queued), 1)
+        self.assertEqual(queued.state, 'draft')
+        self.assertEqual(queued.msg, 'Queued only')
+
+    def test_queued_row_follows_caller_transaction(self):
+        with self.assertRaises(ValueError), self.cr.savepoint():
+            self.gateway.send_msg(self._sms_data())
+            self.assertTrue(self._queued())
+            raise ValueError('caller rolls back')
+
+        self.assertFalse(self._queued())
+
+    def _queued(self):
+        return self.queue_obj.search([('gateway_id', '=', self.gateway.id)])
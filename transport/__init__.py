@@ -0,0 +1,10 @@
+from . import async_http
+from . import base
+from . import http
+from . import http_pool
+from . import simulator
+from . import smpp
+from . import smpp_pdu
+from . import soap
+from . import soap_pool
+from . import xml_response
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+Transport registry
+==================
+A transport carries messages between a gateway and its provider.
+Transports are registered under a value of the gateway `method` selection,
+adding a provider only takes a new Transport subclass registered here.
+They are built on the cached GatewayConfig snapshot of the gateway and
+never read the gateway record itself.
+
+Transports raise an exception when the provider cannot be reached and
+return a SendResult for every answer it gave, error statuses included.
+They never write to the database, the gateway model logs the results.
+"""
+
+from collections import namedtuple
+
+# A message as handed to a transport
+OutgoingMessage = namedtuple('OutgoingMessage', [
+    'mobile', 'text', 'validity', 'classes', 'deferred', 'priority', 'coding', 'nostop', 'tag',
+])
+
+# The provider answer for one recipient
+SendResult = namedtuple('SendResult', ['message_id', 'status_code', 'status_mobile', 'status_msg'])
+
+# Read-only snapshot of a gateway record, see sms.tunisiesms._get_config.
+# `credentials` maps the parameter types to their value and `order_templates`
+# maps the sale order states to (template, enabled).
+GatewayConfig = namedtuple('GatewayConfig', [
+    'id', 'dbname', 'name', 'method', 'url', 'write_date',
+    'sender_url_params', 'key_url_params', 'credentials',
+    'validity', 'classes', 'deferred', 'priority', 'coding', 'nostop', 'tag', 'char_limit',
+    'send_mode', 'batch_recipients',
+    'http_pool_size', 'http_connect_timeout', 'http_read_timeout',
+    'soap_client_ttl',
+    'smpp_window', 'smpp_enquire_link_interval', 'smpp_response_timeout', 'smpp_system_type',
+    'simulator_latency', 'simulator_error_rate', 'simulator_error_codes', 'simulator_throughput',
+    'auto_sms_enabled', 'auto_sms_on_create', 'auto_sms_on_status_change',
+    'order_templates', 'partner_create_template', 'partner_create_enabled',
+    'dlr_mode', 'dlr_webhook_secret', 'dlr_poll_concurrency', 'dlr_batch_size',
+])
+
+_registry = {}
+
+
+def register(method):
+    """Class decorator registering a transport for gateway `method`."""
+    def decorator(cls):
+        cls.method = method
+        _registry[method] = cls
+        return cls
+    return decorator
+
+
+def get_transport(gateway):
+    """Return the transport of the `gateway` record, or None if its method has none."""
+    config = gateway._get_config()
+    transport_class = _registry.get(config.method)
+    return transport_class(config) if transport_class else None
+
+
+class Transport(object):
+    """Interface shared by every transport."""
+
+    method = None
+
+    # Several recipients can share one provider request
+    supports_batch = False
+
+    # Requests can be sent by the asyncio dispatcher (see async_http)
+    supports_async = False
+
+    def __init__(self, config):
+        self.config = config
+
+    def send(self, message):
+        """Send `message` and return the provider's SendResult."""
+        raise NotImplementedError()
+
+    def send_batch(self, mobiles, message):
+        """Send `message` to every mobile and return {mobile: SendResult}.
+
+        Transports without batch support send one request per recipient.
+        """
+        return {mobile: self.send(message._replace(mobile=mobile)) for mobile in mobiles}
+
+    def fetch_dlr(self, message_id):
+        """Return the delivery report of `message_id`, None if not available."""
+        return None
+
+    def fetch_dlr_batch(self, message_ids):
+        """Return {message_id: report} of the reports available for `message_ids`.
+
+        Transports without a multi-message query ask one message at a time.
+        """
+        reports = {}
+        for message_id in message_ids:
+            report = self.fetch_dlr(message_id)
+            if report:
+                reports[message_id] = report
+        return reports
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+HTTP transport
+==============
+The Tunisie SMS HTTP API: one GET per request through the pooled
+keep-alive session of the gateway, XML status documents in return.
+"""
+
+import urllib.parse
+
+from odoo import _
+
+from . import http_pool, xml_response
+from .base import SendResult, Transport, register
+
+# Separator of the recipients of a multi-recipient request
+BATCH_MOBILE_SEPARATOR = ','
+
+
+def mobile_key(mobile):
+    """Reduce a mobile number to its digits without the international prefix."""
+    digits = ''.join(char for char in mobile or '' if char.isdigit())
+    return digits[2:] if digits.startswith('00') else digits
+
+
+@register('http')
+class HttpTransport(Transport):
+
+    supports_batch = True
+    supports_async = True
+
+    def send_url(self, mobile, text):
+        """Build the URL sending `text` to `mobile`, several mobiles comma separated."""
+        params = {
+            'mobile': mobile,
+            'sms': text,
+            'fct': 'sms',
+            'sender': self.config.sender_url_params,
+            'key': self.config.key_url_params
+        }
+        return f"{self.config.url}?{urllib.parse.urlencode(params)}"
+
+    def get(self, url):
+        """GET `url` through the pooled session of the gateway and return the body."""
+        config = self.config
+        session = http_pool.get_session((config.dbname, config.id), config.url, config.http_pool_size)
+        response = session.get(url, timeout=(config.http_connect_timeout, config.http_read_timeout))
+        response.raise_for_status()
+        return response.content
+
+    def send(self, message):
+        return self.parse_response(self.get(self.send_url(message.mobile, message.text)))
+
+    def send_batch(self, mobiles, message):
+        statuses = self.parse_batch_response(self.get(self.send_url(BATCH_MOBILE_SEPARATOR.join(mobiles), message.text)))
+        # The gateway may echo '216...' for '+216...' or '00216...'
+        by_number = {mobile_key(status_mobile): result for status_mobile, result in statuses.items()}
+        # Statuses come back in request order, used when the echoed numbers do not match
+        in_order = list(statuses.values()) if len(statuses) == len(mobiles) else None
+
+        results = {}
+        for index, mobile in enumerate(mobiles):
+            if mobile_key(mobile) in by_number:
+                results[mobile] = by_number[mobile_key(mobile)]
+            elif in_order:
+                results[mobile] = in_order[index]
+            else:
+                results[mobile] = SendResult('', 'error', mobile, _('No status returned for this recipient'))
+        return results
+
+    def dlr_url(self, message_id):
+        """Build the delivery report URL of `message_id`, several ids comma separated."""
+        params = {
+            'fct': 'dlr',
+            'key': self.config.key_url_params,
+            'msg_id': message_id
+        }
+        return f"{self.config.url}?{urllib.parse.urlencode(params)}"
+
+    def fetch_dlr(self, message_id):
+        return xml_response.parse_dlr_response(self.get(self.dlr_url(message_id)))
+
+    def fetch_dlr_batch(self, message_ids):
+        if len(message_ids) < 2:
+            return super().fetch_dlr_batch(message_ids)
+        # One <message> element per report, unknown ids are left out
+        reports = xml_response.parse_dlr_reports(self.get(self.dlr_url(BATCH_MOBILE_SEPARATOR.join(message_ids))))
+        return {message_id: reports[message_id] for message_id in message_ids if reports.get(message_id)}
+
+    @staticmethod
+    def parse_response(body):
+        """Parse the XML status document of a single recipient request."""
+        return xml_response.parse_send_response(body)
+
+    @staticmethod
+    def parse_batch_response(body):
+        """Parse a multi-recipient status document into {mobile: SendResult}."""
+        return xml_response.parse_batch_response(body)
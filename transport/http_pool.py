@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""
+HTTP session pool
+=================
+Process-wide keep-alive sessions, one per gateway, shared by the direct
+send, the queue dispatcher and the delivery report polling. A session is
+rebuilt when the gateway URL or pool size it was built for changes.
+"""
+
+import logging
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+_logger = logging.getLogger(__name__)
+
+_sessions = {}
+_lock = threading.Lock()
+
+
+def get_session(key, url, pool_size=10):
+    """Return the pooled session of gateway `key`, building it if needed.
+
+    `key` identifies the gateway across databases, e.g. (dbname, gateway id).
+    """
+    with _lock:
+        entry = _sessions.get(key)
+        if entry and entry[0] == (url, pool_size):
+            return entry[1]
+
+        if entry:
+            _logger.info("Gateway %s settings changed, rebuilding its HTTP session", key)
+            entry[1].close()
+
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(pool_size, 1))
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        _sessions[key] = ((url, pool_size), session)
+        return session
+
+
+def discard(key):
+    """Close and forget the pooled session of gateway `key`."""
+    with _lock:
+        entry = _sessions.pop(key, None)
+    if entry:
+        entry[1].close()
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+Gateway simulator
+=================
+In-process stand-in for a provider, selected by the 'simulator' gateway
+method. It answers like the real gateway after a configurable latency,
+with a configurable mix of error statuses and a throughput cap, so the
+whole pipeline can be load tested offline. Nothing leaves the process.
+"""
+
+import random
+import socket
+import threading
+import time
+import uuid
+
+from .base import SendResult, Transport, register
+
+# Status code simulating a request that never gets an answer
+TIMEOUT_CODE = 'timeout'
+
+# Next free send slot per simulated gateway, shared by every thread
+_next_slot = {}
+_lock = threading.Lock()
+
+
+@register('simulator')
+class SimulatorTransport(Transport):
+
+    supports_batch = True
+
+    def _key(self):
+        return self.config.dbname, self.config.id
+
+    def _wait_for_slots(self, count):
+        """Block until the throughput cap lets `count` more messages through."""
+        throughput = self.config.simulator_throughput
+        if throughput <= 0:
+            return
+
+        with _lock:
+            now = time.monotonic()
+            start = max(now, _next_slot.get(self._key(), now))
+            _next_slot[self._key()] = start + count / throughput
+        if start > now:
+            time.sleep(start - now)
+
+    def _error_codes(self):
+        codes = self.config.simulator_error_codes or ''
+        return [code.strip() for code in codes.split(',') if code.strip()]
+
+    def _request(self, count):
+        """Simulate one provider round trip carrying `count` messages."""
+        self._wait_for_slots(count)
+        time.sleep(max(self.config.simulator_latency, 0) / 1000.0)
+
+    def _result(self, mobile):
+        """Draw the provider answer for one recipient."""
+        codes = self._error_codes()
+        if codes and random.random() * 100 < self.config.simulator_error_rate:
+            code = random.choice(codes)
+            if code == TIMEOUT_CODE:
+                raise socket.timeout('Simulated gateway timeout')
+            return SendResult('', code, mobile, 'Simulated error %s' % code)
+        return SendResult('SIM%s' % uuid.uuid4().hex[:12], '200', mobile, 'Simulated send')
+
+    def send(self, message):
+        self._request(1)
+        return self._result(message.mobile)
+
+    def send_batch(self, mobiles, message):
+        self._request(len(mobiles))
+        return {mobile: self._result(mobile) for mobile in mobiles}
+
+    def fetch_dlr(self, message_id):
+        time.sleep(max(self.config.simulator_latency, 0) / 1000.0)
+        return 'DELIVRD' if message_id.startswith('SIM') else None
+
+    def fetch_dlr_batch(self, message_ids):
+        # One simulated request whatever the number of ids
+        time.sleep(max(self.config.simulator_latency, 0) / 1000.0)
+        return {message_id: 'DELIVRD' for message_id in message_ids if message_id.startswith('SIM')}
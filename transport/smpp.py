@@ -0,0 +1,397 @@
+# -*- coding: utf-8 -*-
+"""
+SMPP transport
+==============
+Native SMPP v3.4 client selected by the 'smpp_native' gateway method (the
+'smpp' method is the Tunisie SMS SOAP API, see soap). Each Odoo process
+keeps one bind_transceiver session per gateway, shared by every thread:
+submit_sm PDUs are pipelined up to the gateway window, idle sessions are
+kept alive with enquire_link and delivery receipts arriving as deliver_sm
+are written to the SMS history from a background thread.
+"""
+
+import logging
+import socket
+import threading
+import time
+import urllib.parse
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+from odoo import SUPERUSER_ID, _, api
+from odoo.exceptions import UserError
+from odoo.modules.registry import Registry
+
+from . import smpp_pdu
+from .base import SendResult, Transport, register
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 2775
+
+# Housekeeping tick of a session: receipt flush and keep-alive check
+HOUSEKEEPING_INTERVAL = 1.0
+
+# Receipts not matching a history entry yet are retried for this long,
+# a receipt may arrive before the transaction logging the send commits
+RECEIPT_MAX_AGE = 300
+
+# Receipts kept for fetch_dlr once written to the history
+RECEIPT_CACHE_SIZE = 10000
+
+# SMPP command status to the gateway status codes used by the module
+STATUS_CODES = {
+    smpp_pdu.ESME_ROK: '200',
+    smpp_pdu.ESME_RINVMSGLEN: '440',
+    smpp_pdu.ESME_RINVSRCADR: '442',
+    smpp_pdu.ESME_RINVDSTADR: '441',
+    smpp_pdu.ESME_RINVPASWD: '401',
+    smpp_pdu.ESME_RINVSYSID: '401',
+    smpp_pdu.ESME_RTHROTTLED: '420',
+    smpp_pdu.ESME_RMSGQFUL: '500',
+    smpp_pdu.ESME_RSYSERR: '500',
+}
+
+
+class SmppError(Exception):
+    """The SMPP session failed or the SMSC refused a request."""
+
+
+class SmppSession(object):
+    """A bound transceiver session to an SMSC, safe to share between threads."""
+
+    def __init__(self, host, port, system_id, password, system_type='', window=10,
+                 enquire_link_interval=30, timeout=30, on_receipts=None):
+        self.host = host
+        self.port = port
+        self.system_id = system_id
+        self.password = password
+        self.system_type = system_type
+        self.enquire_link_interval = enquire_link_interval
+        self.timeout = timeout
+        self.on_receipts = on_receipts
+
+        self.receipts = OrderedDict()
+        self._pending_receipts = []
+        self._window = threading.Semaphore(max(window, 1))
+        self._pending = {}
+        self._sequence = 0
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._socket = None
+        self._closed = threading.Event()
+        self._last_activity = time.monotonic()
+        self._enquire_link = None
+        self._unbinding = False
+
+    @property
+    def alive(self):
+        return self._socket is not None and not self._closed.is_set()
+
+    def open(self):
+        """Connect and bind as a transceiver, raise SmppError if refused."""
+        self._socket = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._socket.settimeout(None)
+        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        threading.Thread(target=self._read_loop, name='smpp_reader', daemon=True).start()
+
+        body = smpp_pdu.bind_body(self.system_id, self.password, self.system_type)
+        status, _body = self._wait(self._request(smpp_pdu.BIND_TRANSCEIVER, body))
+        if status != smpp_pdu.ESME_ROK:
+            self.close()
+            raise SmppError('bind_transceiver refused with status 0x%08X' % status)
+
+        threading.Thread(target=self._housekeeping_loop, name='smpp_housekeeping', daemon=True).start()
+        _logger.info("SMPP session bound to %s:%s as %s", self.host, self.port, self.system_id)
+        return self
+
+    def close(self):
+        """Unbind if possible, then drop the connection and fail pending requests."""
+        if self._closed.is_set():
+            return
+        if self._socket is not None:
+            self._unbinding = True
+            try:
+                self._send(smpp_pdu.UNBIND, self._next_sequence())
+            except OSError:
+                pass
+        self._shutdown(SmppError('SMPP session closed'))
+
+    def submit(self, source, destination, text, priority=0):
+        """Submit a message without waiting for the answer.
+
+        Blocks while the window is full. Returns a Future resolved with
+        (command status, message id).
+        """
+        body = smpp_pdu.submit_sm_body(source, destination, text, priority)
+        if not self._window.acquire(timeout=self.timeout):
+            raise SmppError('SMPP window still full after %s seconds' % self.timeout)
+        return self._request(smpp_pdu.SUBMIT_SM, body, windowed=True)
+
+    def result(self, future):
+        """Wait for a submit Future and return (command status, message id)."""
+        status, body = self._wait(future)
+        message_id = smpp_pdu.read_cstring(body, 0)[0] if status == smpp_pdu.ESME_ROK and body else ''
+        return status, message_id
+
+    def pop_receipt(self, message_id):
+        with self._lock:
+            return self.receipts.pop(message_id, None)
+
+    def _next_sequence(self):
+        with self._lock:
+            self._sequence = self._sequence % 0x7FFFFFFF + 1
+            return self._sequence
+
+    def _request(self, command_id, body, windowed=False):
+        future = Future()
+        future.windowed = windowed
+        sequence = self._next_sequence()
+        with self._lock:
+            self._pending[sequence] = future
+        try:
+            self._send(command_id, sequence, body)
+        except (OSError, SmppError) as e:
+            # Fails every pending request, this one included
+            self._shutdown(SmppError(str(e)))
+        return future
+
+    def _wait(self, future):
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            raise SmppError('No SMPP response after %s seconds' % self.timeout)
+
+    def _send(self, command_id, sequence, body=b'', status=smpp_pdu.ESME_ROK):
+        if self._closed.is_set():
+            raise SmppError('SMPP session closed')
+        with self._write_lock:
+            self._socket.sendall(smpp_pdu.encode(command_id, sequence, body, status))
+        self._last_activity = time.monotonic()
+
+    def _resolve(self, sequence, status, body):
+        with self._lock:
+            future = self._pending.pop(sequence, None)
+        if future is None:
+            return
+        if future.windowed:
+            self._window.release()
+        future.set_result((status, body))
+
+    def _shutdown(self, error):
+        self._closed.set()
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if future.windowed:
+                self._window.release()
+            future.set_exception(error)
+        if self._socket is not None:
+            try:
+                self._socket.close()
+            except OSError:
+                pass
+        self._flush_receipts()
+
+    def _read_loop(self):
+        reader = smpp_pdu.PduReader()
+        try:
+            while not self._closed.is_set():
+                data = self._socket.recv(65536)
+                if not data:
+                    raise SmppError('Connection closed by the SMSC')
+                for command_id, status, sequence, body in reader.feed(data):
+                    self._handle(command_id, status, sequence, body)
+        except (OSError, ValueError, SmppError) as e:
+            if not self._closed.is_set() and not self._unbinding:
+                _logger.warning("SMPP session to %s:%s lost: %s", self.host, self.port, str(e))
+            self._shutdown(SmppError(str(e)))
+
+    def _handle(self, command_id, status, sequence, body):
+        if command_id & smpp_pdu.RESPONSE_MASK:
+            # generic_nack answers a request we sent, like any other response
+            self._resolve(sequence, status, body)
+        elif command_id == smpp_pdu.DELIVER_SM:
+            self._send(smpp_pdu.DELIVER_SM | smpp_pdu.RESPONSE_MASK, sequence, smpp_pdu.cstring(''))
+            receipt = smpp_pdu.parse_receipt(smpp_pdu.parse_sm(body))
+            if receipt:
+                with self._lock:
+                    self._pending_receipts.append(receipt + (time.monotonic(),))
+        elif command_id == smpp_pdu.ENQUIRE_LINK:
+            self._send(smpp_pdu.ENQUIRE_LINK | smpp_pdu.RESPONSE_MASK, sequence)
+        elif command_id == smpp_pdu.UNBIND:
+            self._send(smpp_pdu.UNBIND | smpp_pdu.RESPONSE_MASK, sequence)
+            raise SmppError('Unbound by the SMSC')
+        else:
+            self._send(smpp_pdu.GENERIC_NACK, sequence, status=0x00000003)
+
+    def _housekeeping_loop(self):
+        while not self._closed.wait(HOUSEKEEPING_INTERVAL):
+            self._flush_receipts()
+
+            now = time.monotonic()
+            if self._enquire_link:
+                future, sent_at = self._enquire_link
+                if future.done():
+                    self._enquire_link = None
+                elif now - sent_at > self.timeout:
+                    _logger.warning("SMSC %s:%s stopped answering enquire_link", self.host, self.port)
+                    self._shutdown(SmppError('enquire_link unanswered'))
+            elif now - self._last_activity >= self.enquire_link_interval:
+                self._enquire_link = (self._request(smpp_pdu.ENQUIRE_LINK, b''), now)
+
+    def _flush_receipts(self):
+        """Hand the buffered receipts to `on_receipts` and keep the ones it did not store."""
+        with self._lock:
+            receipts, self._pending_receipts = self._pending_receipts, []
+        if not receipts:
+            return
+
+        stored = set()
+        if self.on_receipts:
+            try:
+                stored = self.on_receipts({message_id: stat for message_id, stat, _at in receipts})
+            except Exception as e:
+                _logger.error("Failed to store %d SMPP delivery receipts: %s", len(receipts), str(e))
+
+        now = time.monotonic()
+        with self._lock:
+            for message_id, stat, received_at in receipts:
+                self.receipts[message_id] = stat
+                if message_id not in stored and now - received_at < RECEIPT_MAX_AGE:
+                    self._pending_receipts.append((message_id, stat, received_at))
+            while len(self.receipts) > RECEIPT_CACHE_SIZE:
+                self.receipts.popitem(last=False)
+
+
+_sessions = {}
+_bind_locks = {}
+_sessions_lock = threading.Lock()
+
+
+def _live_session(key, signature):
+    entry = _sessions.get(key)
+    if entry and entry[0] == signature and entry[1].alive:
+        return entry[1]
+    return None
+
+
+def get_session(key, signature, factory):
+    """Return the bound session of gateway `key`, binding a new one if needed.
+
+    The session is rebound when it died or when `signature`, the settings
+    it was bound with, changed. Binding holds a lock of the gateway only, a
+    slow SMSC never blocks the sessions of other gateways.
+    """
+    with _sessions_lock:
+        session = _live_session(key, signature)
+        if session:
+            return session
+        bind_lock = _bind_locks.setdefault(key, threading.Lock())
+
+    with bind_lock:
+        # Another thread may have bound the session while we waited
+        with _sessions_lock:
+            session = _live_session(key, signature)
+            if session:
+                return session
+            entry = _sessions.pop(key, None)
+        if entry:
+            entry[1].close()
+
+        session = factory().open()
+        with _sessions_lock:
+            _sessions[key] = (signature, session)
+        return session
+
+
+def find_session(key):
+    """Return the live session of gateway `key` without binding one."""
+    entry = _sessions.get(key)
+    return entry[1] if entry and entry[1].alive else None
+
+
+def _store_receipts(dbname, gateway_id, receipts):
+    """Write delivery receipts to the history, return the message ids matched."""
+    with api.Environment.manage(), Registry(dbname).cursor() as cr:
+        env = api.Environment(cr, SUPERUSER_ID, {})
+        return env['sms.tunisiesms.history']._apply_delivery_reports(gateway_id, receipts)
+
+
+@register('smpp_native')
+class SmppTransport(Transport):
+
+    supports_batch = True
+
+    def _key(self):
+        return self.config.dbname, self.config.id
+
+    def _get_credentials(self):
+        """Read system id, password and sender from the gateway parameters."""
+        credentials = self.config.credentials
+        if not all(credentials.get(key) for key in ('user', 'password', 'sender')):
+            raise UserError(_('SMPP parameters not properly configured'))
+        return credentials
+
+    def _session(self):
+        config = self.config
+        credentials = self._get_credentials()
+        address = urllib.parse.urlsplit(config.url if '//' in config.url else '//' + config.url)
+        if not address.hostname:
+            raise UserError(_('Invalid SMSC address: %s') % config.url)
+
+        dbname, gateway_id = self._key()
+        signature = (config.url, config.write_date, credentials['user'], credentials['password'])
+
+        def factory():
+            return SmppSession(
+                address.hostname, address.port or DEFAULT_PORT,
+                credentials['user'], credentials['password'],
+                system_type=config.smpp_system_type or '',
+                window=config.smpp_window,
+                enquire_link_interval=config.smpp_enquire_link_interval,
+                timeout=config.smpp_response_timeout,
+                on_receipts=lambda receipts: _store_receipts(dbname, gateway_id, receipts),
+            )
+        return get_session(self._key(), signature, factory), credentials['sender']
+
+    def send(self, message):
+        return self.send_batch([message.mobile], message)[message.mobile]
+
+    def send_batch(self, mobiles, message):
+        session, sender = self._session()
+
+        # Every submit_sm is on the wire before the first answer is awaited
+        futures = []
+        for mobile in mobiles:
+            try:
+                futures.append((mobile, session.submit(sender, mobile, message.text, message.priority)))
+            except SmppError as e:
+                futures.append((mobile, e))
+
+        results = {}
+        errors = []
+        for mobile, future in futures:
+            try:
+                if isinstance(future, SmppError):
+                    raise future
+                status, message_id = session.result(future)
+            except SmppError as e:
+                errors.append(e)
+                results[mobile] = SendResult('', 'error', mobile, str(e))
+                continue
+            results[mobile] = SendResult(
+                message_id, STATUS_CODES.get(status, '500'), mobile,
+                'SMPP SMS sent successfully' if status == smpp_pdu.ESME_ROK
+                else 'SMPP command status 0x%08X' % status
+            )
+
+        # Nothing reached the SMSC: a transport failure, not per-recipient errors
+        if len(errors) == len(mobiles):
+            raise errors[0]
+        return results
+
+    def fetch_dlr(self, message_id):
+        # Receipts arrive on the session, only the process holding it knows them
+        session = find_session(self._key())
+        return session.pop_receipt(message_id) if session else None
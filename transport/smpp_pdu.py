@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+SMPP v3.4 PDUs
+==============
+Encoding and decoding of the few PDUs the SMPP transport exchanges with
+the SMSC: binds, submit_sm, deliver_sm, enquire_link, unbind and their
+responses. Only the standard library is used.
+"""
+
+import re
+import struct
+
+BIND_TRANSCEIVER = 0x00000009
+SUBMIT_SM = 0x00000004
+DELIVER_SM = 0x00000005
+UNBIND = 0x00000006
+ENQUIRE_LINK = 0x00000015
+GENERIC_NACK = 0x80000000
+RESPONSE_MASK = 0x80000000
+
+INTERFACE_VERSION = 0x34
+
+# Command status codes
+ESME_ROK = 0x00000000
+ESME_RINVMSGLEN = 0x00000001
+ESME_RSYSERR = 0x00000008
+ESME_RINVSRCADR = 0x0000000A
+ESME_RINVDSTADR = 0x0000000B
+ESME_RINVPASWD = 0x0000000E
+ESME_RINVSYSID = 0x0000000F
+ESME_RMSGQFUL = 0x00000014
+ESME_RTHROTTLED = 0x00000058
+
+# Optional parameters
+TAG_RECEIPTED_MESSAGE_ID = 0x001E
+TAG_MESSAGE_PAYLOAD = 0x0424
+
+# esm_class bit flagging a deliver_sm as an SMSC delivery receipt
+ESM_CLASS_DELIVERY_RECEIPT = 0x04
+
+# Longest short_message field, longer texts go in the message_payload TLV
+MAX_SHORT_MESSAGE = 254
+
+DATA_CODING_DEFAULT = 0x00
+DATA_CODING_LATIN1 = 0x03
+DATA_CODING_UCS2 = 0x08
+
+HEADER = struct.Struct('>IIII')
+
+_RECEIPT_FIELD = re.compile(r'(id|stat|err):(\S*)', re.IGNORECASE)
+
+
+def encode(command_id, sequence, body=b'', status=ESME_ROK):
+    """Return the wire bytes of a PDU."""
+    return HEADER.pack(HEADER.size + len(body), command_id, status, sequence) + body
+
+
+def cstring(value):
+    """Encode a C-Octet String."""
+    if isinstance(value, str):
+        value = value.encode('latin-1', 'replace')
+    return (value or b'') + b'\x00'
+
+
+def read_cstring(body, offset):
+    """Return the C-Octet String at `offset` and the offset following it."""
+    end = body.index(b'\x00', offset)
+    return body[offset:end].decode('latin-1'), end + 1
+
+
+def encode_text(text):
+    """Return (payload, data_coding) for a message text."""
+    try:
+        return text.encode('ascii'), DATA_CODING_DEFAULT
+    except UnicodeEncodeError:
+        pass
+    try:
+        return text.encode('latin-1'), DATA_CODING_LATIN1
+    except UnicodeEncodeError:
+        return text.encode('utf-16-be'), DATA_CODING_UCS2
+
+
+def decode_text(payload, data_coding):
+    if data_coding == DATA_CODING_UCS2:
+        return payload.decode('utf-16-be', 'replace')
+    return payload.decode('latin-1')
+
+
+def bind_body(system_id, password, system_type=''):
+    """Body of a bind_transceiver request."""
+    return (cstring(system_id) + cstring(password) + cstring(system_type)
+            + struct.pack('>BBB', INTERFACE_VERSION, 0, 0) + cstring(''))
+
+
+def submit_sm_body(source, destination, text, priority=0, registered_delivery=1):
+    """Body of a submit_sm request asking for a delivery receipt."""
+    payload, data_coding = encode_text(text)
+    tlvs = b''
+    short_message = payload
+    if len(payload) > MAX_SHORT_MESSAGE:
+        tlvs = struct.pack('>HH', TAG_MESSAGE_PAYLOAD, len(payload)) + payload
+        short_message = b''
+
+    return (
+        cstring('')                                           # service_type
+        + struct.pack('>BB', 1 if source.isdigit() else 5, 0) + cstring(source)
+        + struct.pack('>BB', 1, 1) + cstring(destination)     # international, ISDN
+        + struct.pack('>BBB', 0, 0, max(0, min(int(priority or 0), 3)))
+        + cstring('') + cstring('')                           # schedule, validity
+        + struct.pack('>BBBBB', registered_delivery, 0, data_coding, 0, len(short_message))
+        + short_message + tlvs
+    )
+
+
+def parse_tlvs(body, offset):
+    """Return {tag: value} of the optional parameters starting at `offset`."""
+    tlvs = {}
+    while offset + 4 <= len(body):
+        tag, length = struct.unpack_from('>HH', body, offset)
+        tlvs[tag] = body[offset + 4:offset + 4 + length]
+        offset += 4 + length
+    return tlvs
+
+
+def parse_sm(body):
+    """Decode the body of a submit_sm or deliver_sm PDU."""
+    _service_type, offset = read_cstring(body, 0)
+    offset += 2
+    source, offset = read_cstring(body, offset)
+    offset += 2
+    destination, offset = read_cstring(body, offset)
+    esm_class = body[offset]
+    offset += 3
+    _schedule, offset = read_cstring(body, offset)
+    _validity, offset = read_cstring(body, offset)
+    data_coding = body[offset + 2]
+    length = body[offset + 4]
+    offset += 5
+    payload = body[offset:offset + length]
+    tlvs = parse_tlvs(body, offset + length)
+    if not payload and TAG_MESSAGE_PAYLOAD in tlvs:
+        payload = tlvs[TAG_MESSAGE_PAYLOAD]
+
+    return {
+        'source': source,
+        'destination': destination,
+        'esm_class': esm_class,
+        'text': decode_text(payload, data_coding),
+        'tlvs': tlvs,
+    }
+
+
+def parse_receipt(sm):
+    """Return (message id, stat) of a delivery receipt decoded by parse_sm, None if it is not one."""
+    if not sm['esm_class'] & ESM_CLASS_DELIVERY_RECEIPT:
+        return None
+    fields = {key.lower(): value for key, value in _RECEIPT_FIELD.findall(sm['text'])}
+    message_id = fields.get('id')
+    if TAG_RECEIPTED_MESSAGE_ID in sm['tlvs']:
+        message_id = sm['tlvs'][TAG_RECEIPTED_MESSAGE_ID].rstrip(b'\x00').decode('latin-1')
+    if not message_id:
+        return None
+    return message_id, fields.get('stat') or 'UNKNOWN'
+
+
+class PduReader(object):
+    """Split a byte stream into (command_id, status, sequence, body) PDUs."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def feed(self, data):
+        self._buffer.extend(data)
+        pdus = []
+        while len(self._buffer) >= HEADER.size:
+            length, command_id, status, sequence = HEADER.unpack_from(self._buffer)
+            if length < HEADER.size:
+                raise ValueError('Invalid SMPP PDU length %d' % length)
+            if len(self._buffer) < length:
+                break
+            pdus.append((command_id, status, sequence, bytes(self._buffer[HEADER.size:length])))
+            del self._buffer[:length]
+        return pdus
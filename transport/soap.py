@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+SOAP transport
+==============
+The Tunisie SMS SOAP API, selected by the 'smpp' gateway method. Clients
+come from the process-wide pool, see soap_pool.
+"""
+
+import logging
+
+from odoo import _
+from odoo.exceptions import UserError
+
+from . import soap_pool
+from .base import SendResult, Transport, register
+
+_logger = logging.getLogger(__name__)
+
+try:
+    from SOAPpy import WSDL
+except ImportError:
+    WSDL = None
+    _logger.warning("SOAPpy not installed. Install it with: pip install SOAPpy")
+
+
+@register('smpp')
+class SoapTransport(Transport):
+
+    def _get_credentials(self):
+        """Read login, password, sender and account from the gateway parameters."""
+        credentials = self.config.credentials
+        if not all(credentials.get(key) for key in ('user', 'password', 'sender', 'sms')):
+            raise UserError(_('SMPP parameters not properly configured'))
+        return credentials
+
+    def _client(self):
+        """Check a SOAP client of the gateway out of the process-wide pool."""
+        config = self.config
+        # A settings change rebuilds the snapshot with a new write_date, and the clients with it
+        signature = (config.url, config.write_date)
+        return soap_pool.checkout(
+            (config.dbname, config.id), signature,
+            lambda: WSDL.Proxy(config.url), config.soap_client_ttl
+        )
+
+    def send(self, message):
+        if WSDL is None:
+            raise UserError(_('SOAPpy is required to send SMS with the SMPP method'))
+
+        credentials = self._get_credentials()
+
+        # Handle message encoding
+        text = message.text
+        if message.coding == '2':
+            text = text.encode('utf-8')
+
+        with self._client() as soap:
+            result = soap.telephonySmsUserSend(
+                str(credentials['user']), str(credentials['password']),
+                str(credentials['sms']), str(credentials['sender']),
+                str(message.mobile), text,
+                int(message.validity or 0),
+                int(message.classes or 1),
+                int(message.deferred or 0),
+                int(message.priority or 0),
+                int(message.coding or 1),
+                str(message.tag or ''),
+                str(message.nostop or 0)
+            )
+
+        _logger.info("SOAP SMS sent successfully: %s", result)
+        return SendResult(str(result), '200', message.mobile, 'SMPP SMS sent successfully')
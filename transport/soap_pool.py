@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+SOAP client pool
+================
+Process-wide SOAP clients, pooled per gateway so that the WSDL is
+downloaded and parsed once instead of for every message. A client is
+checked out by one thread at a time, parallel dispatch workers each get
+their own. The clients of a gateway are rebuilt once they are older than
+their TTL or when the gateway record changes.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+_logger = logging.getLogger(__name__)
+
+_pools = {}
+_lock = threading.Lock()
+
+
+class _ClientPool(object):
+    """Idle clients of one gateway built for the same settings."""
+
+    def __init__(self, signature):
+        self.signature = signature
+        self.created = time.monotonic()
+        self.idle = []
+
+
+@contextmanager
+def checkout(key, signature, factory, ttl=3600):
+    """Lend a client of gateway `key` for the duration of the block.
+
+    `key` identifies the gateway across databases, e.g. (dbname, gateway id),
+    and `signature` the settings the clients are built for. `factory` builds
+    a new client when none is idle. A client whose call raised is dropped
+    instead of being returned to the pool.
+    """
+    with _lock:
+        pool = _pools.get(key)
+        if pool and pool.signature != signature:
+            _logger.info("Gateway %s settings changed, rebuilding its SOAP clients", key)
+            pool = None
+        elif pool and ttl > 0 and time.monotonic() - pool.created > ttl:
+            pool = None
+        if pool is None:
+            pool = _pools[key] = _ClientPool(signature)
+        client = pool.idle.pop() if pool.idle else None
+
+    if client is None:
+        # Built outside the lock, loading the WSDL takes a network round trip
+        client = factory()
+
+    yield client
+
+    with _lock:
+        # Clients of a pool replaced meanwhile are simply dropped
+        if _pools.get(key) is pool:
+            pool.idle.append(client)
+
+
+def discard(key):
+    """Forget the SOAP clients of gateway `key`."""
+    with _lock:
+        _pools.pop(key, None)
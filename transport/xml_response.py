@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Gateway response parser
+=======================
+Reads the few fields the module needs from the gateway XML documents
+without building a generic object tree. Elements are consumed from an
+expat pull parser as they end and cleared right away, so that a batch
+response with thousands of <status> elements is streamed through.
+
+A malformed body never raises: single responses come back as a
+'parse_error' status, batch responses keep the statuses read before the
+error and delivery reports come back as None.
+"""
+
+import logging
+from xml.etree.ElementTree import ParseError, XMLPullParser
+
+from .base import SendResult
+
+_logger = logging.getLogger(__name__)
+
+STATUS_FIELDS = ('message_id', 'status_code', 'status_mobile', 'status_msg')
+
+# Bytes handed to the parser at a time
+FEED_CHUNK_SIZE = 64 * 1024
+
+
+def _local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+def _iter_end_events(body):
+    """Yield every element of `body` as it ends, then clear it.
+
+    The cleared element stays attached to its parent until the next sibling
+    ends, so that a parent still tells whether it had children while the
+    root never holds more than one processed child.
+    """
+    parser = XMLPullParser(events=('start', 'end'))
+    parents = []
+    for start in range(0, len(body), FEED_CHUNK_SIZE):
+        parser.feed(body[start:start + FEED_CHUNK_SIZE])
+        for event, element in parser.read_events():
+            if event == 'start':
+                parents.append(element)
+                continue
+            parents.pop()
+            yield element
+            element.clear()
+            if parents:
+                del parents[-1][:-1]
+    parser.close()
+
+
+def iter_statuses(body):
+    """Yield a SendResult for every <status> element of a send response."""
+    values = {}
+    for element in _iter_end_events(body):
+        name = _local_name(element.tag)
+        if name in STATUS_FIELDS:
+            values[name] = (element.text or '').strip()
+        elif name == 'status':
+            yield SendResult(*(values.get(field, '') for field in STATUS_FIELDS))
+            values = {}
+
+
+def parse_send_response(body):
+    """Return the SendResult of a single recipient response."""
+    try:
+        for result in iter_statuses(body):
+            return result
+        error = 'No status element in gateway response'
+    except ParseError as e:
+        error = str(e)
+
+    _logger.warning("Failed to parse SMS response: %s", error)
+    return SendResult('', 'parse_error', '', error)
+
+
+def parse_batch_response(body):
+    """Return {status_mobile: SendResult} for a multi-recipient response."""
+    statuses = {}
+    try:
+        for result in iter_statuses(body):
+            statuses[result.status_mobile] = result
+    except ParseError as e:
+        _logger.warning("Failed to parse batch SMS response after %d statuses: %s", len(statuses), str(e))
+    return statuses
+
+
+def parse_dlr_response(body):
+    """Return the acknowledgement of a delivery report response, None if missing."""
+    try:
+        for element in _iter_end_events(body):
+            # The root element shares the name, only the leaf carries the report
+            if _local_name(element.tag) == 'acknowledgement' and not len(element):
+                return (element.text or '').strip() or None
+    except ParseError as e:
+        _logger.warning("Failed to parse delivery report: %s", str(e))
+    return None
+
+
+def parse_dlr_reports(body):
+    """Return {message_id: acknowledgement} of a delivery report document pushed by the gateway.
+
+    The document has the layout of the polled delivery reports with one
+    <message> element per report. Reports read before a parse error are kept.
+    """
+    reports = {}
+    values = {}
+    try:
+        for element in _iter_end_events(body):
+            name = _local_name(element.tag)
+            if name in ('message_id', 'acknowledgement') and not len(element):
+                values[name] = (element.text or '').strip()
+            elif name == 'message':
+                if values.get('message_id') and values.get('acknowledgement'):
+                    reports[values['message_id']] = values['acknowledgement']
+                values = {}
+    except ParseError as e:
+        _logger.warning("Failed to parse pushed delivery reports after %d reports: %s", len(reports), str(e))
+    return reports
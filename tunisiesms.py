@@ -1,20 +1,117 @@
-import urllib
-import urllib.parse
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 import json
 import logging
-
-import jxmlease
-import requests
-from odoo import api, fields, models, _
+import os
+import random
+import secrets
+import socket
+import threading
+import time
+import uuid
+from types import MappingProxyType
+
+import psycopg2
+
+from odoo import api, fields, models, tools, _
 from odoo.exceptions import UserError, ValidationError
 
+from .transport import async_http
+from .transport.base import GatewayConfig, OutgoingMessage, get_transport
+
 _logger = logging.getLogger(__name__)
 
-try:
-    from SOAPpy import WSDL
-except ImportError:
-    _logger.warning("SOAPpy not installed. Install it with: pip install SOAPpy")
+# Drain loop sizing: aim for chunks of this duration between commits
+DRAIN_CHUNK_SECONDS = 5.0
+DRAIN_MAX_BATCH_SIZE = 1000
+
+# Fraction of the provider rate limit the dispatcher actually uses
+RATE_LIMIT_HEADROOM = 0.9
+
+# Gateway status codes worth retrying at once on another gateway: insufficient
+# credit, daily quota exceeded and provider errors
+FAILOVER_ERROR_CODES = {'402', '420', '500'}
+
+# Gateway status codes that will fail again however often they are retried
+PERMANENT_ERROR_CODES = {'400', '401', '403', '430', '431', '440', '441', '442', '501', '502'}
+
+# Attempts before a failing message is dead-lettered, unless its gateway says otherwise
+DEFAULT_RETRY_MAX_ATTEMPTS = 5
+
+# Routing statistics: weight of the newest sample in the moving averages and
+# age after which they are considered unknown and the gateway probed again
+ROUTING_EWMA_ALPHA = 0.2
+ROUTING_STATS_TTL = 300
+
+# Pending delivery reports polled per cron run, across all polling gateways
+DLR_POLL_LIMIT = 1000
+
+# Delay before each delivery report poll of a message: the first poll
+# happens a minute after the send, polling gives up after the last one
+DLR_POLL_BACKOFF = (60, 300, 1800)
+
+# Delivery reports after which the message status can no longer change
+DLR_FINAL_STATUSES = ('DELIVRD', 'EXPIRED', 'REJECTD', 'UNDELIV', 'DELETED')
+
+# History entries buffered by a transaction before they are inserted in bulk
+HISTORY_FLUSH_SIZE = 500
+
+# Columns and SQL types of the history entries inserted in bulk
+HISTORY_BULK_COLUMNS = [
+    ('name', 'varchar'), ('date_create', 'timestamp'), ('user_id', 'int4'), ('gateway_id', 'int4'),
+    ('to', 'varchar'), ('sms', 'text'), ('message_id', 'varchar'), ('status_code', 'varchar'),
+    ('status_mobile', 'varchar'), ('status_msg', 'varchar'), ('latency_ms', 'float8'),
+    ('next_dlr_poll_at', 'timestamp'),
+]
+
+
+# Template and trigger fields of the automatic SMS of each sale order state
+ORDER_SMS_FIELDS = {
+    'draft': ('order_draft_sms', 'status_order_draft'),
+    'sent': ('order_sent_sms', 'status_order_sent'),
+    'waiting': ('order_waiting_sms', 'status_order_waiting'),
+    'sale': ('order_sale_sms', 'status_order_sale'),
+    'done': ('order_done_sms', 'status_order_done'),
+    'cancel': ('order_cancel_sms', 'status_order_cancel'),
+}
+
+# Gateway fields copied into the GatewayConfig snapshot, writing any of them
+# invalidates it
+CONFIG_FIELDS = (
+    set(GatewayConfig._fields) - {'id', 'dbname', 'write_date', 'credentials', 'order_templates',
+                                  'partner_create_template', 'partner_create_enabled'}
+    | {name for names in ORDER_SMS_FIELDS.values() for name in names}
+    | {'property_ids', 'res_partner_sms_create', 'status_res_partner_create'}
+)
+
+
+def expected_latency(success_rate, latency):
+    """Expected time to get a message accepted, a refused message costs a retry elsewhere."""
+    return (latency or 0.0) / max(success_rate, 0.05)
+
+
+class RecipientSMSData(object):
+    """SMS data of a batch narrowed to a single recipient."""
+
+    def __init__(self, data, mobile):
+        self._data = data
+        self.mobile_to = mobile
+
+    def __getattr__(self, name):
+        return getattr(self._data, name)
+
+
+class GatewayResponseError(UserError):
+    """Error status returned by the SMS gateway for a single message."""
+
+    def __init__(self, status_code, message):
+        super(GatewayResponseError, self).__init__(message)
+        self.status_code = status_code
+
+    @property
+    def permanent(self):
+        """Whether retrying the message can not succeed."""
+        return self.status_code in PERMANENT_ERROR_CODES
 
 
 class SMSAccessMixin(models.AbstractModel):
@@ -47,11 +144,11 @@ class SMSAccessMixin(models.AbstractModel):
                     gateway.write({
                         'users_id': [(4, current_user.id)]
                     })
-                    
-                # Force cache refresh
-                self.env.cache.invalidate()
-                self.env.registry.clear_caches()
-                
+
+                    # Force cache refresh, only needed when access changed
+                    self.env.cache.invalidate()
+                    self.env.registry.clear_caches()
+
         except Exception as e:
             _logger.error(f"Error triggering access refresh: {e}")
 
@@ -80,15 +177,14 @@ class TunisieSMS(models.Model):
     name = fields.Char(
         'Gateway Name',
         default='TUNISIESMS',
-        readonly=True,
         required=True
     )
     url = fields.Char(
         'Gateway URL',
         required=True,
-        readonly=True,
         default='https://api.l2t.io/tn/v0/api/api.aspx',
-        help='Base URL for SMS messages'
+        help='Base URL for SMS messages: the API URL for HTTP, the WSDL URL for SMPP Method, '
+             'smpp://host:port for SMPP v3.4 and simulator://local for the simulator'
     )
 
     # Gateway Properties and History
@@ -106,8 +202,10 @@ class TunisieSMS(models.Model):
     # API Configuration
     method = fields.Selection([
         ('http', 'HTTP Method'),
-        ('smpp', 'SMPP Method')
-    ], 'API Method', readonly=True, default='http')
+        ('smpp', 'SMPP Method'),
+        ('smpp_native', 'SMPP v3.4'),
+        ('simulator', 'Local Simulator'),
+    ], 'API Method', default='http')
 
     state = fields.Selection([
         ('new', 'Not Verified'),
@@ -168,6 +266,215 @@ class TunisieSMS(models.Model):
     )
     char_limit = fields.Boolean('Character Limit', default=True)
 
+    # Queue Dispatcher
+    send_mode = fields.Selection([
+        ('direct', 'Send Immediately'),
+        ('queue', 'Queue Only'),
+    ], 'Send Mode', default='direct',
+        help='Queue Only makes sends from orders, partners and wizards write a queue '
+             'row and return at once, the queue cron does the transmission')
+    dispatch_mode = fields.Selection([
+        ('sequential', 'Sequential'),
+        ('parallel', 'Parallel Worker Pool'),
+        ('async', 'Asyncio (HTTP only)'),
+    ], 'Dispatch Mode', default='sequential',
+        help='How queued messages of this gateway are sent by the queue cron')
+    async_concurrency = fields.Integer(
+        'Async Concurrency',
+        default=100,
+        help='Maximum number of HTTP requests in flight in asyncio mode'
+    )
+    dispatch_workers = fields.Integer(
+        'Dispatch Workers',
+        default=4,
+        help='Maximum number of concurrent workers in parallel mode. Each worker '
+             'holds its own database cursor, keep it below db_maxconn.'
+    )
+    lease_duration = fields.Integer(
+        'Lease Duration (seconds)',
+        default=300,
+        help='How long a dispatcher run owns the messages it claimed'
+    )
+    queue_expiry = fields.Integer(
+        'Queue Expiry (minutes)',
+        default=0,
+        help='Queued messages still unsent after this time expire, 0 to keep them '
+             'until sent. The message validity only applies once the provider has it.'
+    )
+    dispatch_batch_size = fields.Integer(
+        'Batch Size',
+        default=30,
+        help='Messages claimed per batch (first batch of a run in drain mode)'
+    )
+    drain_enabled = fields.Boolean(
+        'Drain Queue',
+        default=False,
+        help='Keep claiming batches in each cron run until the time budget or '
+             'the backlog target is reached'
+    )
+    drain_time_budget = fields.Integer(
+        'Time Budget (seconds)',
+        default=45,
+        help='Maximum time spent draining per cron run, shared by all gateways '
+             '(the smallest budget applies). Keep it below the cron interval and '
+             'the server limit_time_real.'
+    )
+    drain_backlog_target = fields.Integer(
+        'Backlog Target',
+        default=0,
+        help='Stop draining once this many messages or fewer are left pending'
+    )
+
+    batch_recipients = fields.Integer(
+        'Recipients per Request',
+        default=100,
+        help='Recipients of an identical message grouped in one gateway request '
+             'by batch sends, 1 to send one request per recipient'
+    )
+
+    # HTTP Connections
+    http_pool_size = fields.Integer(
+        'Connection Pool Size',
+        default=10,
+        help='Keep-alive connections kept open to the gateway by each Odoo process. '
+             'Keep it at least at the number of dispatch workers.'
+    )
+    http_connect_timeout = fields.Float(
+        'Connect Timeout (seconds)',
+        default=5.0,
+        help='Maximum time to establish a connection to the gateway'
+    )
+    http_read_timeout = fields.Float(
+        'Read Timeout (seconds)',
+        default=30.0,
+        help='Maximum time to wait for the gateway to answer a request'
+    )
+
+    # SOAP Clients
+    soap_client_ttl = fields.Integer(
+        'SOAP Client Lifetime (seconds)',
+        default=3600,
+        help='Time a parsed WSDL client is reused before the WSDL is loaded again, '
+             '0 to keep it until the gateway settings change'
+    )
+
+    # SMPP Session
+    smpp_window = fields.Integer(
+        'Submit Window',
+        default=10,
+        help='submit_sm requests sent to the SMSC without waiting for their answer'
+    )
+    smpp_enquire_link_interval = fields.Integer(
+        'Keep-Alive Interval (seconds)',
+        default=30,
+        help='Idle time after which an enquire_link keeps the bind open'
+    )
+    smpp_response_timeout = fields.Integer(
+        'Response Timeout (seconds)',
+        default=30,
+        help='Maximum time to wait for the SMSC to answer a request'
+    )
+    smpp_system_type = fields.Char('System Type', help='system_type sent in the bind, if the SMSC requires one')
+
+    # Gateway Simulator
+    simulator_latency = fields.Integer(
+        'Simulated Latency (ms)',
+        default=50,
+        help='Response time of every simulated request'
+    )
+    simulator_error_rate = fields.Float(
+        'Simulated Error Rate (%)',
+        default=0.0,
+        help='Share of messages answered with one of the simulated error codes'
+    )
+    simulator_error_codes = fields.Char(
+        'Simulated Error Codes',
+        default='402,441,500',
+        help="Comma separated status codes drawn for failed messages, "
+             "'timeout' simulates an unreachable gateway"
+    )
+    simulator_throughput = fields.Float(
+        'Simulated Throughput (msg/s)',
+        default=0.0,
+        help='Maximum messages per second accepted by the simulator, 0 for unlimited'
+    )
+
+    # Routing
+    routing_weight = fields.Integer(
+        'Routing Weight',
+        default=1,
+        help='Share of the automatic traffic sent through this gateway relative to '
+             'the other gateways, 0 to keep it out of routing and failover'
+    )
+    routing_health = fields.Float(
+        'Health Score',
+        compute='_compute_routing_stats',
+        help='Multiplies the routing weight: the recent success rate, 0 while the circuit breaker is open'
+    )
+    routing_latency = fields.Float(
+        'Send Latency (ms)',
+        compute='_compute_routing_stats',
+        help='Moving average of the time the provider takes to accept a message'
+    )
+    routing_success_rate = fields.Float(
+        'Success Rate',
+        compute='_compute_routing_stats',
+        help='Moving average of the share of messages accepted by the provider'
+    )
+    routing_decision = fields.Char('Routing Decision', compute='_compute_routing_stats')
+
+    # Circuit Breaker
+    breaker_threshold = fields.Integer(
+        'Failures Before Opening',
+        default=5,
+        help='Consecutive connection failures after which sends to this gateway are '
+             'queued instead of attempted, 0 to disable the circuit breaker'
+    )
+    breaker_cooldown = fields.Integer(
+        'Cooldown (seconds)',
+        default=60,
+        help='Time the breaker stays open before a single probe request is let through'
+    )
+    breaker_state = fields.Selection([
+        ('closed', 'Closed'),
+        ('open', 'Open'),
+        ('half_open', 'Half Open'),
+    ], 'Breaker State', compute='_compute_breaker_status')
+    breaker_failures = fields.Integer('Consecutive Failures', compute='_compute_breaker_status')
+    breaker_opened_at = fields.Datetime('Opened At', compute='_compute_breaker_status')
+
+    # Rate Limiting
+    rate_limit = fields.Float(
+        'Max Messages per Second',
+        default=0.0,
+        help='Provider rate limit, 0 for unlimited. The dispatcher paces sends '
+             'slightly under it across all workers and nodes.'
+    )
+    retry_max_attempts = fields.Integer(
+        'Max Attempts',
+        default=DEFAULT_RETRY_MAX_ATTEMPTS,
+        help='Attempts before a failing message is moved to the dead letter state'
+    )
+    retry_base_delay = fields.Integer(
+        'Retry Base Delay (seconds)',
+        default=60,
+        help='Delay before the first retry, doubled on every further attempt'
+    )
+    retry_max_delay = fields.Integer(
+        'Retry Max Delay (seconds)',
+        default=3600,
+        help='Upper bound of the delay between two attempts'
+    )
+    daily_quota = fields.Integer(
+        'Daily Quota',
+        default=0,
+        help='Maximum messages per day (UTC) accepted by the provider, 0 for unlimited'
+    )
+    quota_used_today = fields.Integer(
+        'Sent Today',
+        compute='_compute_quota_used_today'
+    )
+
     # Order Status SMS Templates & Triggers
     order_draft_sms = fields.Text(
         'Draft Order SMS Template',
@@ -264,6 +571,32 @@ class TunisieSMS(models.Model):
     sender_url_params = fields.Char('Sender URL Parameter')
     key_url_params = fields.Text('API Key Parameter')
 
+    # Delivery Reports
+    dlr_mode = fields.Selection([
+        ('poll', 'Polling'),
+        ('push', 'Webhook'),
+    ], 'Delivery Reports', default='poll',
+        help='Webhook: the provider posts delivery reports to the URL below. '
+             'Polling: the delivery report cron asks the provider for every message.')
+    dlr_webhook_secret = fields.Char(
+        'Webhook Secret',
+        copy=False,
+        groups='base.group_system',
+        help='Shared secret the provider sends in the X-DLR-Secret header or the secret parameter'
+    )
+    dlr_webhook_url = fields.Char('Webhook URL', compute='_compute_dlr_webhook_url')
+    dlr_poll_concurrency = fields.Integer(
+        'Polling Concurrency',
+        default=10,
+        help='Delivery report requests in flight at once when polling this gateway'
+    )
+    dlr_batch_size = fields.Integer(
+        'Reports per Request',
+        default=1,
+        help='Message ids asked in one delivery report request, for providers accepting '
+             'a comma separated msg_id. 1 sends one request per message.'
+    )
+
     # Error Management
     code_error_status = fields.One2many(
         'sms.tunisiesms.code.error',
@@ -291,6 +624,321 @@ class TunisieSMS(models.Model):
 Usage: Type %variable_name% in your template text'''
     )
 
+    def _compute_quota_used_today(self):
+        """Read today's quota usage from the runtime counters."""
+        runtime_obj = self.env['sms.tunisiesms.runtime']
+        today = fields.Date.today()
+        for gateway in self:
+            runtime = runtime_obj.search([('gateway_id', '=', gateway.id)], limit=1)
+            gateway.quota_used_today = runtime.quota_used if runtime.quota_day == today else 0
+
+    def _compute_breaker_status(self):
+        """Read the circuit breaker status from the runtime counters."""
+        runtime_obj = self.env['sms.tunisiesms.runtime']
+        for gateway in self:
+            runtime = runtime_obj.search([('gateway_id', '=', gateway.id)], limit=1)
+            gateway.breaker_state = runtime.breaker_state or 'closed'
+            gateway.breaker_failures = runtime.breaker_failures
+            gateway.breaker_opened_at = runtime.breaker_opened_at if runtime.breaker_state != 'closed' else False
+
+    def _compute_dlr_webhook_url(self):
+        base_url = self.env['ir.config_parameter'].sudo().get_param('web.base.url', '')
+        for gateway in self:
+            gateway.dlr_webhook_url = '%s/sms/dlr/%s' % (base_url, gateway.id) if gateway.id else False
+
+    def action_generate_dlr_secret(self):
+        """Set a new random webhook secret, the provider must be given the new one."""
+        for gateway in self:
+            gateway.dlr_webhook_secret = secrets.token_urlsafe(32)
+        return True
+
+    def action_reset_breaker(self):
+        """Close the circuit breaker of the gateway by hand."""
+        for gateway in self:
+            self.env['sms.tunisiesms.runtime']._reset_breaker(gateway)
+        return True
+
+    def _breaker_allow(self):
+        """Check the circuit breaker before sending through this gateway.
+
+        Returns 'closed' for normal traffic, 'probe' when the caller is let
+        through as the half-open probe and False while the breaker is open.
+        """
+        self.ensure_one()
+        if self.breaker_threshold <= 0:
+            return 'closed'
+        return self.env['sms.tunisiesms.runtime']._breaker_acquire(self)
+
+    def _record_send_outcome(self, latency, accepted, error=None, outcomes=None):
+        """Feed a provider request to the circuit breaker and the routing statistics.
+
+        `latency` is the request duration in seconds and `accepted` the share
+        of its messages the provider accepted. Error statuses returned by the
+        gateway prove that it is reachable, only a transport failure passed as
+        `error` counts against the breaker. With an `outcomes` dict the request
+        is only collected there, see _flush_send_outcomes.
+        """
+        self.ensure_one()
+        sample = (error is None, accepted, latency)
+        if outcomes is not None:
+            outcomes.setdefault(self.id, []).append(sample)
+        else:
+            self.env['sms.tunisiesms.runtime']._record_outcomes(self, [sample])
+
+    @api.model
+    def _flush_send_outcomes(self, outcomes):
+        """Record the requests collected per gateway, one runtime update per gateway."""
+        runtime_obj = self.env['sms.tunisiesms.runtime']
+        for gateway_id, samples in outcomes.items():
+            runtime_obj._record_outcomes(self.browse(gateway_id), samples)
+        outcomes.clear()
+
+    def _compute_routing_stats(self):
+        """Compute the routing statistics and decision shown on the gateway form."""
+        routed = self.search([('routing_weight', '>', 0)])
+        stats = (self | routed)._get_routing_stats()
+        ranked = sorted(
+            (gateway for gateway in routed if stats[gateway.id][0] > 0 and stats[gateway.id][2] is not None),
+            key=lambda gateway: expected_latency(*stats[gateway.id][1:])
+        )
+        for gateway in self:
+            health, success_rate, latency = stats[gateway.id]
+            gateway.routing_health = health
+            gateway.routing_latency = latency or 0.0
+            gateway.routing_success_rate = success_rate
+            if gateway.routing_weight <= 0:
+                gateway.routing_decision = _('Not routed (weight 0)')
+            elif health <= 0:
+                gateway.routing_decision = _('Excluded while the circuit breaker is open')
+            elif gateway not in ranked:
+                gateway.routing_decision = _('No recent sends, probed by new messages')
+            elif ranked[0] == gateway:
+                gateway.routing_decision = _('Preferred: fastest healthy gateway')
+            else:
+                gateway.routing_decision = _('Fallback: rank %d of %d by expected latency') % (
+                    ranked.index(gateway) + 1, len(ranked))
+
+    def _get_routing_stats(self):
+        """Return {gateway id: (health, success rate, latency ms)} read from the runtime counters.
+
+        The health score is the recent success rate, 0 while the breaker is
+        open and a little once its cooldown is over so that the gateway gets
+        the occasional half-open probe. Latency is None when the gateway has
+        not sent anything for ROUTING_STATS_TTL seconds.
+        """
+        runtimes = self.env['sms.tunisiesms.runtime'].search([('gateway_id', 'in', self.ids)])
+        states = {runtime.gateway_id.id: runtime for runtime in runtimes}
+        now = fields.Datetime.now()
+
+        stats = {}
+        for gateway in self:
+            runtime = states.get(gateway.id)
+            if not runtime:
+                stats[gateway.id] = (1.0, 1.0, None)
+                continue
+
+            success_rate = runtime.success_ewma if runtime.stats_updated_at else 1.0
+            latency = None
+            if runtime.stats_updated_at and (now - runtime.stats_updated_at).total_seconds() < ROUTING_STATS_TTL:
+                latency = runtime.latency_ewma
+
+            if gateway.breaker_threshold <= 0 or runtime.breaker_state in (False, 'closed'):
+                health = success_rate
+            elif (runtime.breaker_state == 'open' and runtime.breaker_opened_at
+                    and (now - runtime.breaker_opened_at).total_seconds() < gateway.breaker_cooldown):
+                health = 0.0
+            else:
+                health = 0.1
+            stats[gateway.id] = (health, success_rate, latency)
+        return stats
+
+    @api.model
+    def _get_primary_gateway(self):
+        """Return the gateway holding the automatic SMS templates and triggers."""
+        return self.search([], order='id', limit=1)
+
+    @api.model
+    def _route_gateway(self, exclude=None):
+        """Pick the gateway of the next automatic message.
+
+        Two gateways are drawn at random in proportion to their routing weight
+        times their health score and the one with the lowest expected latency
+        wins, so that traffic goes to the fastest healthy gateway. Gateways
+        whose statistics are older than ROUTING_STATS_TTL win the draw to get
+        measured again, which is how a slow gateway is noticed recovering.
+        Returns an empty recordset when no routed gateway is usable.
+        """
+        candidates = self.search([('routing_weight', '>', 0)], order='id')
+        if exclude:
+            candidates -= exclude
+        if not candidates:
+            return candidates
+
+        stats = candidates._get_routing_stats()
+        weights = {gateway: gateway.routing_weight * stats[gateway.id][0] for gateway in candidates}
+        drawable = [gateway for gateway in candidates if weights[gateway] > 0]
+        if not drawable:
+            return self.browse()
+
+        first = random.choices(drawable, weights=[weights[gateway] for gateway in drawable])[0]
+        others = [gateway for gateway in drawable if gateway != first]
+        if not others:
+            return first
+        second = random.choices(others, weights=[weights[gateway] for gateway in others])[0]
+
+        return min((first, second), key=lambda gateway: expected_latency(*stats[gateway.id][1:]))
+
+    def _get_failover_gateway(self, error, tried=None):
+        """Return the gateway to retry on after `error`, empty if the error is not worth it.
+
+        Timeouts, unreachable providers and the FAILOVER_ERROR_CODES statuses
+        fail over to another routed gateway, other errors stay on this one.
+        """
+        self.ensure_one()
+        if self.routing_weight <= 0:
+            return self.browse()
+        if isinstance(error, GatewayResponseError) and error.status_code not in FAILOVER_ERROR_CODES:
+            return self.browse()
+        return self._route_gateway(exclude=(tried or self.browse()) | self)
+
+    def _get_config(self):
+        """Return the GatewayConfig snapshot of the gateway.
+
+        The snapshot is cached per process and keyed on the gateway
+        write_date, which every change of the gateway or of its parameters
+        bumps: a committed change is picked up by every worker without
+        clearing the registry caches. Gateways changed by the current
+        transaction are read uncached until it commits.
+        """
+        self.ensure_one()
+        if self.id in self.env.cr.precommit.data.get('sms.tunisiesms.config_changed', ()):
+            return self._build_config(self.id)
+        return self._read_config(self.id, str(self.sudo().write_date))
+
+    @api.model
+    @tools.ormcache('gateway_id', 'version')
+    def _read_config(self, gateway_id, version):
+        """Return the cached GatewayConfig snapshot of a gateway version, see _get_config."""
+        return self._build_config(gateway_id)
+
+    def _config_changed(self):
+        """Bypass the snapshot cache for these gateways until the transaction commits."""
+        self.env.cr.precommit.data.setdefault('sms.tunisiesms.config_changed', set()).update(self.ids)
+
+    def _touch_config(self):
+        """Bump the write_date of these gateways after a change of their parameters."""
+        if not self:
+            return
+        self._cr.execute("""
+            UPDATE sms_tunisiesms
+               SET write_date = now() at time zone 'UTC'
+             WHERE id IN %s
+        """, [tuple(self.ids)])
+        self.invalidate_cache(['write_date'])
+        self._config_changed()
+
+    @api.model
+    def _build_config(self, gateway_id):
+        """Build the GatewayConfig snapshot of a gateway, see _get_config."""
+        gateway = self.sudo().browse(gateway_id)
+        return GatewayConfig(
+            id=gateway.id,
+            dbname=self.env.cr.dbname,
+            name=gateway.name,
+            method=gateway.method,
+            url=gateway.url,
+            write_date=str(gateway.write_date),
+            sender_url_params=gateway.sender_url_params,
+            key_url_params=gateway.key_url_params,
+            credentials=MappingProxyType({param.type: param.value for param in gateway.property_ids}),
+            validity=gateway.validity,
+            classes=gateway.classes,
+            deferred=gateway.deferred,
+            priority=gateway.priority,
+            coding=gateway.coding,
+            send_mode=gateway.send_mode,
+            batch_recipients=gateway.batch_recipients,
+            nostop=gateway.nostop,
+            tag=gateway.tag,
+            char_limit=gateway.char_limit,
+            http_pool_size=gateway.http_pool_size,
+            http_connect_timeout=gateway.http_connect_timeout,
+            http_read_timeout=gateway.http_read_timeout,
+            soap_client_ttl=gateway.soap_client_ttl,
+            smpp_window=gateway.smpp_window,
+            smpp_enquire_link_interval=gateway.smpp_enquire_link_interval,
+            smpp_response_timeout=gateway.smpp_response_timeout,
+            smpp_system_type=gateway.smpp_system_type,
+            simulator_latency=gateway.simulator_latency,
+            simulator_error_rate=gateway.simulator_error_rate,
+            simulator_error_codes=gateway.simulator_error_codes,
+            simulator_throughput=gateway.simulator_throughput,
+            auto_sms_enabled=gateway.auto_sms_enabled,
+            auto_sms_on_create=gateway.auto_sms_on_create,
+            auto_sms_on_status_change=gateway.auto_sms_on_status_change,
+            order_templates=MappingProxyType({
+                state: (gateway[template], gateway[trigger])
+                for state, (template, trigger) in ORDER_SMS_FIELDS.items()
+            }),
+            partner_create_template=gateway.res_partner_sms_create,
+            partner_create_enabled=gateway.status_res_partner_create,
+            dlr_mode=gateway.dlr_mode,
+            dlr_webhook_secret=gateway.dlr_webhook_secret,
+            dlr_poll_concurrency=gateway.dlr_poll_concurrency,
+            dlr_batch_size=gateway.dlr_batch_size,
+        )
+
+    def _get_transport(self):
+        """Return the transport matching the API method of the gateway."""
+        self.ensure_one()
+        transport = get_transport(self)
+        if transport is None:
+            raise UserError(_('Unsupported SMS method: %s') % self._get_config().method)
+        return transport
+
+    def _poll_delivery_reports(self, message_ids):
+        """Ask the provider for the reports of `message_ids`, return {message_id: report}.
+
+        Requests of dlr_batch_size ids run dlr_poll_concurrency at a time in
+        threads that only use the transport, no ORM access happens there.
+        """
+        self.ensure_one()
+        transport = get_transport(self)
+        if transport is None or not message_ids:
+            return {}
+
+        config = transport.config
+        size = max(config.dlr_batch_size, 1)
+        chunks = [message_ids[i:i + size] for i in range(0, len(message_ids), size)]
+        workers = min(max(config.dlr_poll_concurrency, 1), len(chunks))
+
+        reports = {}
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='sms_dlr') as executor:
+            futures = [executor.submit(transport.fetch_dlr_batch, chunk) for chunk in chunks]
+            for chunk, future in zip(chunks, futures):
+                try:
+                    reports.update(future.result())
+                except Exception as e:
+                    _logger.error("DLR fetch failed for %d messages of gateway %s: %s",
+                                  len(chunk), config.name, str(e))
+        return reports
+
+    @api.model
+    def _prepare_outgoing_message(self, data):
+        """Build the transport message of SMS data sent directly."""
+        gateway = data.gateway._get_config()
+        return OutgoingMessage(
+            mobile=data.mobile_to,
+            text=data.text,
+            validity=getattr(data, 'validity', gateway.validity),
+            classes=getattr(data, 'classes1', gateway.classes),
+            deferred=getattr(data, 'deferred', gateway.deferred),
+            priority=getattr(data, 'priority', 0),
+            coding=getattr(data, 'coding', '1'),
+            nostop=getattr(data, 'nostop1', gateway.nostop),
+            tag=getattr(data, 'tag', False) or gateway.tag,
+        )
+
     def _check_permissions(self):
         """Check if current user has permission to use SMS gateway."""
         self._cr.execute(
@@ -321,14 +969,26 @@ Usage: Type %variable_name% in your template text'''
             'classes1': getattr(data, 'classes1', self.classes),
             'coding': getattr(data, 'coding', self.coding),
             'nostop1': bool(getattr(data, 'nostop1', self.nostop)),
+            'priority': getattr(data, 'priority', False) or data.gateway._get_config().priority or '1',
+            'deferred': getattr(data, 'deferred', 0) or 0,
         }
 
     def send_msg(self, data):
-        """Send SMS message through the configured gateway."""
+        """Send SMS message through the configured gateway.
+
+        Returns False when the message could not go out now: every gateway
+        tried refused it, it is then queued in error and retried by the cron
+        with backoff, or the circuit breaker of the gateway is open and it is
+        queued for the cron.
+        """
         if not data.gateway:
             raise UserError(_('No SMS gateway configured'))
 
         gateway = data.gateway
+        config = gateway._get_config()
+
+        if config.send_mode == 'queue':
+            return self._enqueue_msg(data)
 
         # Ensure comprehensive access and visibility
         try:
@@ -340,32 +1000,199 @@ Usage: Type %variable_name% in your template text'''
         if not self._check_permissions():
             raise UserError(_('You do not have permission to use gateway: %s') % gateway.name)
 
-        _logger.info("Sending SMS via %s to %s", gateway.name, data.mobile_to)
+        # Do not wait on a gateway that is known to be down, the cron sends it later
+        if not gateway._breaker_allow():
+            _logger.warning("Circuit breaker of gateway %s is open, queueing SMS to %s",
+                            gateway.name, data.mobile_to)
+            self.env['sms.tunisiesms.queue'].create(self._prepare_tunisiesms_queue(data, config.url))
+            return False
 
-        try:
-            if gateway.method == 'http':
-                result = self._send_http_sms(data, gateway)
-            elif gateway.method == 'smpp':
-                result = self._send_smpp_sms(data, gateway)
+        tried = self.browse()
+        while True:
+            _logger.info("Sending SMS via %s to %s", gateway.name, data.mobile_to)
+            try:
+                result = self._send_direct(data, gateway)
+            except Exception as e:
+                _logger.error("SMS send failed: %s", str(e))
+                # Log failure in history
+                self._create_history_entry(
+                    gateway, data, '', 'error', data.mobile_to, str(e)
+                )
+                error = e
             else:
-                raise UserError(_('Unsupported SMS method: %s') % gateway.method)
+                error = None
+                if result.status_code in FAILOVER_ERROR_CODES:
+                    error = GatewayResponseError(result.status_code, result.status_msg)
+
+            tried |= gateway
+            fallback = gateway._get_failover_gateway(error, tried) if error else None
+            if not fallback:
+                break
+            _logger.warning("SMS gateway %s failed (%s), failing over to %s", gateway.name, error, fallback.name)
+            gateway = fallback
+
+        if error is not None and not isinstance(error, GatewayResponseError):
+            raise UserError(_('Failed to send SMS: %s') % str(error))
+
+        queue_vals = self._prepare_tunisiesms_queue(data, gateway._get_config().url)
+        queue_vals['gateway_id'] = gateway.id
+
+        # The last gateway refused the message: the cron retries it with backoff
+        if error is not None:
+            self.env['sms.tunisiesms.queue'].create(queue_vals)._schedule_retry(error)
+            _logger.warning("SMS to %s refused by gateway %s (%s), queued for retry",
+                            data.mobile_to, gateway.name, error)
+            return False
 
-            # Create queue entry for tracking
-            queue_vals = self._prepare_tunisiesms_queue(data, gateway.url)
-            self.env['sms.tunisiesms.queue'].create(queue_vals)
+        # Create queue entry for tracking (already sent, the cron must not resend it)
+        queue_vals['state'] = 'send'
+        self.env['sms.tunisiesms.queue'].create(queue_vals)
 
-            _logger.info("SMS sent successfully to %s", data.mobile_to)
+        _logger.info("SMS sent successfully to %s", data.mobile_to)
+        return True
 
-        except Exception as e:
-            _logger.error("SMS send failed: %s", str(e))
-            # Log failure in history
-            self._create_history_entry(
-                gateway, data, '', 'error', data.mobile_to, str(e)
-            )
-            raise UserError(_('Failed to send SMS: %s') % str(e))
+    def _outbox_msg(self, data, record):
+        """Queue the SMS notifying a change of `record` in the current transaction.
+
+        The queue row is the outbox entry: it commits or rolls back together
+        with the business write, and is sent by a background dispatch right
+        after the commit. The queue cron retries whatever that dispatch leaves.
+        """
+        vals = self._prepare_tunisiesms_queue(data, data.gateway._get_config().url)
+        vals.update({'res_model': record._name, 'res_id': record.id})
+        sms = self.env['sms.tunisiesms.queue'].create(vals)
+        sms._dispatch_after_commit()
+        return sms
+
+    def _enqueue_msg(self, data):
+        """Write a ready to send queue row and return without any network call.
+
+        The row belongs to the caller's transaction: it is only dispatched
+        once that transaction commits and disappears if it rolls back. The
+        access fix is skipped here since it commits the current transaction.
+        """
+        if not self._check_permissions():
+            raise UserError(_('You do not have permission to use gateway: %s') % data.gateway.name)
 
+        self.env['sms.tunisiesms.queue'].create(self._prepare_tunisiesms_queue(data, data.gateway._get_config().url))
+        _logger.info("SMS to %s queued on gateway %s", data.mobile_to, data.gateway.name)
         return True
 
+    def send_batch_msg(self, data, mobiles):
+        """Send the same message to many recipients in as few gateway requests as possible.
+
+        `data` carries the message and its options like for `send_msg`, its
+        `mobile_to` is ignored. Transports supporting it get up to
+        `batch_recipients` numbers per request, others one send per number.
+        Every recipient gets its own history entry. Returns the number of
+        recipients accepted by the gateway, or queued in Queue Only mode.
+        """
+        if not data.gateway:
+            raise UserError(_('No SMS gateway configured'))
+
+        gateway = data.gateway
+        config = gateway._get_config()
+        mobiles = list(dict.fromkeys(mobile for mobile in mobiles if mobile))
+
+        if config.send_mode == 'queue':
+            if not self._check_permissions():
+                raise UserError(_('You do not have permission to use gateway: %s') % gateway.name)
+            self.env['sms.tunisiesms.queue'].create([
+                self._prepare_tunisiesms_queue(RecipientSMSData(data, mobile), config.url)
+                for mobile in mobiles
+            ])
+            return len(mobiles)
+
+        # Ensure comprehensive access and visibility
+        try:
+            gateway._ensure_all_users_have_access()
+        except Exception as e:
+            _logger.warning(f"Could not ensure comprehensive access: {e}")
+
+        if not self._check_permissions():
+            raise UserError(_('You do not have permission to use gateway: %s') % gateway.name)
+
+        transport = gateway._get_transport()
+        chunk_size = max(config.batch_recipients, 1) if transport.supports_batch else 1
+        _logger.info("Sending batch SMS via %s to %d recipients in chunks of %d",
+                     gateway.name, len(mobiles), chunk_size)
+
+        accepted = []
+        queued = []
+        for start in range(0, len(mobiles), chunk_size):
+            chunk = mobiles[start:start + chunk_size]
+            if not gateway._breaker_allow():
+                queued.extend(chunk)
+                continue
+            try:
+                results = self._send_batch_chunk(data, gateway, transport, chunk)
+            except Exception as e:
+                _logger.error("Batch SMS send failed for %d recipients: %s", len(chunk), str(e))
+                self.env['sms.tunisiesms.history']._buffer_entries([
+                    self._prepare_batch_history(gateway, data, mobile, '', 'error', mobile, str(e))
+                    for mobile in chunk
+                ])
+                # Unreachable or timed out gateway, the cron sends them later
+                queued.extend(chunk)
+                continue
+
+            accepted.extend(mobile for mobile in chunk if results.get(mobile) == '200')
+
+        # Queue entries for tracking (already sent, the cron must not resend them)
+        queue_vals_list = []
+        for mobile in accepted:
+            queue_vals = self._prepare_tunisiesms_queue(RecipientSMSData(data, mobile), config.url)
+            queue_vals['state'] = 'send'
+            queue_vals_list.append(queue_vals)
+        # Recipients held back by an open circuit breaker or a failed request are sent later by the cron
+        for mobile in queued:
+            queue_vals_list.append(self._prepare_tunisiesms_queue(RecipientSMSData(data, mobile), config.url))
+        self.env['sms.tunisiesms.queue'].create(queue_vals_list)
+
+        if queued:
+            _logger.warning("Gateway %s unavailable, %d recipients queued for the cron",
+                            gateway.name, len(queued))
+        _logger.info("Batch SMS accepted for %d of %d recipients", len(accepted), len(mobiles))
+        return len(accepted)
+
+    def _send_batch_chunk(self, data, gateway, transport, mobiles):
+        """Send one chunk of a batch and log a history entry per recipient.
+
+        Returns the gateway status code of every recipient.
+        """
+        started = time.monotonic()
+        try:
+            results = transport.send_batch(mobiles, self._prepare_outgoing_message(data))
+        except Exception as e:
+            gateway._record_send_outcome(time.monotonic() - started, 0.0, e)
+            raise
+        latency = time.monotonic() - started
+        accepted = sum(1 for mobile in mobiles if results[mobile].status_code == '200')
+        gateway._record_send_outcome(latency, accepted / len(mobiles))
+
+        self.env['sms.tunisiesms.history']._buffer_entries([
+            self._prepare_batch_history(gateway, data, mobile, *results[mobile], latency=latency)
+            for mobile in mobiles
+        ])
+        return {mobile: results[mobile].status_code for mobile in mobiles}
+
+    def _prepare_batch_history(self, gateway, data, mobile, message_id, status_code, status_mobile, status_msg,
+                               latency=None):
+        """Prepare the history entry of one recipient of a batch send."""
+        return {
+            'name': _('SMS Sent') if status_code == '200' else _('SMS Send Error'),
+            'gateway_id': gateway.id,
+            'sms': data.text,
+            'to': mobile,
+            'message_id': message_id,
+            'status_code': status_code,
+            'status_mobile': status_mobile,
+            'status_msg': status_msg,
+            'latency_ms': latency * 1000.0 if latency is not None else False,
+            'date_create': datetime.now(),
+            'user_id': self.env.uid
+        }
+
     def _check_queue(self):
         """Process SMS queue and send pending messages."""
         # AUTOMATIC FIX: Ensure all users have SMS access before processing queue
@@ -377,60 +1204,349 @@ Usage: Type %variable_name% in your template text'''
             # Continue anyway to attempt queue processing
 
         queue_obj = self.env['sms.tunisiesms.queue']
+        lease_owner = queue_obj._new_lease_owner()
+
+        # Return rows orphaned by crashed or timed out runs to the pending pool
+        queue_obj._reap_expired_leases()
+        queue_obj._fail_unrouted()
+
+        gateways = self or self.search([])
+        # One time budget for the whole run, the smallest one configured
+        budget = min([max(gateway.drain_time_budget, 1) for gateway in gateways] or [1])
+        deadline = time.monotonic() + budget
+
+        for index, gateway in enumerate(gateways):
+            # Each gateway gets its share of the time left, what it leaves
+            # unused goes to the following ones
+            now = time.monotonic()
+            share = now + max(deadline - now, 0) / (len(gateways) - index)
+            try:
+                gateway._drain_queue(lease_owner, share)
+            except Exception as e:
+                _logger.error("SMS queue dispatch failed for gateway %s: %s", gateway.name, str(e))
+                self.env.cr.rollback()
+
+        return True
+
+    def _drain_queue(self, lease_owner, deadline=None):
+        """Claim and send batches of this gateway's queue for one cron run.
 
-        # Get pending messages
-        pending_sms = queue_obj.search([
-            ('state', 'not in', ['send', 'sending'])
-        ], limit=30)
+        Without drain mode a single batch is sent. In drain mode batches are
+        claimed until `deadline` (time.monotonic), by default the time budget
+        of the gateway, or the backlog target is reached. Each chunk is
+        committed and the next batch is sized from the observed send time per
+        message.
+        """
+        self.ensure_one()
+        queue_obj = self.env['sms.tunisiesms.queue']
+        started = time.monotonic()
+        if deadline is None:
+            deadline = started + max(self.drain_time_budget, 1)
+        batch_size = max(self.dispatch_batch_size, 1)
+        processed = 0
+        expired = False
+
+        while True:
+            breaker = self._breaker_allow()
+            if not breaker:
+                _logger.info("Circuit breaker of gateway %s is open, dispatch skipped", self.name)
+                break
+
+            # Messages held back by an open breaker do not expire meanwhile
+            if not expired:
+                queue_obj._expire_overdue(self)
+                expired = True
+
+            # While half open a single message probes the gateway
+            allowed = self._acquire_send_tokens(1 if breaker == 'probe' else batch_size, deadline)
+            if not allowed:
+                break
+
+            # Claim in a fresh snapshot so rows committed by other workers are seen
+            self.env.cr.commit()
+            pending_sms = queue_obj._claim_pending(self, allowed, lease_owner)
+
+            if len(pending_sms) < allowed:
+                self._release_send_tokens(allowed - len(pending_sms))
+
+            if not pending_sms:
+                break
+
+            # Publish the claim before sending
+            self.env.cr.commit()
 
+            chunk_started = time.monotonic()
+            self._dispatch_batch(pending_sms)
+            self.env.cr.commit()
+            processed += len(pending_sms)
+
+            if not self.drain_enabled:
+                break
+
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            if self.drain_backlog_target > 0 and queue_obj._count_pending(self) <= self.drain_backlog_target:
+                break
+
+            per_message = (now - chunk_started) / len(pending_sms)
+            batch_size = self._next_batch_size(per_message, deadline - now)
+
+        if processed:
+            elapsed = time.monotonic() - started
+            _logger.info(
+                "SMS gateway %s dispatched %d messages in %.1fs (%.1f msg/s)",
+                self.name, processed, elapsed, processed / max(elapsed, 0.001)
+            )
+
+        return processed
+
+    def _dispatch_outbox(self, queue_ids):
+        """Send freshly committed outbox rows of this gateway without waiting.
+
+        Rows that cannot go out right away, because of the circuit breaker, the
+        rate limit or a concurrent claim, stay pending for the queue cron.
+        """
+        self.ensure_one()
+        queue_obj = self.env['sms.tunisiesms.queue']
+
+        breaker = self._breaker_allow()
+        if not breaker:
+            return 0
+
+        allowed = self._acquire_send_tokens(1 if breaker == 'probe' else len(queue_ids), time.monotonic())
+        if not allowed:
+            return 0
+
+        pending_sms = queue_obj._claim_pending(self, allowed, queue_obj._new_lease_owner(), ids=queue_ids)
+        if len(pending_sms) < allowed:
+            self._release_send_tokens(allowed - len(pending_sms))
         if not pending_sms:
-            return True
+            return 0
 
-        # Mark as sending
-        pending_sms.write({'state': 'sending'})
+        # Publish the claim before sending
+        self.env.cr.commit()
+        self._dispatch_items(pending_sms.ids)
+        return len(pending_sms)
+
+    def _acquire_send_tokens(self, requested, deadline):
+        """Take up to `requested` send tokens, waiting for a refill until `deadline`.
+
+        Returns the number of messages that may be sent now, 0 when the daily
+        quota is exhausted or no token frees up before the deadline.
+        """
+        self.ensure_one()
+        if self.rate_limit <= 0 and self.daily_quota <= 0:
+            return requested
+
+        runtime_obj = self.env['sms.tunisiesms.runtime']
+        while True:
+            granted, wait = runtime_obj._take_tokens(self, requested)
+            if granted:
+                return granted
+            if wait is None:
+                _logger.info("Daily quota of SMS gateway %s exhausted", self.name)
+                return 0
+            if time.monotonic() + wait > deadline:
+                return 0
+            time.sleep(wait)
+
+    def _release_send_tokens(self, count):
+        """Give back tokens that were taken but not used."""
+        self.ensure_one()
+        if count > 0 and (self.rate_limit > 0 or self.daily_quota > 0):
+            self.env['sms.tunisiesms.runtime']._return_tokens(self, count)
 
-        error_ids = []
-        sent_ids = []
+    @api.model
+    def _next_batch_size(self, per_message, remaining):
+        """Size the next drain batch so that it completes in about one chunk."""
+        target = min(DRAIN_CHUNK_SECONDS, remaining)
+        size = int(target / max(per_message, 0.001))
+        return max(1, min(size, DRAIN_MAX_BATCH_SIZE))
+
+    def _dispatch_batch(self, queue_items):
+        """Send a claimed batch of queue items through this gateway."""
+        self.ensure_one()
+        workers = min(max(self.dispatch_workers, 1), len(queue_items))
+
+        transport = get_transport(self)
+        if self.dispatch_mode == 'async' and transport and transport.supports_async:
+            if async_http.is_available():
+                self._dispatch_async(queue_items)
+                return
+            _logger.warning("Asyncio dispatch unavailable for gateway %s, sending sequentially", self.name)
 
-        for sms in pending_sms:
-            try:
-                # Check character limit
-                if sms.gateway_id.char_limit and len(sms.msg) > 160:
-                    error_ids.append(sms.id)
-                    continue
+        if self.dispatch_mode != 'parallel' or workers < 2:
+            self._dispatch_items(queue_items.ids)
+            return
 
-                # Process based on method
-                if sms.gateway_id.method == 'http':
-                    self._process_http_queue_item(sms)
-                elif sms.gateway_id.method == 'smpp':
-                    self._process_smpp_queue_item(sms)
-                else:
-                    _logger.error("Unsupported SMS method: %s", sms.gateway_id.method)
-                    error_ids.append(sms.id)
-                    continue
+        # Workers run in their own transactions: publish the 'sending' state and
+        # release our row locks before they start updating the same rows.
+        self.env.cr.commit()
+
+        slices = [queue_items.ids[i::workers] for i in range(workers)]
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='sms_dispatch') as executor:
+            futures = [executor.submit(self._dispatch_worker, ids) for ids in slices]
+            for future in futures:
+                try:
+                    future.result()
+                except Exception as e:
+                    _logger.error("SMS dispatch worker failed: %s", str(e))
+
+        # Drop the values cached before the workers updated the rows
+        queue_items.invalidate_cache()
 
-                sent_ids.append(sms.id)
+    def _dispatch_worker(self, queue_ids):
+        """Thread entry point: send queue items with a dedicated cursor and environment."""
+        with api.Environment.manage():
+            with self.pool.cursor() as cr:
+                env = api.Environment(cr, self.env.uid, self.env.context)
+                env['sms.tunisiesms'].browse(self.id)._dispatch_items(queue_ids)
 
+    def _dispatch_items(self, queue_ids):
+        """Send queue items one by one and commit the outcome of each row.
+
+        Each commit writes the buffered history entry of the send together
+        with the queue state, so a crash or a time limit kill in the middle
+        of a batch never loses the record of a message that went out.
+        """
+        queue_obj = self.env['sms.tunisiesms.queue']
+        # Breaker and routing statistics are recorded once for the whole chunk
+        outcomes = {}
+        renew_at = time.monotonic() + self.lease_duration / 2
+
+        try:
+            for index, sms in enumerate(queue_obj.browse(queue_ids)):
+                lease_owner = sms.lease_owner
+                error = None
+                try:
+                    self._send_queue_item(sms, outcomes)
+                except Exception as e:
+                    _logger.error("Failed to process SMS queue item %s: %s", sms.id, str(e))
+                    error = e
+
+                self._record_queue_result(sms, lease_owner, error)
+                self.env.cr.commit()
+
+                # Keep the rest of a slow batch away from the lease reaper
+                if time.monotonic() >= renew_at and lease_owner:
+                    queue_obj._renew_leases(self, lease_owner, queue_ids[index + 1:])
+                    self.env.cr.commit()
+                    renew_at = time.monotonic() + self.lease_duration / 2
+        finally:
+            self._flush_send_outcomes(outcomes)
+
+    def _dispatch_async(self, queue_items):
+        """Send a batch of HTTP queue items concurrently through the asyncio transport."""
+        self.ensure_one()
+        transport = self._get_transport()
+        lease_owners = {sms.id: sms.lease_owner for sms in queue_items}
+        config = self._get_config()
+        char_limit = config.char_limit
+
+        sendable = self.env['sms.tunisiesms.queue']
+        for sms in queue_items:
+            if char_limit and len(sms.msg) > 160:
+                error = GatewayResponseError('440', _('Message exceeds 160 characters'))
+                self._record_queue_result(sms, lease_owners[sms.id], error)
+            else:
+                sendable |= sms
+
+        urls = [transport.send_url(sms.mobile, sms.msg) for sms in sendable]
+        started = time.monotonic()
+        try:
+            responses = async_http.fetch_all(urls, self.async_concurrency,
+                                             config.http_connect_timeout, config.http_read_timeout)
+        except Exception as e:
+            # Record the failure on every row instead of leaving them to the reaper
+            responses = [e] * len(urls)
+
+        # A slow chunk must not be reclaimed while its results are recorded
+        if time.monotonic() - started >= self.lease_duration / 2:
+            for lease_owner in set(lease_owners.values()) - {False}:
+                self.env['sms.tunisiesms.queue']._renew_leases(self, lease_owner, sendable.ids)
+            self.env.cr.commit()
+
+        outcomes = {}
+        for sms, result in zip(sendable, responses):
+            # gather() hands back bare exceptions the request wrapper let through
+            if isinstance(result, BaseException):
+                response, latency = result, time.monotonic() - started
+            else:
+                response, latency = result
+            error = None
+            try:
+                if isinstance(response, BaseException):
+                    self._record_send_outcome(latency, 0.0, response, outcomes)
+                    raise UserError(_('HTTP queue processing failed: %s') % str(response))
+                result = transport.parse_response(response)
+                self._record_send_outcome(latency, 1.0 if result.status_code == '200' else 0.0, outcomes=outcomes)
+                self._record_queue_response(sms, result, latency)
+                if result.status_code != '200':
+                    raise GatewayResponseError(
+                        result.status_code,
+                        _('Gateway returned %s: %s') % (result.status_code, result.status_msg)
+                    )
             except Exception as e:
                 _logger.error("Failed to process SMS queue item %s: %s", sms.id, str(e))
-                error_ids.append(sms.id)
+                error = e
 
-        # Update status
-        if sent_ids:
-            queue_obj.browse(sent_ids).write({'state': 'send'})
+            self._record_queue_result(sms, lease_owners[sms.id], error)
 
-        if error_ids:
-            queue_obj.browse(error_ids).write({
-                'state': 'error',
-                'error': 'SMS processing failed'
-            })
+        self._flush_send_outcomes(outcomes)
 
-        return True
+        # Close the chunk: the history entries commit with the queue states
+        self.env.cr.commit()
+
+    def _record_queue_result(self, sms, lease_owner, error=None):
+        """Record the outcome of a send attempt on a claimed queue item."""
+        # The reaper may have handed the row to another run meanwhile
+        sms.invalidate_cache(['state', 'lease_owner'])
+        if sms.state != 'sending' or sms.lease_owner != lease_owner:
+            _logger.warning("Lease on SMS queue item %s was lost, result not recorded", sms.id)
+        elif error is None:
+            sms._mark_sent()
+        else:
+            sms._schedule_retry(error, failover=sms.gateway_id._get_failover_gateway(error))
+
+    def _send_queue_item(self, sms, outcomes=None):
+        """Send a single queue item through its gateway.
+
+        The request outcome is collected in `outcomes` when given, see
+        _record_send_outcome.
+        """
+        gateway = sms.gateway_id
+        config = gateway._get_config()
+
+        # Check character limit
+        if config.char_limit and len(sms.msg) > 160:
+            raise GatewayResponseError('440', _('Message exceeds 160 characters'))
+
+        transport = get_transport(gateway)
+        if transport is None:
+            raise GatewayResponseError(None, _('Unsupported SMS method: %s') % config.method)
+
+        started = time.monotonic()
+        try:
+            result = transport.send(sms._get_outgoing_message())
+        except Exception as e:
+            gateway._record_send_outcome(time.monotonic() - started, 0.0, e, outcomes)
+            raise UserError(_('%s queue processing failed: %s') % (config.method.upper(), str(e)))
+        latency = time.monotonic() - started
+        gateway._record_send_outcome(latency, 1.0 if result.status_code == '200' else 0.0, outcomes=outcomes)
+
+        self._record_queue_response(sms, result, latency)
+
+        if result.status_code != '200':
+            raise GatewayResponseError(
+                result.status_code,
+                _('Gateway returned %s: %s') % (result.status_code, result.status_msg)
+            )
 
     @api.model
     def get_tunisiesms_action(self):
         """Get action for Tunisie SMS form view."""
-        gateway = self.sudo().search([("id", "=", 1)], limit=1)
+        gateway = self.sudo()._get_primary_gateway()
 
         return {
             "type": "ir.actions.act_window",
@@ -450,116 +1566,44 @@ Usage: Type %variable_name% in your template text'''
             # Add any specific update logic here
         return True
 
-    def _send_http_sms(self, data, gateway):
-        """Send SMS via HTTP method."""
-        params = {
-            'mobile': data.mobile_to,
-            'sms': data.text,
-            'fct': 'sms',
-            'sender': gateway.sender_url_params,
-            'key': gateway.key_url_params
-        }
-
-        query_string = urllib.parse.urlencode(params)
-        full_url = f"{gateway.url}?{query_string}"
-
-        try:
-            response = requests.get(full_url, timeout=30)
-            response.raise_for_status()
-
-            # Parse response
-            message_id, status_code, status_mobile, status_msg = self._parse_sms_response(response.text)
-
-            # Create history entry
-            self._create_history_entry(
-                gateway, data, message_id, status_code, status_mobile, status_msg
-            )
-
-            return message_id
-
-        except Exception as e:
-            _logger.error("HTTP SMS send failed: %s", str(e))
-            # Create history entry for failure
-            self._create_history_entry(
-                gateway, data, '', 'error', data.mobile_to, str(e)
-            )
-            raise
-
-    def _send_smpp_sms(self, data, gateway):
-        """Send SMS via SMPP method."""
-        # Extract SMPP parameters
-        login = password = sender = account = None
-
-        for param in gateway.property_ids:
-            if param.type == 'user':
-                login = param.value
-            elif param.type == 'password':
-                password = param.value
-            elif param.type == 'sender':
-                sender = param.value
-            elif param.type == 'sms':
-                account = param.value
-
-        if not all([login, password, sender, account]):
-            raise UserError(_('SMPP parameters not properly configured'))
-
+    def _send_direct(self, data, gateway):
+        """Send one SMS through the gateway transport and log the answer in the history."""
+        transport = gateway._get_transport()
+        started = time.monotonic()
         try:
-            soap = WSDL.Proxy(gateway.url)
-
-            # Handle message encoding
-            message = data.text
-            if getattr(data, 'coding', '1') == '2':
-                message = message.encode('utf-8')
-
-            # Send via SOAP
-            result = soap.telephonySmsUserSend(
-                str(login), str(password), str(account), str(sender),
-                str(data.mobile_to), message,
-                int(getattr(data, 'validity', gateway.validity)),
-                int(getattr(data, 'classes1', gateway.classes)),
-                int(getattr(data, 'deferred', gateway.deferred)),
-                int(getattr(data, 'priority', 0)),
-                int(getattr(data, 'coding', 1)),
-                str(gateway.tag or ''),
-                str(gateway.nostop or 0)
-            )
-
-            _logger.info(f"SOAP SMS sent successfully: {result}")
-
-            # Create history entry
-            self._create_history_entry(
-                gateway, data, str(result), '200', data.mobile_to, 'SMPP SMS sent successfully'
-            )
-
-            return result
-
+            result = transport.send(self._prepare_outgoing_message(data))
         except Exception as e:
-            _logger.error(f"Error sending SMS via SOAP: {e}")
-            # Create history entry for failure
-            self._create_history_entry(
-                gateway, data, '', 'error', data.mobile_to, str(e)
-            )
+            _logger.error("SMS send via %s failed: %s", transport.config.method, str(e))
+            gateway._record_send_outcome(time.monotonic() - started, 0.0, e)
             raise
+        latency = time.monotonic() - started
+        gateway._record_send_outcome(latency, 1.0 if result.status_code == '200' else 0.0)
 
-    def _parse_sms_response(self, response_text):
-        """Parse SMS gateway XML response."""
-        try:
-            root = jxmlease.parse(response_text)
-            return (
-                root['response']['status']['message_id'].get_cdata(),
-                root['response']['status']['status_code'].get_cdata(),
-                root['response']['status']['status_mobile'].get_cdata(),
-                root['response']['status']['status_msg'].get_cdata()
-            )
-        except Exception as e:
-            _logger.warning("Failed to parse SMS response: %s", str(e))
-            return '', 'parse_error', '', str(e)
+        # Create history entry
+        self._create_history_entry(gateway, data, *result, latency=latency)
+        return result
 
-    def _create_history_entry(self, gateway, data, message_id, status_code, status_mobile, status_msg):
-        """Create SMS history entry."""
+    def _record_queue_response(self, sms, result, latency=None):
+        """Log the gateway answer to a queue item in the history."""
+        self.env['sms.tunisiesms.history']._buffer_entries([{
+            'name': _('SMS Sent') if result.status_code == '200' else _('SMS Send Error'),
+            'gateway_id': sms.gateway_id.id,
+            'sms': sms.msg,
+            'to': sms.mobile,
+            'message_id': result.message_id,
+            'status_code': result.status_code,
+            'status_mobile': result.status_mobile,
+            'status_msg': result.status_msg,
+            'latency_ms': latency * 1000.0 if latency is not None else False,
+            'date_create': datetime.now()
+        }])
+
+    def _create_history_entry(self, gateway, data, message_id, status_code, status_mobile, status_msg,
+                              latency=None):
+        """Log an SMS history entry, inserted with the others of the transaction."""
         history_name = _('SMS Sent') if status_code == '200' else _('SMS Send Error')
 
-        self.env['sms.tunisiesms.history'].create({
+        self.env['sms.tunisiesms.history']._buffer_entries([{
             'name': history_name,
             'gateway_id': gateway.id,
             'sms': data.text,
@@ -568,9 +1612,10 @@ Usage: Type %variable_name% in your template text'''
             'status_code': status_code,
             'status_mobile': status_mobile,
             'status_msg': status_msg,
+            'latency_ms': latency * 1000.0 if latency is not None else False,
             'date_create': datetime.now(),
             'user_id': self.env.uid
-        })
+        }])
 
     @api.model
     def create(self, vals):
@@ -590,6 +1635,10 @@ Usage: Type %variable_name% in your template text'''
         """Override write to refresh user access when needed."""
         result = super().write(vals)
 
+        if not CONFIG_FIELDS.isdisjoint(vals):
+            # The new write_date keys the next snapshot, see _get_config
+            self._config_changed()
+
         # Only refresh user access if users_id field was modified and we're not in a refresh cycle
         if 'users_id' in vals and not self.env.context.get('skip_access_refresh'):
             try:
@@ -624,6 +1673,10 @@ Usage: Type %variable_name% in your template text'''
             
             _logger.info(f"📊 Current users with SMS access: {len(current_users)}")
             _logger.info(f"👥 Total active users: {len(all_users)}")
+
+            # Nothing to fix: leave the record rules and the registry caches alone
+            if current_users == all_users:
+                return
             
             # Apply fix_visibility.py logic: Add all users to gateway permissions
             _logger.info("🔄 Adding all users to SMS gateway permissions...")
@@ -702,6 +1755,98 @@ Usage: Type %variable_name% in your template text'''
                 }
             }
 
+    def _get_hot_queries(self):
+        """Return (label, sql, params) for the queries run by the module crons."""
+        queries = [(
+            'Queue claim (sms.tunisiesms.queue)',
+            """
+                SELECT id
+                  FROM sms_tunisiesms_queue
+                 WHERE gateway_id = %s
+                   AND state IN ('draft', 'error')
+                   AND scheduled_at <= (now() at time zone 'UTC')
+                   AND (next_attempt_at IS NULL OR next_attempt_at <= (now() at time zone 'UTC'))
+                 ORDER BY priority DESC, scheduled_at, id
+                 LIMIT 30
+            """,
+            [self.id or 0],
+        ), (
+            'Lease reaper (sms.tunisiesms.queue)',
+            """
+                SELECT id
+                  FROM sms_tunisiesms_queue
+                 WHERE state = 'sending'
+                   AND (lease_expires_at IS NULL OR lease_expires_at < (now() at time zone 'UTC'))
+            """,
+            [],
+        ), (
+            'DLR webhook lookup (sms.tunisiesms.history)',
+            """
+                SELECT id
+                  FROM sms_tunisiesms_history
+                 WHERE message_id = ANY(%s::varchar[])
+                   AND gateway_id = %s
+            """,
+            [['0'] * 100, self.id or 0],
+        )]
+
+        orm_queries = [
+            ('DLR polling (sms.tunisiesms.history)', 'sms.tunisiesms.history',
+             [('next_dlr_poll_at', '<=', fields.Datetime.now()), ('gateway_id.dlr_mode', '=', 'poll')],
+             'next_dlr_poll_at', DLR_POLL_LIMIT),
+            ('Order notifications (sale.order)', 'sale.order',
+             [('tunisie_sms_status', '=', 0)], None, None),
+            ('Partner notifications (res.partner)', 'res.partner',
+             [('tunisie_sms_status', '=', 0)], None, None),
+        ]
+        for label, model_name, domain, order, limit in orm_queries:
+            model = self.env[model_name]
+            query = model._where_calc(domain)
+            order_by = model._generate_order_by(order, query)
+            from_clause, where_clause, params = query.get_sql()
+            sql = 'SELECT "%s".id FROM %s WHERE %s %s' % (
+                model._table, from_clause, where_clause or 'TRUE', order_by)
+            if limit:
+                sql += ' LIMIT %d' % limit
+            queries.append((label, sql, params))
+
+        return queries
+
+    @api.model
+    def _collect_plan_scans(self, plan):
+        """Walk an EXPLAIN (FORMAT JSON) plan and list its table scans."""
+        scans = []
+        if 'Relation Name' in plan:
+            if plan.get('Index Name'):
+                scans.append('%s on %s' % (plan['Index Name'], plan['Relation Name']))
+            else:
+                scans.append('%s on %s' % (plan['Node Type'], plan['Relation Name']))
+        for child in plan.get('Plans', []):
+            scans.extend(self._collect_plan_scans(child))
+        return scans
+
+    def action_check_query_plans(self):
+        """Show which index each hot query of the module is planned to use."""
+        lines = []
+        for label, sql, params in self._get_hot_queries():
+            self._cr.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+            plan = self._cr.fetchone()[0][0]['Plan']
+            scans = self._collect_plan_scans(plan) or [plan['Node Type']]
+            lines.append('%s: %s' % (label, ', '.join(scans)))
+            _logger.info("Query plan check - %s", lines[-1])
+
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('SMS Query Plans'),
+                'message': '\n'.join(lines) + '\n' + _(
+                    'Small tables may legitimately use a sequential scan.'),
+                'type': 'info',
+                'sticky': True,
+            }
+        }
+
     def create_test_sms_records(self):
         """Create test SMS records for debugging purposes."""
         try:
@@ -818,6 +1963,8 @@ class SMSQueue(SMSAccessMixin, models.Model):
         ('sending', 'Sending'),
         ('send', 'Sent'),
         ('error', 'Error'),
+        ('expired', 'Expired'),
+        ('dead', 'Dead Letter'),
     ], 'Status', readonly=True, default='draft')
 
     error = fields.Text(
@@ -831,6 +1978,47 @@ class SMSQueue(SMSAccessMixin, models.Model):
         default=fields.Datetime.now
     )
 
+    # Scheduling
+    scheduled_at = fields.Datetime(
+        'Scheduled For',
+        readonly=True,
+        help='Earliest time the dispatcher may send this message (creation + deferral)'
+    )
+    expires_at = fields.Datetime(
+        'Expires At',
+        readonly=True,
+        help='Messages still pending after this time expire without being sent'
+    )
+
+    # Retries
+    attempt_count = fields.Integer('Attempts', readonly=True, default=0)
+    next_attempt_at = fields.Datetime(
+        'Next Attempt',
+        readonly=True,
+        help='Failed messages are not retried before this time'
+    )
+
+    # Dispatch Lease
+    lease_owner = fields.Char(
+        'Lease Owner',
+        readonly=True,
+        help='Dispatcher run (host:pid:run) that claimed this message'
+    )
+    lease_expires_at = fields.Datetime(
+        'Lease Expiry',
+        readonly=True,
+        help='Time after which the claim of the dispatcher run is no longer valid'
+    )
+
+    # Outbox
+    res_model = fields.Char('Related Document Model', readonly=True, index=True)
+    res_id = fields.Many2oneReference(
+        'Related Document ID',
+        model_field='res_model',
+        readonly=True,
+        help='Business record whose committed change queued this message'
+    )
+
     # SMS Parameters
     validity = fields.Integer(
         'Validity (minutes)',
@@ -841,7 +2029,7 @@ class SMSQueue(SMSAccessMixin, models.Model):
         ('1', 'Normal'),
         ('2', 'High'),
         ('3', 'Urgent')
-    ], 'Priority', help='Message priority level')
+    ], 'Priority', default='1', help='Message priority level')
 
     classes1 = fields.Selection([
         ('0', 'Flash'),
@@ -866,6 +2054,307 @@ class SMSQueue(SMSAccessMixin, models.Model):
         help='Do not display STOP clause for non-advertising messages'
     )
 
+    def init(self):
+        """Backfill scheduling columns and index the dispatcher claim query."""
+        self._cr.execute("""
+            UPDATE sms_tunisiesms_queue
+               SET scheduled_at = COALESCE(date_create, now() at time zone 'UTC')
+             WHERE scheduled_at IS NULL
+        """)
+        self._cr.execute("""
+            UPDATE sms_tunisiesms_queue SET priority = '1' WHERE priority IS NULL
+        """)
+        # Pending rows used to expire with the message validity
+        self._cr.execute("""
+            UPDATE sms_tunisiesms_queue
+               SET expires_at = NULL
+             WHERE state IN ('draft', 'error', 'sending')
+               AND expires_at = scheduled_at + validity * interval '1 minute'
+        """)
+        self._cr.execute("""
+            CREATE INDEX IF NOT EXISTS sms_tunisiesms_queue_dispatch_idx
+                ON sms_tunisiesms_queue (gateway_id, priority DESC, scheduled_at, id)
+             WHERE state IN ('draft', 'error')
+        """)
+        self._cr.execute("""
+            CREATE INDEX IF NOT EXISTS sms_tunisiesms_queue_lease_idx
+                ON sms_tunisiesms_queue (lease_expires_at)
+             WHERE state = 'sending'
+        """)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Override create to compute when each message is due and when it expires."""
+        now = fields.Datetime.now()
+        gateway_obj = self.env['sms.tunisiesms']
+        for vals in vals_list:
+            created = fields.Datetime.to_datetime(vals.get('date_create')) or now
+            scheduled = fields.Datetime.to_datetime(vals.get('scheduled_at')) or \
+                created + timedelta(minutes=vals.get('deferred') or 0)
+            vals.setdefault('scheduled_at', scheduled)
+            # Not the message validity: a message held back by an outage or a
+            # backlog must survive it unless the gateway sets a queue expiry
+            expiry = gateway_obj.sudo().browse(vals.get('gateway_id')).queue_expiry
+            if expiry > 0 and 'expires_at' not in vals:
+                vals['expires_at'] = scheduled + timedelta(minutes=expiry)
+        return super(SMSQueue, self).create(vals_list)
+
+    def _get_outgoing_message(self):
+        """Build the transport message of this queue item."""
+        self.ensure_one()
+        return OutgoingMessage(
+            mobile=self.mobile,
+            text=self.msg,
+            validity=self.validity,
+            classes=self.classes1,
+            deferred=self.deferred,
+            priority=self.priority,
+            coding=self.coding,
+            nostop=self.nostop1,
+            tag=self.tag or self.gateway_id._get_config().tag,
+        )
+
+    def _mark_sent(self):
+        """Record a successful send attempt."""
+        for sms in self:
+            sms.write({
+                'state': 'send',
+                'error': False,
+                'attempt_count': sms.attempt_count + 1,
+                'next_attempt_at': False,
+            })
+
+    def _schedule_retry(self, error, failover=None):
+        """Record a failed attempt: back off before retrying, or dead-letter the message.
+
+        The delay doubles on every attempt, capped by the gateway maximum, with
+        jitter so that messages failing together do not retry together. With a
+        `failover` gateway the message moves to it and is retried at once.
+        """
+        permanent = getattr(error, 'permanent', False)
+        for sms in self:
+            gateway = sms.gateway_id
+            attempts = sms.attempt_count + 1
+            vals = {
+                'attempt_count': attempts,
+                'error': str(error) or 'SMS processing failed',
+            }
+
+            if permanent or attempts >= gateway.retry_max_attempts:
+                vals.update({'state': 'dead', 'next_attempt_at': False})
+            elif failover:
+                vals.update({'state': 'draft', 'gateway_id': failover.id, 'next_attempt_at': False})
+            else:
+                delay = min(gateway.retry_base_delay * 2 ** (attempts - 1), gateway.retry_max_delay)
+                delay = delay / 2.0 + random.uniform(0, delay / 2.0)
+                vals.update({
+                    'state': 'error',
+                    'next_attempt_at': fields.Datetime.now() + timedelta(seconds=delay),
+                })
+
+            sms.write(vals)
+
+    def action_requeue(self):
+        """Give dead, expired or failed messages a fresh set of attempts."""
+        self.filtered(lambda sms: sms.state in ('error', 'expired', 'dead')).write({
+            'state': 'draft',
+            'attempt_count': 0,
+            'next_attempt_at': False,
+            'scheduled_at': fields.Datetime.now(),
+            'expires_at': False,
+            'error': False,
+        })
+        return True
+
+    @api.model
+    def _expire_overdue(self, gateway):
+        """Expire pending messages of a gateway whose validity has passed."""
+        self.flush(['state', 'expires_at'])
+        self._cr.execute("""
+            UPDATE sms_tunisiesms_queue
+               SET state = 'expired',
+                   error = 'Validity expired before the message could be sent'
+             WHERE gateway_id = %s
+               AND state IN ('draft', 'error')
+               AND expires_at <= (now() at time zone 'UTC')
+         RETURNING id
+        """, (gateway.id,))
+        ids = [row[0] for row in self._cr.fetchall()]
+        if ids:
+            _logger.info("Expired %d queued SMS of gateway %s", len(ids), gateway.name)
+            self.invalidate_cache(['state', 'error'], ids)
+        return len(ids)
+
+    def _dispatch_after_commit(self):
+        """Send these outbox rows as soon as the current transaction commits.
+
+        Rows of one transaction are collected and handed to a background
+        thread by a single post-commit hook, so the caller never waits on the
+        gateway. On rollback the hook is dropped together with the rows.
+        """
+        postcommit = self.env.cr.postcommit
+        pending = postcommit.data.setdefault('sms.tunisiesms.outbox', [])
+        dbname = self.env.cr.dbname
+
+        if not pending:
+            @postcommit.add
+            def start_outbox_dispatch():
+                threading.Thread(
+                    target=self._outbox_worker,
+                    args=(list(pending),),
+                    name='sms_outbox_%s' % dbname,
+                    daemon=True,
+                ).start()
+
+        pending.extend(self.ids)
+
+    def _outbox_worker(self, queue_ids):
+        """Thread entry point: dispatch committed outbox rows gateway by gateway."""
+        with api.Environment.manage():
+            with self.pool.cursor() as cr:
+                env = api.Environment(cr, self.env.uid, self.env.context)
+                queue_items = env['sms.tunisiesms.queue'].browse(queue_ids).exists()
+                for gateway in queue_items.mapped('gateway_id'):
+                    try:
+                        gateway._dispatch_outbox(queue_items.filtered(lambda sms: sms.gateway_id == gateway).ids)
+                    except Exception as e:
+                        _logger.error("SMS outbox dispatch failed for gateway %s: %s", gateway.name, str(e))
+                        cr.rollback()
+
+    @api.model
+    def _new_lease_owner(self):
+        """Build a lease owner identifier unique to one dispatcher run."""
+        return '%s:%s:%s' % (socket.gethostname(), os.getpid(), uuid.uuid4().hex[:8])
+
+    @api.model
+    def _claim_pending(self, gateway, limit, lease_owner, ids=None):
+        """Atomically claim pending messages of a gateway for one dispatcher run.
+
+        FOR UPDATE SKIP LOCKED lets concurrent cron workers and Odoo nodes claim
+        disjoint batches without waiting on each other. Call it at the start of
+        a transaction and commit right after to publish the claim. `ids`
+        restricts the claim to the given rows.
+        """
+        self.flush()
+        id_filter = 'AND id = ANY(%s)' if ids else ''
+        params = [lease_owner, gateway.lease_duration, gateway.id] + ([list(ids)] if ids else []) + [limit]
+        try:
+            with self._cr.savepoint():
+                self._cr.execute("""
+                    UPDATE sms_tunisiesms_queue
+                       SET state = 'sending',
+                           lease_owner = %s,
+                           lease_expires_at = (now() at time zone 'UTC') + %s * interval '1 second'
+                     WHERE id IN (
+                            SELECT id
+                              FROM sms_tunisiesms_queue
+                             WHERE gateway_id = %s
+                               AND state IN ('draft', 'error')
+                               AND scheduled_at <= (now() at time zone 'UTC')
+                               AND (next_attempt_at IS NULL
+                                    OR next_attempt_at <= (now() at time zone 'UTC'))
+                               {id_filter}
+                             ORDER BY priority DESC, scheduled_at, id
+                             LIMIT %s
+                               FOR UPDATE SKIP LOCKED)
+                 RETURNING id
+                """.format(id_filter=id_filter), params)
+                ids = [row[0] for row in self._cr.fetchall()]
+        except psycopg2.extensions.TransactionRollbackError:
+            # A concurrent run committed some of these rows after our snapshot
+            _logger.info("SMS queue claim conflict on gateway %s, retrying next run", gateway.id)
+            return self.browse()
+
+        self.invalidate_cache(['state', 'lease_owner', 'lease_expires_at'], ids)
+        return self.browse(ids)
+
+    @api.model
+    def _reap_expired_leases(self):
+        """Return 'sending' rows whose lease expired to the pending pool.
+
+        Such rows belong to runs that crashed or were killed by the server
+        time limit before recording a result. Every reclaim counts as an
+        attempt so that a message which keeps killing its worker ends up in
+        the dead letter state. Rows whose gateway was removed meanwhile are
+        reclaimed too, _fail_unrouted then marks them as errors.
+        """
+        self.flush(['state', 'lease_expires_at', 'attempt_count', 'gateway_id'])
+        self._cr.execute("""
+            UPDATE sms_tunisiesms_queue q
+               SET state = CASE WHEN COALESCE(q.attempt_count, 0) + 1 >= COALESCE(
+                                         (SELECT g.retry_max_attempts FROM sms_tunisiesms g
+                                           WHERE g.id = q.gateway_id), %s)
+                                THEN 'dead' ELSE 'draft' END,
+                   attempt_count = COALESCE(q.attempt_count, 0) + 1,
+                   lease_owner = NULL,
+                   lease_expires_at = NULL,
+                   error = 'Dispatch lease expired before a result was recorded'
+             WHERE q.state = 'sending'
+               AND (q.lease_expires_at IS NULL
+                    OR q.lease_expires_at < (now() at time zone 'UTC'))
+         RETURNING q.id
+        """, (DEFAULT_RETRY_MAX_ATTEMPTS,))
+        ids = [row[0] for row in self._cr.fetchall()]
+        if ids:
+            _logger.warning("Reclaimed %d SMS queue items with expired leases", len(ids))
+            self.invalidate_cache(['state', 'attempt_count', 'lease_owner', 'lease_expires_at', 'error'], ids)
+        return len(ids)
+
+    @api.model
+    def _renew_leases(self, gateway, lease_owner, ids):
+        """Extend the lease of rows `lease_owner` still holds among `ids`.
+
+        Called while a batch is being sent so that rows waiting their turn are
+        not reclaimed by _reap_expired_leases before the run reaches them.
+        """
+        if not ids:
+            return 0
+        self.flush(['state', 'lease_owner', 'lease_expires_at'])
+        self._cr.execute("""
+            UPDATE sms_tunisiesms_queue
+               SET lease_expires_at = (now() at time zone 'UTC') + %s * interval '1 second'
+             WHERE id = ANY(%s)
+               AND state = 'sending'
+               AND lease_owner = %s
+         RETURNING id
+        """, (gateway.lease_duration, list(ids), lease_owner))
+        renewed = [row[0] for row in self._cr.fetchall()]
+        self.invalidate_cache(['lease_expires_at'], renewed)
+        return len(renewed)
+
+    @api.model
+    def _fail_unrouted(self):
+        """Mark pending rows without a gateway as errors.
+
+        No dispatcher ever claims them, they would otherwise stay in draft
+        without anyone noticing.
+        """
+        self.flush(['gateway_id', 'state'])
+        self._cr.execute("""
+            UPDATE sms_tunisiesms_queue
+               SET state = 'error',
+                   error = 'No SMS gateway set on the message'
+             WHERE gateway_id IS NULL
+               AND state = 'draft'
+         RETURNING id
+        """)
+        ids = [row[0] for row in self._cr.fetchall()]
+        if ids:
+            _logger.warning("%d queued SMS have no gateway and were marked as errors", len(ids))
+            self.invalidate_cache(['state', 'error'], ids)
+        return len(ids)
+
+    @api.model
+    def _count_pending(self, gateway):
+        """Count messages of a gateway still waiting to be claimed."""
+        self.flush(['gateway_id', 'state'])
+        self._cr.execute("""
+            SELECT count(*)
+              FROM sms_tunisiesms_queue
+             WHERE gateway_id = %s AND state IN ('draft', 'error')
+        """, (gateway.id,))
+        return self._cr.fetchone()[0]
+
 
 class SMSGatewayParameters(models.Model):
     """SMS Gateway Parameters for configuring API connections."""
@@ -898,6 +2387,308 @@ class SMSGatewayParameters(models.Model):
         ('extra', 'Extra Information')
     ], 'Parameter Type', required=True, help='Parameter type for API integration')
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        # Credentials are part of the GatewayConfig snapshot
+        records.gateway_id._touch_config()
+        return records
+
+    def write(self, vals):
+        gateways = self.gateway_id
+        result = super().write(vals)
+        (gateways | self.gateway_id)._touch_config()
+        return result
+
+    def unlink(self):
+        gateways = self.gateway_id
+        result = super().unlink()
+        gateways.exists()._touch_config()
+        return result
+
+class SMSGatewayRuntime(models.Model):
+    """Runtime counters shared by every worker and node sending through a gateway.
+
+    Rows are updated with short SQL transactions of their own so that hot
+    counters never lock the gateway configuration record.
+    """
+
+    _name = 'sms.tunisiesms.runtime'
+    _description = 'SMS Gateway Runtime Counters'
+
+    gateway_id = fields.Many2one(
+        'sms.tunisiesms',
+        'SMS Gateway',
+        required=True,
+        ondelete='cascade'
+    )
+
+    # Token Bucket
+    tokens = fields.Float('Available Tokens', readonly=True)
+    tokens_updated_at = fields.Datetime('Tokens Updated', readonly=True)
+    quota_day = fields.Date('Quota Day', readonly=True)
+    quota_used = fields.Integer('Quota Used', readonly=True)
+
+    # Circuit Breaker
+    breaker_state = fields.Selection([
+        ('closed', 'Closed'),
+        ('open', 'Open'),
+        ('half_open', 'Half Open'),
+    ], 'Breaker State', default='closed', readonly=True)
+    breaker_failures = fields.Integer('Consecutive Failures', readonly=True)
+    breaker_opened_at = fields.Datetime('Breaker Opened At', readonly=True)
+
+    # Routing Statistics
+    latency_ewma = fields.Float('Send Latency (ms)', readonly=True)
+    success_ewma = fields.Float('Success Rate', readonly=True)
+    stats_updated_at = fields.Datetime('Statistics Updated', readonly=True)
+
+    _sql_constraints = [
+        ('gateway_uniq', 'unique(gateway_id)', 'Only one runtime record per gateway is allowed'),
+    ]
+
+    @api.model
+    def _ensure_runtime(self, cr, gateway):
+        """Create the runtime row of a gateway if it does not exist yet."""
+        cr.execute("""
+            INSERT INTO sms_tunisiesms_runtime
+                   (gateway_id, tokens, tokens_updated_at, quota_day, quota_used,
+                    breaker_state, breaker_failures,
+                    create_uid, create_date, write_uid, write_date)
+            VALUES (%s, 0, clock_timestamp() at time zone 'UTC',
+                    (clock_timestamp() at time zone 'UTC')::date, 0,
+                    'closed', 0,
+                    %s, now() at time zone 'UTC', %s, now() at time zone 'UTC')
+            ON CONFLICT (gateway_id) DO NOTHING
+        """, (gateway.id, self.env.uid, self.env.uid))
+
+    @api.model
+    def _lock_runtime(self, cr, gateway):
+        """Create the runtime row of a gateway if needed and lock it in `cr`."""
+        self._ensure_runtime(cr, gateway)
+        cr.execute("""
+            SELECT tokens,
+                   EXTRACT(EPOCH FROM (clock_timestamp() at time zone 'UTC') - tokens_updated_at),
+                   CASE WHEN quota_day = (clock_timestamp() at time zone 'UTC')::date
+                        THEN quota_used ELSE 0 END
+              FROM sms_tunisiesms_runtime
+             WHERE gateway_id = %s
+               FOR UPDATE
+        """, (gateway.id,))
+        return cr.fetchone()
+
+    @api.model
+    def _take_tokens(self, gateway, requested):
+        """Take up to `requested` tokens from the gateway bucket and daily quota.
+
+        Returns (granted, wait) where wait is the number of seconds until the
+        next token is available, or None when the daily quota is exhausted.
+        """
+        rate = gateway.rate_limit * RATE_LIMIT_HEADROOM
+        capacity = max(rate, 1.0)
+
+        with self.pool.cursor() as cr:
+            tokens, elapsed, used = self._lock_runtime(cr, gateway)
+
+            available = min(capacity, tokens + max(elapsed or 0.0, 0.0) * rate) if rate > 0 else requested
+            quota_left = gateway.daily_quota - used if gateway.daily_quota > 0 else requested
+            granted = max(0, min(requested, int(available), quota_left))
+
+            cr.execute("""
+                UPDATE sms_tunisiesms_runtime
+                   SET tokens = %s,
+                       tokens_updated_at = clock_timestamp() at time zone 'UTC',
+                       quota_day = (clock_timestamp() at time zone 'UTC')::date,
+                       quota_used = %s
+                 WHERE gateway_id = %s
+            """, (available - granted if rate > 0 else 0, used + granted, gateway.id))
+
+        if granted or quota_left <= 0:
+            return granted, (None if not granted else 0.0)
+        return 0, (1.0 - available) / rate
+
+    @api.model
+    def _return_tokens(self, gateway, count):
+        """Put unused tokens back into the bucket and the daily quota."""
+        capacity = max(gateway.rate_limit * RATE_LIMIT_HEADROOM, 1.0)
+        with self.pool.cursor() as cr:
+            self._lock_runtime(cr, gateway)
+            cr.execute("""
+                UPDATE sms_tunisiesms_runtime
+                   SET tokens = LEAST(tokens + %s, %s),
+                       quota_used = GREATEST(quota_used - %s, 0)
+                 WHERE gateway_id = %s
+            """, (count, capacity, count, gateway.id))
+
+    @api.model
+    def _breaker_acquire(self, gateway):
+        """Let a request through the circuit breaker of `gateway` or refuse it.
+
+        Returns 'closed', 'probe' or False, see `sms.tunisiesms._breaker_allow`.
+        Once the cooldown is over the first caller becomes the probe and the
+        others keep failing fast for another cooldown, so that a probe that
+        never reports back does not hold the breaker forever.
+        """
+        query = """
+            SELECT breaker_state,
+                   EXTRACT(EPOCH FROM (clock_timestamp() at time zone 'UTC') - breaker_opened_at)
+              FROM sms_tunisiesms_runtime
+             WHERE gateway_id = %s
+        """
+        with self.pool.cursor() as cr:
+            # Unlocked read first, the breaker is closed almost all the time
+            cr.execute(query, (gateway.id,))
+            row = cr.fetchone()
+            if not row or row[0] in (None, 'closed'):
+                return 'closed'
+            if row[1] is not None and row[1] < gateway.breaker_cooldown:
+                return False
+
+            cr.execute(query + ' FOR UPDATE', (gateway.id,))
+            state, elapsed = cr.fetchone()
+            if state in (None, 'closed'):
+                return 'closed'
+            if elapsed is not None and elapsed < gateway.breaker_cooldown:
+                return False
+
+            cr.execute("""
+                UPDATE sms_tunisiesms_runtime
+                   SET breaker_state = 'half_open',
+                       breaker_opened_at = clock_timestamp() at time zone 'UTC'
+                 WHERE gateway_id = %s
+            """, (gateway.id,))
+
+        _logger.info("Circuit breaker of SMS gateway %s half open, sending a probe", gateway.name)
+        return 'probe'
+
+    @api.model
+    def _reset_breaker(self, gateway):
+        """Close the circuit breaker of `gateway`."""
+        with self.pool.cursor() as cr:
+            cr.execute("""
+                UPDATE sms_tunisiesms_runtime
+                   SET breaker_state = 'closed',
+                       breaker_failures = 0,
+                       breaker_opened_at = NULL
+                 WHERE gateway_id = %s
+                   AND (breaker_state != 'closed' OR breaker_failures != 0)
+             RETURNING breaker_failures
+            """, (gateway.id,))
+            if cr.fetchone():
+                _logger.info("Circuit breaker of SMS gateway %s closed", gateway.name)
+
+    @api.model
+    def _record_outcomes(self, gateway, samples):
+        """Record (reachable, accepted, latency) provider requests of `gateway`.
+
+        The requests of a whole chunk are folded into one atomic UPDATE that
+        computes the new breaker state and moving averages from the current
+        row, so concurrent workers never wait on a row lock taken beforehand.
+        A request that reached the provider closes the breaker, the failures
+        after the last one count towards tripping it.
+        """
+        if not samples:
+            return
+        alpha = ROUTING_EWMA_ALPHA
+        decay = (1.0 - alpha) ** len(samples)
+
+        # Moving averages folded over the chunk: from the stored value, and
+        # from the first sample when the stored statistics are stale
+        latencies = [latency * 1000.0 for _reachable, _accepted, latency in samples]
+        rates = [accepted for _reachable, accepted, _latency in samples]
+        latency_step = rate_step = 0.0
+        latency_fresh, rate_fresh = latencies[0], rates[0]
+        for i, (latency, rate) in enumerate(zip(latencies, rates)):
+            weight = alpha * (1.0 - alpha) ** (len(samples) - 1 - i)
+            latency_step += weight * latency
+            rate_step += weight * rate
+            if i:
+                latency_fresh += alpha * (latency - latency_fresh)
+                rate_fresh += alpha * (rate - rate_fresh)
+
+        threshold = gateway.breaker_threshold
+        reachable = [sample[0] for sample in samples]
+        if threshold <= 0 or reachable[-1]:
+            reset, trailing = True, 0
+        elif any(reachable):
+            reset, trailing = True, len(reachable) - 1 - max(i for i, ok in enumerate(reachable) if ok)
+        else:
+            reset, trailing = False, len(reachable)
+
+        params = {
+            'gateway_id': gateway.id,
+            'reset': reset,
+            'trailing': trailing,
+            'threshold': threshold if threshold > 0 else len(samples) + 1,
+            'ttl': ROUTING_STATS_TTL,
+            'decay': decay,
+            'latency_step': latency_step,
+            'latency_fresh': latency_fresh,
+            'rate_step': rate_step,
+            'rate_fresh': rate_fresh,
+        }
+        # SET expressions all read the row as it was before this statement
+        query = """
+            UPDATE sms_tunisiesms_runtime
+               SET breaker_state = CASE
+                       WHEN %(trailing)s >= %(threshold)s AND %(reset)s THEN 'open'
+                       WHEN %(reset)s THEN 'closed'
+                       WHEN breaker_state = 'half_open' THEN 'open'
+                       WHEN COALESCE(breaker_state, 'closed') = 'closed'
+                            AND COALESCE(breaker_failures, 0) + %(trailing)s >= %(threshold)s THEN 'open'
+                       ELSE COALESCE(breaker_state, 'closed') END,
+                   breaker_failures = CASE WHEN %(reset)s THEN %(trailing)s
+                                           ELSE COALESCE(breaker_failures, 0) + %(trailing)s END,
+                   breaker_opened_at = CASE
+                       WHEN %(trailing)s >= %(threshold)s AND %(reset)s
+                         OR NOT %(reset)s AND breaker_state = 'half_open'
+                         OR NOT %(reset)s AND COALESCE(breaker_state, 'closed') = 'closed'
+                            AND COALESCE(breaker_failures, 0) + %(trailing)s >= %(threshold)s
+                       THEN statement_timestamp() at time zone 'UTC'
+                       WHEN %(reset)s THEN NULL
+                       ELSE breaker_opened_at END,
+                   latency_ewma = CASE WHEN stats_updated_at IS NULL
+                                         OR stats_updated_at < (clock_timestamp() at time zone 'UTC')
+                                                               - %(ttl)s * interval '1 second'
+                                       THEN %(latency_fresh)s
+                                       ELSE latency_ewma * %(decay)s + %(latency_step)s END,
+                   success_ewma = CASE WHEN stats_updated_at IS NULL
+                                       THEN %(rate_fresh)s
+                                       ELSE success_ewma * %(decay)s + %(rate_step)s END,
+                   stats_updated_at = clock_timestamp() at time zone 'UTC'
+             WHERE gateway_id = %(gateway_id)s
+         RETURNING breaker_state, breaker_failures,
+                   breaker_opened_at = statement_timestamp() at time zone 'UTC'
+        """
+        with self.pool.cursor() as cr:
+            closing = False
+            if reset:
+                # Only matches when the breaker actually closes, for the log
+                cr.execute("""
+                    UPDATE sms_tunisiesms_runtime
+                       SET breaker_state = 'closed'
+                     WHERE gateway_id = %s
+                       AND breaker_state IN ('open', 'half_open')
+                """, (gateway.id,))
+                closing = bool(cr.rowcount)
+            cr.execute(query, params)
+            row = cr.fetchone()
+            if row is None:
+                # First request of the gateway, create its row and count again
+                self._ensure_runtime(cr, gateway)
+                cr.execute(query, params)
+                row = cr.fetchone()
+        state, failures, tripped = row
+
+        if closing and state == 'closed':
+            _logger.info("Circuit breaker of SMS gateway %s closed", gateway.name)
+        if tripped:
+            _logger.warning(
+                "Circuit breaker of SMS gateway %s opened after %d consecutive failures",
+                gateway.name, failures
+            )
+
+
 class SMSHistory(SMSAccessMixin, models.Model):
     """SMS History for tracking sent messages and their status."""
 
@@ -937,55 +2728,200 @@ class SMSHistory(SMSAccessMixin, models.Model):
     )
 
     # API Response Fields
-    message_id = fields.Char('Message ID', readonly=True)
+    message_id = fields.Char('Message ID', readonly=True, index=True)
     status_code = fields.Char('Status Code', readonly=True)
     status_mobile = fields.Char('Mobile Status', readonly=True)
     status_msg = fields.Char('Status Message', readonly=True)
+    latency_ms = fields.Float('Latency (ms)', readonly=True, help='Time the gateway took to answer the send request')
     dlr_msg = fields.Char('Delivery Report', readonly=True)
+    next_dlr_poll_at = fields.Datetime(
+        'Next DLR Poll',
+        readonly=True,
+        copy=False,
+        help='When the delivery report cron asks the gateway for this message again. '
+             'Empty once the report is final or polling gave up.'
+    )
+    dlr_poll_count = fields.Integer('DLR Poll Attempts', readonly=True, default=0, copy=False)
+
+    def init(self):
+        """Index the delivery report polling query on the messages still scheduled."""
+        self._cr.execute("DROP INDEX IF EXISTS sms_tunisiesms_history_dlr_pending_idx")
+        self._cr.execute("""
+            CREATE INDEX IF NOT EXISTS sms_tunisiesms_history_dlr_poll_idx
+                ON sms_tunisiesms_history (next_dlr_poll_at)
+             WHERE next_dlr_poll_at IS NOT NULL
+        """)
+        # Messages of the last day logged before the schedule existed
+        self._cr.execute("""
+            UPDATE sms_tunisiesms_history h
+               SET next_dlr_poll_at = now() at time zone 'UTC'
+              FROM sms_tunisiesms g
+             WHERE g.id = h.gateway_id
+               AND g.dlr_mode = 'poll'
+               AND h.next_dlr_poll_at IS NULL
+               AND h.dlr_poll_count = 0
+               AND h.dlr_msg IS NULL
+               AND h.message_id IS NOT NULL
+               AND h.message_id != '1'
+               AND h.date_create > (now() at time zone 'UTC') - interval '1 day'
+        """)
 
-    def get_dlr_status(self):
-        """Get delivery status for SMS messages."""
-        # Get pending delivery reports
-        pending_history = self.search([
-            ('dlr_msg', '=', False),
-            ('message_id', '!=', False),
-            ('message_id', '!=', '1')
-        ], order='date_create desc', limit=30)
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Override create to schedule the first delivery report poll of sent messages."""
+        self._schedule_first_dlr_poll(vals_list)
+        return super(SMSHistory, self).create(vals_list)
 
-        for history_item in pending_history:
-            try:
-                self._fetch_delivery_status(history_item)
-            except Exception as e:
-                _logger.error("Failed to fetch DLR for message %s: %s",
-                             history_item.message_id, str(e))
+    @api.model
+    def _schedule_first_dlr_poll(self, vals_list):
+        """Set next_dlr_poll_at in the values of sent messages of polling gateways."""
+        first_poll = fields.Datetime.now() + timedelta(seconds=DLR_POLL_BACKOFF[0])
+        gateway_obj = self.env['sms.tunisiesms']
+        for vals in vals_list:
+            if (vals.get('message_id') in (None, False, '', '1') or not vals.get('gateway_id')
+                    or 'next_dlr_poll_at' in vals):
+                continue
+            if gateway_obj.browse(vals['gateway_id'])._get_config().dlr_mode == 'poll':
+                vals['next_dlr_poll_at'] = first_poll
 
-        return True
+    @api.model
+    def _buffer_entries(self, vals_list):
+        """Log history entries with the rest of the current transaction.
+
+        The entries are inserted in bulk every HISTORY_FLUSH_SIZE rows and by
+        a pre-commit hook, so they commit together with the queue updates of
+        the sends they record and are dropped with them on rollback. The
+        buffer never outlives the transaction.
+        """
+        precommit = self.env.cr.precommit
+        if 'sms.tunisiesms.history' not in precommit.data:
+            precommit.data['sms.tunisiesms.history'] = []
+            precommit.add(self._flush_buffer)
+
+        pending = precommit.data['sms.tunisiesms.history']
+        pending.extend(vals_list)
+        if len(pending) >= HISTORY_FLUSH_SIZE:
+            self._flush_buffer()
 
-    def _fetch_delivery_status(self, history_item):
-        """Fetch delivery status for a single message."""
-        if not history_item.gateway_id or not history_item.message_id:
+    @api.model
+    def _flush_buffer(self):
+        """Insert the history entries buffered by the current transaction."""
+        pending = self.env.cr.precommit.data.get('sms.tunisiesms.history')
+        if not pending:
             return
+        vals_list = list(pending)
+        del pending[:]
 
-        gateway = history_item.gateway_id
-        params = {
-            'fct': 'dlr',
-            'key': gateway.key_url_params,
-            'msg_id': history_item.message_id
-        }
+        try:
+            with self.env.cr.savepoint():
+                self._insert_bulk(vals_list)
+        except Exception as e:
+            # One bad row must not take the record of the other sends with it
+            _logger.error("Bulk insert of %d SMS history entries failed, creating them one by one: %s",
+                          len(vals_list), str(e))
+            for vals in vals_list:
+                try:
+                    with self.env.cr.savepoint():
+                        self.create(vals)
+                except Exception as e:
+                    _logger.error("Failed to log SMS history for %s: %s", vals.get('to'), str(e))
 
-        query_string = urllib.parse.urlencode(params)
-        url = f"{gateway.url}?{query_string}"
+    @api.model
+    def _insert_bulk(self, vals_list):
+        """Insert history entries with a single statement instead of one per row."""
+        self._schedule_first_dlr_poll(vals_list)
+        defaults = {'date_create': fields.Datetime.now(), 'user_id': self.env.uid}
+        columns = [[vals.get(name, defaults.get(name)) for vals in vals_list]
+                   for name, _type in HISTORY_BULK_COLUMNS]
+        # False is the ORM's empty value, NULL in the table
+        columns = [[None if value is False else value for value in column] for column in columns]
+        self._cr.execute("""
+            INSERT INTO sms_tunisiesms_history
+                   (%s, dlr_poll_count, create_uid, create_date, write_uid, write_date)
+            SELECT r.*, 0, %%s, now() at time zone 'UTC', %%s, now() at time zone 'UTC'
+              FROM unnest(%s) AS r
+        """ % (
+            ', '.join('"%s"' % name for name, _type in HISTORY_BULK_COLUMNS),
+            ', '.join('%%s::%s[]' % sql_type for _name, sql_type in HISTORY_BULK_COLUMNS),
+        ), [self.env.uid, self.env.uid] + columns)
+
+    def _flush_search(self, *args, **kwargs):
+        # Searches of the transaction see the entries it buffered
+        self._flush_buffer()
+        return super(SMSHistory, self)._flush_search(*args, **kwargs)
 
-        try:
-            response = urllib.request.urlopen(url, timeout=30).read()
-            root = jxmlease.parse(response)
+    @api.model
+    def _apply_delivery_reports(self, gateway_id, reports):
+        """Write {message id: acknowledgement} delivery reports of a gateway in one statement.
+
+        Returns the set of message ids matching a history entry, reports can
+        arrive before the transaction logging their send has committed. A
+        final report takes the message out of the polling schedule.
+        """
+        if not reports:
+            return set()
+        self._cr.execute("""
+            UPDATE sms_tunisiesms_history h
+               SET dlr_msg = r.acknowledgement,
+                   next_dlr_poll_at = CASE WHEN upper(r.acknowledgement) = ANY(%s)
+                                           THEN NULL ELSE h.next_dlr_poll_at END,
+                   write_date = now() at time zone 'UTC'
+              FROM unnest(%s::varchar[], %s::varchar[]) AS r(message_id, acknowledgement)
+             WHERE h.message_id = r.message_id
+               AND h.gateway_id = %s
+         RETURNING h.id, h.message_id
+        """, (list(DLR_FINAL_STATUSES), list(reports), list(reports.values()), gateway_id))
+        rows = self._cr.fetchall()
+        self.invalidate_cache(['dlr_msg', 'next_dlr_poll_at'], [row[0] for row in rows])
+        return {row[1] for row in rows}
+
+    def _record_dlr_polls(self, reports):
+        """Record one poll of these entries and the {message id: report} it returned.
+
+        Entries with a final report leave the schedule, the others are polled
+        again after the next DLR_POLL_BACKOFF delay, or never once the
+        schedule is exhausted. Everything is written in one statement.
+        """
+        if not self:
+            return
+        self._cr.execute("""
+            UPDATE sms_tunisiesms_history h
+               SET dlr_msg = COALESCE(r.acknowledgement, h.dlr_msg),
+                   dlr_poll_count = h.dlr_poll_count + 1,
+                   next_dlr_poll_at = CASE
+                       WHEN upper(r.acknowledgement) = ANY(%s) THEN NULL
+                       ELSE (now() at time zone 'UTC')
+                            + make_interval(secs => (%s::int[])[h.dlr_poll_count + 2])
+                   END,
+                   write_date = now() at time zone 'UTC'
+              FROM unnest(%s::int[], %s::varchar[]) AS r(id, acknowledgement)
+             WHERE h.id = r.id
+        """, (list(DLR_FINAL_STATUSES), list(DLR_POLL_BACKOFF),
+              self.ids, [reports.get(history.message_id) for history in self]))
+        self.invalidate_cache(['dlr_msg', 'dlr_poll_count', 'next_dlr_poll_at'])
+
+    def get_dlr_status(self):
+        """Get delivery status for SMS messages."""
+        # Messages due for a poll, longest waiting first; webhook gateways push theirs
+        pending_history = self.search([
+            ('next_dlr_poll_at', '<=', fields.Datetime.now()),
+            ('gateway_id.dlr_mode', '=', 'poll'),
+        ], order='next_dlr_poll_at', limit=DLR_POLL_LIMIT)
 
-            acknowledgement = root['acknowledgement']['message']['acknowledgement'].get_cdata()
-            history_item.write({'dlr_msg': acknowledgement})
+        # Message ids of each gateway, a message logged twice is asked once
+        pending = {}
+        for history_item in pending_history:
+            pending.setdefault(history_item.gateway_id, {})[history_item.message_id] = True
 
-        except Exception as e:
-            _logger.error("DLR fetch failed for message %s: %s",
-                         history_item.message_id, str(e))
+        for gateway, message_ids in pending.items():
+            try:
+                reports = gateway._poll_delivery_reports(list(message_ids))
+            except Exception as e:
+                _logger.error("Failed to fetch DLR for gateway %s: %s", gateway.name, str(e))
+                continue
+            pending_history.filtered(lambda h: h.gateway_id == gateway)._record_dlr_polls(reports)
+
+        return True
 
 class PartnerSMSSend(models.Model):
     """Partner SMS Send model for sending SMS to specific partners."""
@@ -1100,7 +3036,16 @@ class PartnerSMSSend(models.Model):
 
         # Send SMS
         gateway_obj = self.env['sms.tunisiesms']
-        gateway_obj.send_msg(self)
+        if gateway_obj.send_msg(self) is False:
+            return {
+                'type': 'ir.actions.client',
+                'tag': 'display_notification',
+                'params': {
+                    'title': _('SMS Not Sent'),
+                    'message': _('The SMS to %s could not be sent now, it is queued and will be retried') % self.mobile_to,
+                    'type': 'warning',
+                }
+            }
 
         return {
             'type': 'ir.actions.client',
@@ -1127,6 +3072,15 @@ class SaleOrderSMS(models.Model):
     tunisie_sms_write_date = fields.Datetime('SMS Write Date')
     tunisie_sms_msisdn = fields.Char('SMS Mobile Number')
 
+    def init(self):
+        """Index the orders still waiting for their SMS notification."""
+        super(SaleOrderSMS, self).init()
+        self._cr.execute("""
+            CREATE INDEX IF NOT EXISTS sale_order_tunisie_sms_pending_idx
+                ON sale_order (id)
+             WHERE tunisie_sms_status = 0
+        """)
+
     def process_order_sms_notifications(self):
         """Process SMS notifications for orders with status 0."""
         orders_to_process = self.search([('tunisie_sms_status', '=', 0)])
@@ -1134,7 +3088,7 @@ class SaleOrderSMS(models.Model):
         if not orders_to_process:
             return True
 
-        sms_gateway = self.env['sms.tunisiesms'].search([('id', '=', 1)], limit=1)
+        sms_gateway = self.env['sms.tunisiesms']._get_primary_gateway()
 
         if not sms_gateway:
             _logger.warning("No SMS gateway configured")
@@ -1179,9 +3133,10 @@ class SaleOrderSMS(models.Model):
 
         # Create SMS data
         sms_data = self.env['partner.tunisiesms.send'].create({
-            'gateway': sms_gateway.id,
+            'gateway': (self.env['sms.tunisiesms']._route_gateway() or sms_gateway).id,
             'mobile_to': partner_mobile,
-            'text': final_message
+            'text': final_message,
+            'priority': self._get_order_sms_priority(order.state),
         })
 
         # Send SMS
@@ -1204,16 +3159,11 @@ class SaleOrderSMS(models.Model):
 
     def _get_order_sms_config(self, order_state, sms_gateway):
         """Get SMS template and permission for order state."""
-        state_config = {
-            'draft': (sms_gateway.order_draft_sms, sms_gateway.status_order_draft),
-            'sent': (sms_gateway.order_sent_sms, sms_gateway.status_order_sent),
-            'waiting': (sms_gateway.order_waiting_sms, sms_gateway.status_order_waiting),
-            'sale': (sms_gateway.order_sale_sms, sms_gateway.status_order_sale),
-            'done': (sms_gateway.order_done_sms, sms_gateway.status_order_done),
-            'cancel': (sms_gateway.order_cancel_sms, sms_gateway.status_order_cancel),
-        }
+        return sms_gateway._get_config().order_templates.get(order_state, ('', False))
 
-        return state_config.get(order_state, ('', False))
+    def _get_order_sms_priority(self, order_state):
+        """Get queue priority for an order notification: confirmations go first."""
+        return '2' if order_state == 'sale' else '1'
 
     def _replace_order_variables(self, template, order):
         """Replace template variables with order data."""
@@ -1261,31 +3211,25 @@ class SaleOrderSMS(models.Model):
 
     def _send_automatic_sms(self, order, is_new_order=False, old_state=None):
         """Send automatic SMS for order creation or status change."""
-        # Get SMS gateway
-        sms_gateway = self.env['sms.tunisiesms'].search([('id', '=', 1)], limit=1)
+        # Get SMS gateway holding the templates, messages are routed over all gateways
+        sms_gateway = self.env['sms.tunisiesms']._get_primary_gateway()
         if not sms_gateway:
             _logger.warning("No SMS gateway configured for automatic SMS")
             return
 
-        # AUTOMATIC FIX: Ensure all users have SMS access before sending
-        try:
-            _logger.info("🔧 Auto-triggering SMS visibility fix before sending SMS")
-            sms_gateway._ensure_all_users_have_access()
-        except Exception as fix_error:
-            _logger.error(f"Auto SMS visibility fix failed: {fix_error}")
-            # Continue anyway to attempt SMS send
+        config = sms_gateway._get_config()
 
         # Check if automatic SMS is enabled globally
-        if not sms_gateway.auto_sms_enabled:
+        if not config.auto_sms_enabled:
             _logger.info("Automatic SMS disabled globally, skipping SMS for order %s", order.name)
             return
 
         # Check specific automatic SMS settings
-        if is_new_order and not sms_gateway.auto_sms_on_create:
+        if is_new_order and not config.auto_sms_on_create:
             _logger.info("Automatic SMS on order creation disabled, skipping SMS for order %s", order.name)
             return
 
-        if not is_new_order and not sms_gateway.auto_sms_on_status_change:
+        if not is_new_order and not config.auto_sms_on_status_change:
             _logger.info("Automatic SMS on status change disabled, skipping SMS for order %s", order.name)
             return
 
@@ -1315,18 +3259,19 @@ class SaleOrderSMS(models.Model):
 
         # Create SMS data
         sms_data = self.env['partner.tunisiesms.send'].create({
-            'gateway': sms_gateway.id,
+            'gateway': (self.env['sms.tunisiesms']._route_gateway() or sms_gateway).id,
             'mobile_to': partner_mobile,
-            'text': final_message
+            'text': final_message,
+            'priority': self._get_order_sms_priority(order.state),
         })
 
-        # Send SMS
+        # Queue SMS in the order's transaction, it is sent once the order change commits
         try:
-            self.env['sms.tunisiesms'].send_msg(sms_data)
+            self.env['sms.tunisiesms']._outbox_msg(sms_data, order)
 
-            # Log successful SMS
+            # Log queued SMS
             action_type = "New Order" if is_new_order else f"State Change ({old_state} → {order.state})"
-            _logger.info("Automatic SMS sent for %s: Order %s to %s", action_type, order.name, partner_mobile)
+            _logger.info("Automatic SMS queued for %s: Order %s to %s", action_type, order.name, partner_mobile)
 
             # Update SMS status tracking
             current_time = fields.Datetime.now()
@@ -1388,6 +3333,15 @@ class ResPartnerSMS(models.Model):
     tunisie_sms_send_date = fields.Datetime('SMS Send Date')
     tunisie_sms_write_date = fields.Datetime('SMS Write Date')
 
+    def init(self):
+        """Index the partners still waiting for their SMS notification."""
+        super(ResPartnerSMS, self).init()
+        self._cr.execute("""
+            CREATE INDEX IF NOT EXISTS res_partner_tunisie_sms_pending_idx
+                ON res_partner (id)
+             WHERE tunisie_sms_status = 0
+        """)
+
     def process_partner_sms_notifications(self):
         """Process SMS notifications for new partners."""
         partners_to_process = self.search([('tunisie_sms_status', '=', 0)])
@@ -1395,7 +3349,7 @@ class ResPartnerSMS(models.Model):
         if not partners_to_process:
             return True
 
-        sms_gateway = self.env['sms.tunisiesms'].search([('id', '=', 1)], limit=1)
+        sms_gateway = self.env['sms.tunisiesms']._get_primary_gateway()
 
         if not sms_gateway:
             _logger.warning("No SMS gateway configured")
@@ -1421,7 +3375,8 @@ class ResPartnerSMS(models.Model):
 
     def _process_single_partner_sms(self, partner, sms_gateway, admin_mobile, current_time):
         """Process SMS notification for a single partner."""
-        if not sms_gateway.status_res_partner_create:
+        config = sms_gateway._get_config()
+        if not config.partner_create_enabled:
             partner.update({
                 'tunisie_sms_status': 3,  # Disabled
                 'tunisie_sms_send_date': current_time,
@@ -1430,7 +3385,7 @@ class ResPartnerSMS(models.Model):
             return
 
         # Get SMS template
-        sms_template = sms_gateway.res_partner_sms_create
+        sms_template = config.partner_create_template
 
         if not sms_template:
             partner.update({
@@ -1447,7 +3402,7 @@ class ResPartnerSMS(models.Model):
 
         # Create SMS data
         sms_data = self.env['partner.tunisiesms.send'].create({
-            'gateway': sms_gateway.id,
+            'gateway': (self.env['sms.tunisiesms']._route_gateway() or sms_gateway).id,
             'mobile_to': admin_mobile,
             'text': final_message
         })
@@ -1486,19 +3441,20 @@ class ResPartnerSMS(models.Model):
 
     def _send_automatic_partner_sms(self, partner):
         """Send automatic SMS notification for new partner creation."""
-        # Get SMS gateway
-        sms_gateway = self.env['sms.tunisiesms'].search([('id', '=', 1)], limit=1)
+        # Get SMS gateway holding the templates, messages are routed over all gateways
+        sms_gateway = self.env['sms.tunisiesms']._get_primary_gateway()
         if not sms_gateway:
             _logger.warning("No SMS gateway configured for automatic partner SMS")
             return
 
         # Check if automatic SMS is enabled globally and for partner creation
-        if not sms_gateway.auto_sms_enabled or not sms_gateway.status_res_partner_create:
+        config = sms_gateway._get_config()
+        if not config.auto_sms_enabled or not config.partner_create_enabled:
             _logger.info("Automatic partner SMS disabled, skipping SMS for partner %s", partner.name)
             return
 
         # Get SMS template
-        sms_template = sms_gateway.res_partner_sms_create
+        sms_template = config.partner_create_template
         if not sms_template:
             _logger.info("No SMS template configured for partner creation, skipping SMS for partner %s", partner.name)
             return
@@ -1522,17 +3478,17 @@ class ResPartnerSMS(models.Model):
 
         # Create SMS data
         sms_data = self.env['partner.tunisiesms.send'].create({
-            'gateway': sms_gateway.id,
+            'gateway': (self.env['sms.tunisiesms']._route_gateway() or sms_gateway).id,
             'mobile_to': admin_mobile,
             'text': final_message
         })
 
-        # Send SMS
+        # Queue SMS in the partner's transaction, it is sent once the creation commits
         try:
-            self.env['sms.tunisiesms'].send_msg(sms_data)
+            self.env['sms.tunisiesms']._outbox_msg(sms_data, partner)
 
-            # Log successful SMS
-            _logger.info("Automatic SMS sent for new partner: %s to admin %s", partner.name, admin_mobile)
+            # Log queued SMS
+            _logger.info("Automatic SMS queued for new partner: %s to admin %s", partner.name, admin_mobile)
 
             # Update SMS status tracking
             current_time = fields.Datetime.now()
@@ -1791,83 +3747,6 @@ class TunisieSMSSetup(models.Model):
 
         return True
 
-    def _process_http_queue_item(self, sms):
-        """Process HTTP SMS queue item."""
-        try:
-            response = urllib.request.urlopen(sms.name, timeout=30).read()
-            message_id, status_code, status_mobile, status_msg = self._parse_sms_response(response)
-
-            # Create history entry
-            self.env['sms.tunisiesms.history'].create({
-                'name': _('SMS Sent'),
-                'gateway_id': sms.gateway_id.id,
-                'sms': sms.msg,
-                'to': sms.mobile,
-                'message_id': message_id,
-                'status_code': status_code,
-                'status_mobile': status_mobile,
-                'status_msg': status_msg,
-                'date_create': datetime.now()
-            })
-
-        except Exception as e:
-            raise UserError(_('HTTP queue processing failed: %s') % str(e))
-
-    def _process_smpp_queue_item(self, sms):
-        """Process SMPP SMS queue item."""
-        # Extract SMPP parameters
-        login = password = sender = account = None
-
-        for param in sms.gateway_id.property_ids:
-            if param.type == 'user':
-                login = param.value
-            elif param.type == 'password':
-                password = param.value
-            elif param.type == 'sender':
-                sender = param.value
-            elif param.type == 'sms':
-                account = param.value
-
-        if not all([login, password, sender, account]):
-            raise UserError(_('SMPP parameters not configured'))
-
-        try:
-            soap = WSDL.Proxy(sms.gateway_id.url)
-
-            # Handle message encoding
-            message = sms.msg
-            if sms.coding == '2':
-                message = message.encode('utf-8')
-
-            # Send via SOAP
-            result = soap.telephonySmsUserSend(
-                str(login), str(password), str(account), str(sender),
-                str(sms.mobile), message,
-                int(sms.validity or 0),
-                int(sms.classes1 or 1),
-                int(sms.deferred or 0),
-                int(sms.priority or 0),
-                int(sms.coding or 1),
-                str(sms.tag or ''),
-                str(sms.nostop or 0)
-            )
-
-            # Create history entry
-            self.env['sms.tunisiesms.history'].create({
-                'name': _('SMS Sent'),
-                'gateway_id': sms.gateway_id.id,
-                'sms': sms.msg,
-                'to': sms.mobile,
-                'message_id': str(result),
-                'status_code': 'success',
-                'status_mobile': sms.mobile,
-                'status_msg': 'SMPP sent successfully',
-                'date_create': datetime.now()
-            })
-
-        except Exception as e:
-            raise UserError(_('SMPP queue processing failed: %s') % str(e))
-
     @api.model
     def create(self, vals):
         """Override create to automatically grant SMS access to new users."""
@@ -53,26 +53,18 @@ class MassSMSWizard(models.TransientModel):
         if not partner_ids:
             raise UserError(_('No partners found in the selected categories'))
         
-        # Send SMS to each partner
-        sent_count = 0
-        skipped_count = 0
-        
-        for partner in self.env['res.partner'].browse(partner_ids):
-            if not partner.mobile:
-                skipped_count += 1
-                continue
-            
-            try:
-                # Prepare SMS data
-                sms_data = self._prepare_sms_data(partner)
-                
-                # Send SMS
-                self.env['sms.tunisiesms'].send_msg(sms_data)
-                sent_count += 1
-                
-            except Exception as e:
-                _logger.error("Failed to send SMS to partner %s: %s", partner.name, str(e))
-                skipped_count += 1
+        # Send the message to all partners in batched gateway requests
+        partners = self.env['res.partner'].browse(partner_ids)
+        mobiles = list(dict.fromkeys(partner.mobile for partner in partners if partner.mobile))
+
+        try:
+            sent_count = self.env['sms.tunisiesms'].send_batch_msg(self._prepare_sms_data(), mobiles)
+        except UserError:
+            raise
+        except Exception as e:
+            _logger.error("Mass SMS send failed: %s", str(e))
+            raise UserError(_('Failed to send SMS: %s') % str(e))
+        skipped_count = len(partners) - sent_count
         
         # Show result notification
         return {
@@ -85,16 +77,17 @@ class MassSMSWizard(models.TransientModel):
             }
         }
 
-    def _prepare_sms_data(self, partner):
-        """Prepare SMS data object for sending."""
+    def _prepare_sms_data(self, partner=None):
+        """Prepare SMS data object for sending, without recipient for batch sends."""
         return type('SMSData', (), {
             'gateway': self.gateway,
-            'mobile_to': partner.mobile,
+            'mobile_to': partner.mobile if partner else False,
             'text': self.text,
             'validity': self.gateway.validity,
             'classes1': self.gateway.classes,
             'coding': self.gateway.coding,
             'nostop1': self.gateway.nostop,
+            'priority': '0',  # Campaigns never delay transactional traffic
         })()
 
     # Fields
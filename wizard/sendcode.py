@@ -31,15 +31,27 @@ class SendCode(models.TransientModel):
             'classes1': '1',
             'coding': '1',
             'nostop1': True,
+            'priority': '3',  # OTP codes jump the queue
         })()
         
         # Send verification SMS
         try:
-            sms_record.send_msg(sms_data)
+            sent = sms_record.send_msg(sms_data)
             sms_record.write({'state': 'waiting', 'code': verification_code})
         except Exception as e:
             raise UserError(_('Failed to send verification code: %s') % str(e))
-        
+
+        if sent is False:
+            return {
+                'type': 'ir.actions.client',
+                'tag': 'display_notification',
+                'params': {
+                    'title': _('Verification Code Not Sent'),
+                    'message': _('The verification code to %s could not be sent now, it is queued and will be retried') % mobile_to,
+                    'type': 'warning',
+                }
+            }
+
         return {'type': 'ir.actions.act_window_close'}
 
 # vim:expandtab:smartindent:tabstop=4:softtabstop=4:shiftwidth=4:
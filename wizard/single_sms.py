@@ -49,7 +49,16 @@ class SingleSMSWizard(models.TransientModel):
             })()
             
             # Send SMS
-            self.env['sms.tunisiesms'].send_msg(sms_data)
+            if self.env['sms.tunisiesms'].send_msg(sms_data) is False:
+                return {
+                    'type': 'ir.actions.client',
+                    'tag': 'display_notification',
+                    'params': {
+                        'title': _('SMS Not Sent'),
+                        'message': _('The SMS to %s could not be sent now, it is queued and will be retried') % self.mobile_to,
+                        'type': 'warning',
+                    }
+                }
             
             return {
                 'type': 'ir.actions.client',